@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ComumConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'comum'
+
+    def ready(self):
+        from comum import signals  # noqa: F401
\ No newline at end of file
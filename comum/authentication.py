@@ -0,0 +1,109 @@
+import logging
+import uuid
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from comum.utils.versions import LocalVersions
+
+logger = logging.getLogger(__name__)
+
+PERMISSIONS_VERSION_KEY = "auth:permissions-version:{}"
+
+local_versions = LocalVersions("PERMISSION_CACHE_VERSION_CHECK_INTERVAL", "PERMISSION_CACHE_LOCAL_SIZE")
+
+
+def permissions_version(user_id, create: bool = False) -> Optional[str]:
+    """
+    Versão atual das permissões do usuário, guardada no cache. Com `create`,
+    gera uma nova quando não existe (na emissão do token). A cópia local
+    (`local_versions`) evita o Redis por até `PERMISSION_CACHE_VERSION_CHECK_INTERVAL`
+    segundos.
+    """
+    key = PERMISSIONS_VERSION_KEY.format(user_id)
+    try:
+        if create:
+            return local_versions.get(key, lambda: cache.get_or_set(key, uuid.uuid4().hex, timeout=None))
+        return local_versions.get(key, lambda: cache.get(key))
+    except Exception:
+        logger.warning("Cache indisponível ao consultar a versão de permissões.", exc_info=True)
+        return None
+
+
+def invalidate_permissions(user_ids: Iterable) -> None:
+    """
+    Descarta a versão de permissões dos usuários: os tokens já emitidos deixam de
+    valer como fonte das permissões e passam a ser conferidos no banco, e as
+    entradas do `permission_cache` (chaveadas pela versão) deixam de ser usadas.
+    """
+    keys = [PERMISSIONS_VERSION_KEY.format(user_id) for user_id in user_ids]
+    if not keys:
+        return
+    local_versions.discard(keys)
+    try:
+        cache.delete_many(keys)
+    except Exception:
+        logger.error("Cache indisponível ao invalidar permissões de %s usuários.", len(keys), exc_info=True)
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Inclui no token os dados do usuário e as permissões usados pelas views."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        # A versão é lida antes das permissões: uma alteração no meio do caminho
+        # invalida a versão e o token cai na conferência pelo banco.
+        token["perms_version"] = permissions_version(user.pk, create=True)
+        token["perms"] = sorted(user.get_all_permissions())
+        token["username"] = user.username
+        token["is_staff"] = user.is_staff
+        token["is_superuser"] = user.is_superuser
+        return token
+
+
+class ClaimsUser(TokenUser):
+    """Usuário montado a partir do token, com as permissões das claims."""
+
+    @cached_property
+    def permissions(self) -> frozenset:
+        return frozenset(self.token.get("perms", []))
+
+    def get_all_permissions(self, obj=None) -> set:
+        if obj is not None:
+            return set()
+        return set(self.permissions)
+
+    def has_perm(self, perm: str, obj=None) -> bool:
+        if obj is not None:
+            return False
+        return self.is_superuser or perm in self.permissions
+
+    def has_perms(self, perm_list, obj=None) -> bool:
+        return all(self.has_perm(perm, obj) for perm in perm_list)
+
+    def has_module_perms(self, app_label: str) -> bool:
+        return self.is_superuser or any(perm.startswith(f"{app_label}.") for perm in self.permissions)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Autenticação JWT sem consultas ao banco: enquanto a versão de permissões do
+    token for a atual, o usuário vem das claims. Tokens antigos (grupos ou
+    permissões alterados depois da emissão) caem na busca do usuário no banco.
+    """
+
+    def get_user(self, validated_token):
+        version = validated_token.get("perms_version")
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if version and user_id and version == permissions_version(user_id):
+            return ClaimsUser(validated_token)
+        return super().get_user(validated_token)
+
+
+jwt_authentication = ClaimsJWTAuthentication()
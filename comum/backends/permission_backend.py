@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from comum.authentication import local_versions, permissions_version
+
+PERMISSIONS_KEY = "auth:permissions:{}:{}"
+
+
+class PermissionCache:
+    """
+    Permissões de cada usuário em dois níveis: memória do processo (LRU) e o
+    cache compartilhado (Redis). As chaves levam a versão de permissões do
+    usuário, descartada pelos signals quando grupos ou permissões mudam; assim
+    as entradas antigas dos outros processos deixam de ser usadas, depois de no
+    máximo `PERMISSION_CACHE_VERSION_CHECK_INTERVAL` segundos (a versão também
+    tem cópia local). Um acerto local não vai ao Redis.
+    """
+
+    def __init__(self):
+        self.local = OrderedDict()
+        self.lock = threading.Lock()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def get(self, user_id, loader) -> set:
+        version = permissions_version(user_id, create=True)
+        if version is None:
+            self._count("misses")
+            return loader()
+
+        key = PERMISSIONS_KEY.format(user_id, version)
+        with self.lock:
+            if key in self.local:
+                self.local.move_to_end(key)
+                self.local_hits += 1
+                return self.local[key]
+
+        perms = cache.get(key)
+        if perms is not None:
+            self._count("shared_hits")
+        else:
+            self._count("misses")
+            perms = loader()
+            cache.set(key, perms, settings.PERMISSION_CACHE_TIMEOUT)
+        self._remember(key, perms)
+        return perms
+
+    def clear_local(self) -> None:
+        local_versions.clear()
+        with self.lock:
+            self.local.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.local_hits + self.shared_hits + self.misses
+            return {
+                "local_hits": self.local_hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": round((lookups - self.misses) / lookups, 3) if lookups else 0.0,
+                "local_entries": len(self.local),
+            }
+
+    def _count(self, counter: str) -> None:
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _remember(self, key, perms) -> None:
+        with self.lock:
+            self.local[key] = perms
+            self.local.move_to_end(key)
+            while len(self.local) > settings.PERMISSION_CACHE_LOCAL_SIZE:
+                self.local.popitem(last=False)
+
+
+permission_cache = PermissionCache()
+
+
+class CachedPermissionBackend(ModelBackend):
+    """`ModelBackend` que busca as permissões no `permission_cache` antes do banco."""
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, "_perm_cache"):
+            user_obj._perm_cache = permission_cache.get(
+                user_obj.pk, lambda: super(CachedPermissionBackend, self).get_all_permissions(user_obj)
+            )
+        return user_obj._perm_cache
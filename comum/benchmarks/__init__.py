@@ -0,0 +1,5 @@
+"""
+Benchmarks dos endpoints sobre massa sintética, rodados pelos comandos
+`benchmark` e `explain_endpoints`. Os dados são gerados numa transação
+descartada ao final.
+"""
@@ -0,0 +1,54 @@
+import random
+from decimal import Decimal
+
+from django.db import connection
+from django.utils import timezone
+
+from comum.models import CarModel, Part
+
+MANUFACTURERS = ["FIAT", "VOLKSWAGEN", "CHEVROLET", "FORD", "TOYOTA", "HONDA", "HYUNDAI", "RENAULT"]
+BATCH_SIZE = 5000
+
+
+class Rollback(Exception):
+    """Levantada ao fim de um benchmark para descartar a massa sintética."""
+
+
+def gerar_dados(parts: int, car_models: int, links: int, deleted_ratio: float):
+    """Massa sintética: peças, modelos e vínculos, com uma fração excluída (soft delete)."""
+    now = timezone.now()
+    deleted_at = now
+    for start in range(0, parts, BATCH_SIZE):
+        Part.objects.bulk_create([
+            Part(
+                part_number=f"SYN-{index:09}",
+                name=f"PECA {random.randrange(parts // 10 + 1):07}",
+                details="Peça sintética",
+                price=Decimal(random.randrange(100, 100000)) / 100,
+                quantity=random.randrange(1, 500),
+                updated_at=now - timezone.timedelta(seconds=parts - index),
+                deleted_at=deleted_at if random.random() < deleted_ratio else None,
+            )
+            for index in range(start, min(start + BATCH_SIZE, parts))
+        ])
+    CarModel.objects.bulk_create([
+        CarModel(
+            name=f"MODELO {index:05}",
+            manufacturer=random.choice(MANUFACTURERS),
+            year=random.randrange(1990, 2026),
+            deleted_at=deleted_at if random.random() < deleted_ratio else None,
+        )
+        for index in range(car_models)
+    ])
+
+    part_ids = list(Part.global_objects.values_list("pk", flat=True))
+    through = CarModel.parts.through
+    for car_model_id in CarModel.global_objects.values_list("pk", flat=True):
+        through.objects.bulk_create(
+            [through(carmodel_id=car_model_id, part_id=part_id) for part_id in random.sample(part_ids, min(links, len(part_ids)))],
+            batch_size=BATCH_SIZE,
+        )
+
+    with connection.cursor() as cursor:
+        for model in (Part, CarModel, through):
+            cursor.execute(f"ANALYZE {model._meta.db_table}")
@@ -0,0 +1,76 @@
+import tracemalloc
+
+import orjson
+from django.conf import settings
+from django.http import JsonResponse
+from django_inscode.serializers import Serializer
+
+from comum.benchmarks.relationships import _medir
+from comum.models import CarModel, Part
+from comum.services import part_service
+from comum.transports import CarModelTransport, PartTransport
+from comum.utils.export import EXPORT_FORMATS, stream_rows
+from comum.utils.serializer import row_serializer
+
+
+def _instancias(model, transport, ordering, rows: int):
+    """Caminho anterior das listagens: instâncias do modelo, `Serializer` do inscode e `JsonResponse`."""
+    serializer = Serializer(model, transport)
+
+    def call():
+        objects = model.objects.order_by(*ordering)[:rows]
+        return JsonResponse({"results": [serializer.serialize(obj) for obj in objects]}).content
+    return call
+
+
+def _values_list(model, transport, ordering, rows: int, encode):
+    columns, convert = row_serializer(transport)
+
+    def call():
+        values = model.objects.order_by(*ordering).values_list(*columns)[:rows]
+        return encode({"results": [convert(row) for row in values]})
+    return call
+
+
+def _exportacao(export_format: str):
+    """Consome a exportação completa do catálogo, descartando os pedaços."""
+    def call():
+        for _ in stream_rows(part_service.export(), PartTransport, export_format, settings.PART_EXPORT_CHUNK_SIZE):
+            pass
+    return call
+
+
+def _json_response(data):
+    return JsonResponse(data).content
+
+
+def _pico_kib(func) -> float:
+    """Pico de memória alocada (KiB) durante uma chamada de `func`."""
+    func()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def cenarios(rows: int):
+    result = []
+    for label, model, transport, ordering in (
+        ("peças", Part, PartTransport, ("updated_at", "id")),
+        ("modelos", CarModel, CarModelTransport, ("name", "id")),
+    ):
+        result += [
+            (f"lista: {rows} {label}, instâncias + Serializer", _instancias(model, transport, ordering, rows)),
+            (f"lista: {rows} {label}, values_list + JsonResponse", _values_list(model, transport, ordering, rows, _json_response)),
+            (f"lista: {rows} {label}, values_list + orjson", _values_list(model, transport, ordering, rows, orjson.dumps)),
+        ]
+    for export_format in EXPORT_FORMATS:
+        result.append((f"exportação {export_format}: {rows} peças", _exportacao(export_format)))
+    return result
+
+
+def run(rows: int, repeat: int):
+    """Retorna (cenário, mediana ms, p95 ms, consultas, pico KiB) para cada cenário."""
+    return [(name, *_medir(func, repeat), _pico_kib(func)) for name, func in cenarios(rows)]
@@ -0,0 +1,54 @@
+import uuid
+
+from django.conf import settings
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from comum.authentication import ClaimsTokenObtainPairSerializer
+from comum.benchmarks.relationships import _medir
+from comum.models import CarModel, Part, Users
+from comum.utils.metrics import registry
+
+
+def _cliente(token: str, enabled: bool, path: str):
+    """Requisições pela pilha completa de middlewares, com ou sem o de métricas."""
+    with override_settings(METRICS_ENABLED=enabled):
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+        # A cadeia de middlewares é montada na primeira requisição, ainda com a configuração acima.
+        client.get(path)
+
+    def call():
+        response = client.get(path)
+        assert response.status_code == 200, response.content
+    return call
+
+
+def cenarios():
+    user = Users.objects.create_superuser(
+        username=f"benchmark-{uuid.uuid4().hex[:8]}", email=f"{uuid.uuid4().hex}@benchmark.local", password=uuid.uuid4().hex,
+    )
+    token = str(ClaimsTokenObtainPairSerializer.get_token(user).access_token)
+    part = Part.objects.order_by("part_number").first()
+    car_model = CarModel.objects.order_by("name").first()
+
+    result = []
+    for label, path in (
+        ("lista de peças", reverse("part")),
+        ("detalhe de peça", reverse("manage-part", kwargs={"part_id": part.id})),
+        ("lista de modelos (cursor)", f"{reverse('car-model')}?cursor="),
+        ("peças de um modelo", reverse("parts-car-model", kwargs={"car_model_id": car_model.id})),
+    ):
+        for enabled in (False, True):
+            state = "com métricas" if enabled else "sem métricas"
+            result.append((f"métricas: {label}, {state}", _cliente(token, enabled, path)))
+    return result
+
+
+def run(repeat: int):
+    """Retorna (cenário, mediana ms, p95 ms, consultas) para cada cenário."""
+    try:
+        # Host padrão do Client do Django.
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            return [(name, *_medir(func, repeat)) for name, func in cenarios()]
+    finally:
+        registry.reset()
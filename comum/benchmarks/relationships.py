@@ -0,0 +1,86 @@
+import statistics
+import time
+import uuid
+from importlib import import_module
+
+from django.conf import settings
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from comum.authentication import ClaimsTokenObtainPairSerializer
+from comum.models import CarModel, Part, Users
+from comum.utils.pagination import KeysetPaginator
+from comum.views.car_model import CarsModelPartView
+from comum.views.part import PartsCarModelView
+
+
+def _medir(func, repeat: int):
+    """Executa `func` `repeat` vezes; retorna mediana e p95 (ms) e consultas por execução."""
+    func()  # aquecimento
+    timings = []
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return statistics.median(timings), p95, len(queries) // repeat
+
+
+def _view(view_class, token: str, path_kwargs: dict, **params):
+    factory = RequestFactory()
+    view = view_class.as_view()
+
+    def call():
+        request = factory.get("/", data=params, HTTP_AUTHORIZATION=f"Bearer {token}")
+        # Sem middlewares: a sessão (que as views do inscode põem no contexto) é criada aqui.
+        request.session = import_module(settings.SESSION_ENGINE).SessionStore()
+        response = view(request, **path_kwargs)
+        assert response.status_code == 200, response.content
+    return call
+
+
+def _legado_pecas(car_model_id, page: int):
+    """Consultas da versão anterior de PartsCarModelView: join reverso, count e OFFSET sem ordem."""
+    def call():
+        queryset = Part.objects.filter(parts__id=car_model_id)
+        queryset.count()
+        list(queryset[(page - 1) * 10:page * 10])
+    return call
+
+
+def cenarios(parts_per_model: int):
+    """Cenários medidos, sobre o modelo com mais peças e a peça com mais modelos da massa."""
+    user = Users.objects.create_superuser(
+        username=f"benchmark-{uuid.uuid4().hex[:8]}", email=f"{uuid.uuid4().hex}@benchmark.local", password=uuid.uuid4().hex,
+    )
+    token = str(ClaimsTokenObtainPairSerializer.get_token(user).access_token)
+
+    car_model = CarModel.objects.order_by("name").first()
+    part = Part.objects.filter(pk__in=CarModel.parts.through.objects.values("part_id")).order_by("name").first()
+    last_page = max(1, parts_per_model // 10 - 1)
+    deep_cursor = _cursor_after(car_model, last_page * 10)
+
+    return [
+        ("legado: peças do modelo, página 1", _legado_pecas(car_model.pk, 1)),
+        (f"legado: peças do modelo, página {last_page}", _legado_pecas(car_model.pk, last_page)),
+        ("view: peças do modelo, página 1", _view(PartsCarModelView, token, {"car_model_id": car_model.pk})),
+        (f"view: peças do modelo, página {last_page}", _view(PartsCarModelView, token, {"car_model_id": car_model.pk}, page=last_page)),
+        ("view: peças do modelo, cursor no fim", _view(
+            PartsCarModelView, token, {"car_model_id": car_model.pk}, cursor=deep_cursor, count="false",
+        )),
+        ("view: modelos da peça, página 1", _view(CarsModelPartView, token, {"part_id": part.pk})),
+    ]
+
+
+def _cursor_after(car_model, position: int) -> str:
+    links = CarModel.parts.through.objects.filter(carmodel_id=car_model.pk).values("part_id")
+    row = Part.objects.filter(pk__in=links).order_by("name", "id")[position]
+    return KeysetPaginator("name", ("name", "id"), 10).cursor_for(row)
+
+
+def run(parts_per_model: int, repeat: int):
+    """Retorna (cenário, mediana ms, p95 ms, consultas) para cada cenário."""
+    return [(name, *_medir(func, repeat)) for name, func in cenarios(parts_per_model)]
@@ -0,0 +1,95 @@
+import statistics
+import time
+import uuid
+from dataclasses import asdict, dataclass, fields, is_dataclass
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import List, Union, get_args, get_origin, get_type_hints
+
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+
+from comum.base_transport import BaseTransport
+from comum.models import Part, Users
+from comum.transports import PartTransport, UserTransport
+from comum.utils.serializer import serializer
+
+
+@dataclass(frozen=True)
+class CarModelPartsTransport(BaseTransport):
+    name: str
+    parts: List[PartTransport]
+
+
+def serializer_reflexivo(instance, dataclass_type):
+    """Versão anterior de `comum.utils.serializer.serializer`, mantida só para comparação."""
+    data = {}
+    type_hints = get_type_hints(dataclass_type)
+
+    for field in fields(dataclass_type):
+        value = getattr(instance, field.name)
+        field_type = type_hints[field.name]
+        origin = get_origin(field_type)
+
+        if origin is list:
+            item_type = get_args(field_type)[0]
+            related_manager = list(value.all()) if hasattr(value, "all") else value
+            data[field.name] = [serializer_reflexivo(item, item_type) for item in related_manager]
+
+        elif origin is Union and type(None) in get_args(field_type):
+            inner_type = get_args(field_type)[0]
+            if value is not None:
+                if is_dataclass(inner_type):
+                    data[field.name] = serializer_reflexivo(value, inner_type)
+                else:
+                    data[field.name] = value
+            else:
+                data[field.name] = None
+
+        elif is_dataclass(field_type):
+            data[field.name] = serializer_reflexivo(value, field_type)
+
+        elif isinstance(value, FieldFile):
+            data[field.name] = value.url if value else None
+
+        else:
+            data[field.name] = value
+
+    return asdict(dataclass_type(**data))
+
+
+def _medir(func, calls: int, repeat: int):
+    """Mediana e p95 (ms) de `calls` chamadas de `func`, em `repeat` rodadas."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(calls):
+            func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[min(len(timings) - 1, int(len(timings) * 0.95))], 0
+
+
+def run(calls: int, repeat: int):
+    """Retorna (cenário, mediana ms, p95 ms, consultas), sem acesso ao banco."""
+    user = Users(id=uuid.uuid4(), username="benchmark", email="benchmark@benchmark.local")
+    car_model = SimpleNamespace(
+        id=uuid.uuid4(),
+        name="MODELO",
+        parts=[
+            Part(
+                id=uuid.uuid4(), part_number=f"PN-{index:03}", name="PECA", details="Peça",
+                price=Decimal("10.00"), quantity=1, updated_at=timezone.now(),
+            )
+            for index in range(20)
+        ],
+    )
+    cenarios = [
+        ("UserTransport", lambda func: func(user, UserTransport)),
+        ("lista de 20 PartTransport", lambda func: func(car_model, CarModelPartsTransport)),
+    ]
+    rows = []
+    for name, call in cenarios:
+        for label, func in (("reflexivo", serializer_reflexivo), ("compilado", serializer)):
+            rows.append((f"serializer: {name}, {label} ({calls} chamadas)", *_medir(lambda: call(func), calls, repeat)))
+    return rows
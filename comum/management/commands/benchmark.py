@@ -0,0 +1,83 @@
+import random
+
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from comum.benchmarks import lists, metrics, relationships, serializer
+from comum.benchmarks.dados import Rollback, gerar_dados
+
+SUITES = ("relationships", "serializer", "lists", "metrics")
+
+
+class Command(BaseCommand):
+    help = (
+        "Roda os benchmarks: 'relationships' mede as listagens de peças de um modelo e de "
+        "modelos de uma peça sobre uma massa sintética (por padrão, 10 mil peças por modelo), "
+        "descartada ao final; 'serializer' compara o serializer compilado com o anterior; 'lists' "
+        "compara tempo e pico de memória das listagens com e sem instâncias do modelo; 'metrics' "
+        "mede o custo do middleware de métricas em requisições completas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("suites", nargs="*", choices=SUITES, help="Padrão: todos.")
+        parser.add_argument("--parts-per-model", type=int, default=10000)
+        parser.add_argument("--car-models", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--calls", type=int, default=1000, help="Chamadas por rodada nos microbenchmarks.")
+        parser.add_argument("--rows", type=int, default=1000, help="Linhas por listagem no benchmark 'lists'.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options["seed"])
+        suites = options["suites"] or SUITES
+        rows = []
+        if "relationships" in suites:
+            rows.extend(self._relationships(options))
+        if "serializer" in suites:
+            rows.extend(serializer.run(options["calls"], options["repeat"]))
+        if "lists" in suites:
+            rows.extend(self._lists(options))
+        if "metrics" in suites:
+            rows.extend(self._metrics(options))
+
+        width = max(len(name) for name, *_ in rows)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{'cenário'.ljust(width)}  {'mediana ms':>10}  {'p95 ms':>8}  consultas  {'pico KiB':>9}"
+        ))
+        for name, median, p95, queries, *memory in rows:
+            peak = f"{memory[0]:9.1f}" if memory else f"{'-':>9}"
+            self.stdout.write(f"{name.ljust(width)}  {median:10.2f}  {p95:8.2f}  {queries:>9}  {peak}")
+
+    def _relationships(self, options):
+        parts_per_model = options["parts_per_model"]
+        try:
+            with transaction.atomic():
+                self.stdout.write(
+                    f"Gerando {options['car_models']} modelos com {parts_per_model} peças cada..."
+                )
+                gerar_dados(parts_per_model * 2, options["car_models"], parts_per_model, 0)
+                rows = relationships.run(parts_per_model, options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+        return rows
+
+    def _lists(self, options):
+        try:
+            with transaction.atomic():
+                gerar_dados(options["rows"], options["rows"], 0, 0)
+                rows = lists.run(options["rows"], options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+        return rows
+
+    def _metrics(self, options):
+        try:
+            with transaction.atomic():
+                gerar_dados(options["rows"], options["rows"] // 10 or 1, 10, 0)
+                rows = metrics.run(options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+        return rows
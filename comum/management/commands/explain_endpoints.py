@@ -0,0 +1,104 @@
+import random
+import re
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from comum.benchmarks.dados import Rollback, gerar_dados
+from comum.models import CarModel, Part
+from comum.utils.pagination import KeysetPaginator
+
+
+def consultas():
+    """
+    Querysets equivalentes aos das views, na forma em que chegam ao banco. As
+    entradas com `True` no fim são contagens (o total da paginação por página).
+    Os deslocamentos vêm das peças não excluídas, as que as views listam.
+    """
+    parts = Part.objects.count()
+    car_model = CarModel.objects.order_by("name").first()
+    if not parts or car_model is None:
+        raise CommandError("Nenhuma peça ou modelo ativo; reduza --deleted-ratio.")
+    part = Part.objects.order_by("part_number")[parts // 2]
+    deep_offset = parts * 8 // 10
+    by_name = KeysetPaginator("name", ("name", "id"), 10)
+    name_cursor = by_name.cursor_for(Part.objects.order_by("name", "id")[deep_offset])
+    by_update = KeysetPaginator("updated_at", ("updated_at", "id"), 10)
+    update_cursor = by_update.cursor_for(Part.objects.order_by("updated_at", "id")[deep_offset])
+    feed = KeysetPaginator("updated_at", ("updated_at", "id"), 500)
+
+    return [
+        ("part: detalhe (id)", Part.objects.filter(pk=part.pk)),
+        ("part: busca por part_number", Part.objects.filter(part_number=part.part_number)),
+        ("part: lista página 1", Part.objects.all()[:10]),
+        ("part: lista OFFSET profundo", Part.objects.all()[deep_offset:deep_offset + 10]),
+        ("part: total da lista", Part.objects.all(), True),
+        ("part: cursor por nome, fim", by_name.page_queryset(Part.objects.all(), name_cursor)),
+        ("part: cursor por updated_at, fim", by_update.page_queryset(Part.objects.all(), update_cursor)),
+        ("part: feed de alterações", feed.page_queryset(Part.global_objects.all(), update_cursor)),
+        ("part: peças de um modelo", Part.objects.filter(parts__id=car_model.pk)[:10]),
+        ("car-model: lista por fabricante e ano", CarModel.objects.filter(manufacturer="FIAT", year=2010)[:10]),
+        ("car-model: total por fabricante e ano", CarModel.objects.filter(manufacturer="FIAT", year=2010), True),
+        ("car-model: cursor por nome", KeysetPaginator("name", ("name", "id"), 10).page_queryset(CarModel.objects.all(), None)),
+        ("car-model: modelos de uma peça", CarModel.objects.filter(parts__id=part.pk)[:10]),
+    ]
+
+
+def explain_count(queryset) -> str:
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) SELECT COUNT(*) FROM ({sql}) AS consulta", params)
+        return "\n".join(row[0] for row in cursor.fetchall())
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera uma massa sintética e roda EXPLAIN ANALYZE nas consultas de cada endpoint. "
+        "Os dados são descartados ao final, a menos que --keep seja informado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--parts", type=int, default=100000)
+        parser.add_argument("--car-models", type=int, default=1000)
+        parser.add_argument("--links", type=int, default=50, help="Peças vinculadas a cada modelo.")
+        parser.add_argument("--deleted-ratio", type=float, default=0.1)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--verbose-plans", action="store_true", help="Mostra o plano completo de cada consulta.")
+        parser.add_argument("--keep", action="store_true", help="Mantém os dados sintéticos no banco.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("EXPLAIN ANALYZE exige PostgreSQL.")
+        if not 0 <= options["deleted_ratio"] < 1:
+            raise CommandError("--deleted-ratio deve estar entre 0 e 1 (exclusive).")
+        if Part.global_objects.exists() and not options["keep"]:
+            self.stdout.write(self.style.WARNING("Há peças no banco; os planos incluem os dados existentes."))
+
+        random.seed(options["seed"])
+        try:
+            with transaction.atomic():
+                self.stdout.write(f"Gerando {options['parts']} peças e {options['car_models']} modelos...")
+                gerar_dados(options["parts"], options["car_models"], options["links"], options["deleted_ratio"])
+                self._explain(options["verbose_plans"])
+                if not options["keep"]:
+                    raise Rollback
+        except Rollback:
+            self.stdout.write("Dados sintéticos descartados.")
+
+    def _explain(self, verbose: bool):
+        rows = []
+        for name, queryset, *count in consultas():
+            plan = explain_count(queryset) if count else queryset.explain(analyze=True, buffers=True)
+            execution = re.search(r"Execution Time: ([\d.]+) ms", plan)
+            scans = sorted(set(re.findall(r"((?:Index Only|Index|Bitmap Heap|Bitmap Index|Seq) Scan)(?: using| on) (\w+)", plan)))
+            rows.append((name, float(execution.group(1)) if execution else 0.0, scans))
+            if verbose:
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                self.stdout.write(plan)
+
+        width = max(len(name) for name, _, _ in rows)
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{'consulta'.ljust(width)}  {'ms':>9}  acesso"))
+        for name, elapsed, scans in rows:
+            access = ", ".join(f"{scan} ({index})" if index else scan for scan, index in scans)
+            line = f"{name.ljust(width)}  {elapsed:9.3f}  {access}"
+            self.stdout.write(self.style.WARNING(line) if any(scan == "Seq Scan" for scan, _ in scans) else line)
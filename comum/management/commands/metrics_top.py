@@ -0,0 +1,138 @@
+import math
+import urllib.request
+from collections import defaultdict
+
+from django.core.management import BaseCommand, CommandError
+
+from comum.utils.metrics import parse
+
+SORT_KEYS = {
+    "p95": lambda route: route["p95_ms"],
+    "tempo": lambda route: route["duration_ms"] * route["requests"],
+    "consultas": lambda route: route["queries"],
+    "banco": lambda route: route["db_ms"] * route["requests"],
+    "n+1": lambda route: (route["n_plus_one"], route["repeated"]),
+}
+
+
+def _quantile(buckets, quantile: float) -> float:
+    """Quantil aproximado de um histograma (interpolação linear no bucket, como o histogram_quantile)."""
+    buckets = sorted(buckets)
+    total = buckets[-1][1] if buckets else 0
+    if not total:
+        return 0.0
+    rank = quantile * total
+    lower, below = 0.0, 0
+    for bound, count in buckets:
+        if count >= rank:
+            if math.isinf(bound):
+                return lower
+            return lower + (bound - lower) * (rank - below) / max(count - below, 1)
+        lower, below = bound, count
+    return lower
+
+
+def resumo(text: str) -> list:
+    """Uma linha por rota com as médias por requisição e o p95 do tempo total."""
+    routes = defaultdict(lambda: {
+        "requests": 0, "errors": 0, "n_plus_one": 0, "repeated": 0, "top_query": "",
+        "sums": defaultdict(float), "counts": defaultdict(float), "buckets": [],
+    })
+    top = {}
+    for name, labels, value in parse(text):
+        route = routes[labels.get("route", "")]
+        if name == "http_requests_total":
+            route["requests"] += value
+            if labels.get("status", "").startswith("5"):
+                route["errors"] += value
+        elif name == "http_request_duration_seconds_bucket":
+            route["buckets"].append((float(labels["le"]), value))
+        elif name.endswith("_sum"):
+            route["sums"][name[:-4]] += value
+        elif name.endswith("_count"):
+            route["counts"][name[:-6]] += value
+        elif name == "http_n_plus_one_requests_total":
+            route["n_plus_one"] = value
+        elif name == "http_repeated_queries_total":
+            route["repeated"] += value
+            if value > top.get(labels["route"], 0):
+                top[labels["route"]] = value
+                route["top_query"] = labels["query"]
+
+    def average(route, metric, scale=1.0):
+        count = route["counts"][metric]
+        return route["sums"][metric] / count * scale if count else 0.0
+
+    result = []
+    for name, route in routes.items():
+        if not route["requests"]:
+            continue
+        result.append({
+            "route": name,
+            "requests": int(route["requests"]),
+            "errors": int(route["errors"]),
+            "duration_ms": average(route, "http_request_duration_seconds", 1000),
+            "p95_ms": _quantile(route["buckets"], 0.95) * 1000,
+            "queries": average(route, "http_request_queries"),
+            "db_ms": average(route, "http_request_db_seconds", 1000),
+            "serialize_ms": average(route, "http_request_serialize_seconds", 1000),
+            "size_kib": average(route, "http_response_size_bytes", 1 / 1024),
+            "n_plus_one": int(route["n_plus_one"]),
+            "repeated": int(route["repeated"]),
+            "top_query": route["top_query"],
+        })
+    return result
+
+
+class Command(BaseCommand):
+    help = (
+        "Lista as rotas mais custosas a partir das métricas do endpoint metrics/ (URL, com --token) "
+        "ou de um arquivo com uma coleta salva."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="URL do endpoint metrics/ ou caminho de um arquivo.")
+        parser.add_argument("--token", help="Access token JWT de um usuário staff, para a URL.")
+        parser.add_argument("--sort", choices=SORT_KEYS, default="tempo", help="Padrão: tempo total gasto na rota.")
+        parser.add_argument("--limit", type=int, default=10)
+
+    def handle(self, *args, **options):
+        rows = resumo(self._read(options["source"], options["token"]))
+        if not rows:
+            self.stdout.write("Nenhuma requisição registrada.")
+            return
+        rows.sort(key=SORT_KEYS[options["sort"]], reverse=True)
+        rows = rows[:options["limit"]]
+
+        width = max(len(row["route"]) for row in rows)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{'rota'.ljust(width)}  {'req':>7}  {'erros':>5}  {'média ms':>9}  {'p95 ms':>8}  "
+            f"{'consultas':>9}  {'banco ms':>8}  {'serial. ms':>10}  {'KiB':>8}  {'N+1':>5}"
+        ))
+        for row in rows:
+            self.stdout.write(
+                f"{row['route'].ljust(width)}  {row['requests']:>7}  {row['errors']:>5}  {row['duration_ms']:9.2f}  "
+                f"{row['p95_ms']:8.2f}  {row['queries']:9.1f}  {row['db_ms']:8.2f}  {row['serialize_ms']:10.2f}  "
+                f"{row['size_kib']:8.1f}  {row['n_plus_one']:>5}"
+            )
+        for row in rows:
+            if row["top_query"]:
+                self.stdout.write(self.style.WARNING(
+                    f"{row['route']}: {row['repeated']} execuções repetidas; a mais frequente: {row['top_query']}"
+                ))
+
+    def _read(self, source: str, token) -> str:
+        if source.startswith(("http://", "https://")):
+            request = urllib.request.Request(source)
+            if token:
+                request.add_header("Authorization", f"Bearer {token}")
+            try:
+                with urllib.request.urlopen(request, timeout=10) as response:
+                    return response.read().decode()
+            except OSError as e:
+                raise CommandError(f"Não foi possível ler {source}: {e}")
+        try:
+            with open(source, encoding="utf-8") as file:
+                return file.read()
+        except OSError as e:
+            raise CommandError(f"Não foi possível ler {source}: {e}")
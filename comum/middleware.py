@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from comum.utils import metrics
+
+
+class RequestMetricsMiddleware:
+    """
+    Mede cada requisição (tempo total, tempo e quantidade de consultas,
+    consultas repetidas, serialização e tamanho da resposta) e agrega por rota
+    no `metrics.registry`. Só é carregado com `METRICS_ENABLED`.
+
+    Respostas em streaming contam apenas até o início do envio.
+
+    As consultas chegam pelo `metrics.execute`, instalado uma vez em cada
+    conexão (as já abertas e as criadas depois), em vez de um wrapper
+    colocado e retirado de todas as conexões a cada requisição.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        for connection in connections.all(initialized_only=True):
+            metrics.install(connection)
+        connection_created.connect(metrics.install, dispatch_uid="comum.metrics.install")
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with metrics.RequestSample() as sample:
+            response = self.get_response(request)
+        metrics.registry.record(
+            _route(request), response.status_code, time.perf_counter() - started, sample, _size(response)
+        )
+        return response
+
+
+def _route(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "<sem rota>"
+    return match.url_name or match.route
+
+
+def _size(response):
+    if response.streaming:
+        return None
+    return len(response.content)
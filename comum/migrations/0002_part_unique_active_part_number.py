@@ -0,0 +1,69 @@
+# Generated by Django 5.1.5 on 2026-10-18 07:24
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils import timezone
+
+
+def soft_delete_duplicated_parts(apps, schema_editor):
+    """
+    Mantém apenas a peça mais recente de cada part_number ativo, para que a
+    constraint única possa ser criada em bases com uploads repetidos. Os
+    vínculos com modelos de carro das peças descartadas passam para a mantida.
+    """
+    Part = apps.get_model("comum", "Part")
+    links = apps.get_model("comum", "CarModel").parts.through
+    active_parts = Part.objects.filter(deleted_at__isnull=True)
+    duplicated_numbers = (
+        active_parts.values("part_number")
+        .annotate(total=Count("id"))
+        .filter(total__gt=1)
+        .values("part_number")
+    )
+    duplicates = (
+        active_parts.filter(part_number__in=duplicated_numbers)
+        .order_by("part_number", "-updated_at", "id")
+        .values_list("id", "part_number")
+    )
+
+    now = timezone.now()
+    last_part_number = None
+    kept_id = None
+    # Peça descartada -> peça mantida do mesmo part_number.
+    pending = {}
+    for part_id, part_number in duplicates.iterator(chunk_size=5000):
+        if part_number != last_part_number:
+            last_part_number, kept_id = part_number, part_id
+            continue
+        pending[part_id] = kept_id
+        if len(pending) >= 1000:
+            _discard(Part, links, pending, now)
+            pending = {}
+
+    if pending:
+        _discard(Part, links, pending, now)
+
+
+def _discard(Part, links, kept_by_discarded, now):
+    moved = links.objects.filter(part_id__in=kept_by_discarded).values_list("carmodel_id", "part_id")
+    links.objects.bulk_create(
+        [links(carmodel_id=car_model_id, part_id=kept_by_discarded[part_id]) for car_model_id, part_id in moved],
+        ignore_conflicts=True,
+    )
+    links.objects.filter(part_id__in=kept_by_discarded).delete()
+    Part.objects.filter(id__in=kept_by_discarded).update(deleted_at=now)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comum', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(soft_delete_duplicated_parts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='part',
+            constraint=models.UniqueConstraint(condition=models.Q(('deleted_at__isnull', True)), fields=('part_number',), name='unique_active_part_number'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.5 on 2026-10-18 07:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comum', '0003_importjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='carmodel',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['name', 'id'], name='carmodel_active_name_id'),
+        ),
+        migrations.AddIndex(
+            model_name='part',
+            index=models.Index(fields=['updated_at', 'id'], name='part_updated_at_id'),
+        ),
+        migrations.AddIndex(
+            model_name='part',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['name', 'id'], name='part_active_name_id'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.5 on 2026-10-18 07:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comum', '0004_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='carmodel',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['manufacturer', 'year'], name='carmodel_active_mfr_year'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.1.5 on 2026-10-18 07:44
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# O part_number é quebrado nos separadores: o parser trataria "AMX-44712"
+# como "amx" e o inteiro "-44712".
+SEARCH_VECTOR = """
+    setweight(to_tsvector('simple', regexp_replace(coalesce({row}part_number, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') ||
+    setweight(to_tsvector('portuguese', coalesce({row}name, '')), 'A') ||
+    setweight(to_tsvector('portuguese', coalesce({row}details, '')), 'B')
+"""
+
+FORWARD_SQL = [
+    f"""
+    CREATE FUNCTION comum_part_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := {SEARCH_VECTOR.format(row="NEW.")};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER comum_part_search_vector
+    BEFORE INSERT OR UPDATE OF part_number, name, details ON comum_part
+    FOR EACH ROW EXECUTE FUNCTION comum_part_search_vector()
+    """,
+    f"UPDATE comum_part SET search_vector = {SEARCH_VECTOR.format(row='')}",
+    "CREATE INDEX part_search_vector ON comum_part USING gin (search_vector) WHERE deleted_at IS NULL",
+]
+
+TRIGRAM_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX part_number_trgm ON comum_part USING gin (part_number gin_trgm_ops) WHERE deleted_at IS NULL",
+]
+
+BACKWARD_SQL = [
+    "DROP INDEX IF EXISTS part_number_trgm",
+    "DROP INDEX IF EXISTS part_search_vector",
+    "DROP TRIGGER IF EXISTS comum_part_search_vector ON comum_part",
+    "DROP FUNCTION IF EXISTS comum_part_search_vector()",
+]
+
+
+def create_search(apps, schema_editor):
+    """
+    Só no PostgreSQL. O pg_trgm é opcional: sem a extensão disponível no
+    servidor a busca continua, sem a similaridade do part_number.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for sql in FORWARD_SQL:
+        schema_editor.execute(sql)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        trigram = cursor.fetchone() is not None
+    if trigram:
+        for sql in TRIGRAM_SQL:
+            schema_editor.execute(sql)
+
+
+def drop_search(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for sql in BACKWARD_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comum', '0006_carmodel_manufacturer_year_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='part',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search, drop_search),
+    ]
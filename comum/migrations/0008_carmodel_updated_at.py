@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comum', '0007_part_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='carmodel',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
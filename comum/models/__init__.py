@@ -1,3 +1,4 @@
 from .part import Part
 from .car_model import CarModel
-from .user import Users
\ No newline at end of file
+from .user import Users
+from .import_job import ImportJob
\ No newline at end of file
@@ -8,8 +8,28 @@ class CarModel(SoftDeleteBaseModel):
     manufacturer = models.CharField(max_length=60)
     year = models.IntegerField()
     parts = models.ManyToManyField("Part", blank=True, related_name='parts')
+    updated_at = models.DateTimeField(auto_now=True)
    
    
     class Meta:
         verbose_name = "Car model"
-        verbose_name_plural = "Car models"
\ No newline at end of file
+        verbose_name_plural = "Car models"
+        indexes = [
+            models.Index(
+                fields=["name", "id"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="carmodel_active_name_id",
+            ),
+            # Filtro da listagem por fabricante e ano.
+            models.Index(
+                fields=["manufacturer", "year"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="carmodel_active_mfr_year",
+            ),
+        ]
+
+    def save(self, *args, update_fields=None, **kwargs):
+        # Como em Part: exclusão e restauração também contam como alteração.
+        if update_fields and "updated_at" not in update_fields:
+            update_fields = [*update_fields, "updated_at"]
+        super().save(*args, update_fields=update_fields, **kwargs)
\ No newline at end of file
@@ -0,0 +1,63 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class ImportJob(models.Model):
+    class State(models.TextChoices):
+        PENDING = "pending", "Pendente"
+        RUNNING = "running", "Em andamento"
+        SUCCEEDED = "succeeded", "Concluída"
+        FAILED = "failed", "Falhou"
+
+    id = models.UUIDField(
+        primary_key=True, default=uuid.uuid4, editable=False, blank=True
+    )
+    file_name = models.CharField(max_length=255)
+    file_hash = models.CharField(max_length=64, db_index=True)
+    mode = models.CharField(max_length=10)
+    state = models.CharField(max_length=10, choices=State.choices, default=State.PENDING)
+    total_bytes = models.BigIntegerField(default=0)
+    bytes_processed = models.BigIntegerField(default=0)
+    rows_processed = models.BigIntegerField(default=0)
+    rows_inserted = models.BigIntegerField(default=0)
+    rows_updated = models.BigIntegerField(default=0)
+    rows_skipped = models.BigIntegerField(default=0)
+    rows_failed = models.BigIntegerField(default=0)
+    error_report = models.JSONField(default=list, blank=True)
+    message = models.TextField(blank=True, default="")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name="import_jobs"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Import job"
+        verbose_name_plural = "Import jobs"
+
+    @property
+    def elapsed_seconds(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed_seconds
+        return round(self.rows_processed / elapsed, 1) if elapsed else 0.0
+
+    @property
+    def eta_seconds(self):
+        """
+        Tempo restante estimado pela vazão em bytes, já que o total de linhas
+        do arquivo só é conhecido ao fim da leitura.
+        """
+        if self.state != self.State.RUNNING or not self.bytes_processed:
+            return None
+        elapsed = self.elapsed_seconds
+        remaining = max(self.total_bytes - self.bytes_processed, 0)
+        return round(remaining * elapsed / self.bytes_processed, 1)
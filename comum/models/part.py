@@ -1,5 +1,29 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django_inscode.models import SoftDeleteBaseModel
+from django_softdelete.managers import DeletedManager, GlobalManager, SoftDeleteManager
+
+
+class DeferSearchVectorMixin:
+    """
+    O `search_vector` só é usado pela busca, dentro da própria consulta; as
+    demais leituras (detalhe, PATCH/PUT, feed, cache de detalhe) não o carregam.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().defer("search_vector")
+
+
+class PartManager(DeferSearchVectorMixin, SoftDeleteManager):
+    pass
+
+
+class DeletedPartManager(DeferSearchVectorMixin, DeletedManager):
+    pass
+
+
+class GlobalPartManager(DeferSearchVectorMixin, GlobalManager):
+    pass
 
 
 class Part(SoftDeleteBaseModel):
@@ -9,7 +33,38 @@ class Part(SoftDeleteBaseModel):
     price = models.DecimalField(decimal_places=2, max_digits=10)
     quantity = models.IntegerField()
     updated_at = models.DateTimeField(auto_now=True)
+    # Mantido por trigger no PostgreSQL (migração 0007), inclusive nas
+    # importações por COPY; fica nulo nos demais bancos.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = PartManager()
+    deleted_objects = DeletedPartManager()
+    global_objects = GlobalPartManager()
 
     class Meta:
         verbose_name = "Part"
-        verbose_name_plural = "Parts"
\ No newline at end of file
+        verbose_name_plural = "Parts"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["part_number"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="unique_active_part_number",
+            ),
+        ]
+        indexes = [
+            # Feed de alterações (inclui as excluídas) e paginação por updated_at.
+            models.Index(fields=["updated_at", "id"], name="part_updated_at_id"),
+            # Paginação por nome, só sobre as peças não excluídas.
+            models.Index(
+                fields=["name", "id"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="part_active_name_id",
+            ),
+        ]
+
+    def save(self, *args, update_fields=None, **kwargs):
+        # O delete()/restore() do soft delete gravam só os campos de exclusão;
+        # o updated_at precisa mudar junto para a exclusão aparecer no feed.
+        if update_fields and "updated_at" not in update_fields:
+            update_fields = [*update_fields, "updated_at"]
+        super().save(*args, update_fields=update_fields, **kwargs)
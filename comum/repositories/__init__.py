@@ -1,3 +1,4 @@
 from .car_model import car_model_repository
 from .part import part_repository
-from .user import user_repository
\ No newline at end of file
+from .user import user_repository
+from .import_job import import_job_repository
\ No newline at end of file
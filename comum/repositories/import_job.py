@@ -0,0 +1,4 @@
+from django_inscode.repositories import Repository
+from comum.models import ImportJob
+
+import_job_repository = Repository(ImportJob)
\ No newline at end of file
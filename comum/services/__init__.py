@@ -1,4 +1,6 @@
 from .part import part_service
 from .car_model import car_model_service
 from .user import user_service
-from .auth import auth_service
\ No newline at end of file
+from .auth import auth_service
+from .part_import import part_import_service
+from .import_job import import_job_service
\ No newline at end of file
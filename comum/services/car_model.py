@@ -1,5 +1,14 @@
+from functools import partial
+from typing import Dict, Iterable, Set, Tuple
+from uuid import UUID
+
+from django.db import transaction
+from django.db.models import Exists, QuerySet
 from django_inscode.services import ModelService
+from comum.models import CarModel, Part
 from comum.repositories import car_model_repository
+from comum.utils.detail_cache import detail_cache
+from comum.utils.fitment import fitment_index, indexed
 
 
 class CarModelService(ModelService):
@@ -9,4 +18,61 @@ class CarModelService(ModelService):
         self.car_model_repository = car_model_repository
         super().__init__(car_model_repository)
 
-car_model_service = CarModelService()
\ No newline at end of file
+    def read(self, id: UUID, context: Dict) -> CarModel:
+        """Leitura por id através do `detail_cache`."""
+        return detail_cache.get(CarModel, id, lambda: super(CarModelService, self).read(id, context))
+
+    def of_part(self, car_models: QuerySet, part_id: UUID) -> QuerySet:
+        """
+        Restringe `car_models` aos modelos vinculados à peça; nada para uma peça
+        excluída. Como `PartService.of_car_model`, do outro lado do vínculo.
+        """
+        car_model_ids = indexed(lambda: fitment_index.car_models_for(part_id))
+        if car_model_ids is not None:
+            return car_models.filter(Exists(Part.objects.filter(pk=part_id)), pk__in=car_model_ids)
+        links = CarModel.parts.through.objects.filter(part_id=part_id, part__deleted_at__isnull=True)
+        return car_models.filter(pk__in=links.values("carmodel_id"))
+
+    def associate_parts(self, car_model_ids: Iterable[UUID], part_ids: Iterable[UUID]) -> Tuple[Set[UUID], Set[UUID]]:
+        """
+        Associa todas as peças a todos os modelos com um número fixo de consultas.
+        Retorna os ids de modelos e de peças encontrados.
+        """
+        car_models = set(CarModel.objects.filter(pk__in=set(car_model_ids)).values_list("pk", flat=True))
+        parts = set(Part.objects.filter(pk__in=set(part_ids)).values_list("pk", flat=True))
+        if not car_models or not parts:
+            return car_models, parts
+
+        through = CarModel.parts.through
+        existing = set(
+            through.objects.filter(carmodel_id__in=car_models, part_id__in=parts).values_list("carmodel_id", "part_id")
+        )
+        links = [
+            (car_model_id, part_id)
+            for car_model_id in car_models
+            for part_id in parts
+            if (car_model_id, part_id) not in existing
+        ]
+        through.objects.bulk_create(
+            [through(carmodel_id=car_model_id, part_id=part_id) for car_model_id, part_id in links],
+            ignore_conflicts=True,
+        )
+        # O bulk_create não envia m2m_changed; o índice em memória é avisado aqui.
+        transaction.on_commit(partial(fitment_index.add, links))
+        return car_models, parts
+
+    def remove_parts(self, car_model: CarModel, part_ids: Iterable[UUID]) -> Set[UUID]:
+        """
+        Remove as associações do modelo com as peças informadas, com uma consulta e
+        um delete. Retorna os ids das peças que estavam associadas.
+        """
+        links = CarModel.parts.through.objects.filter(carmodel_id=car_model.pk)
+        removed = set(
+            links.filter(part_id__in=set(part_ids), part__deleted_at__isnull=True).values_list("part_id", flat=True)
+        )
+        if removed:
+            links.filter(part_id__in=removed).delete()
+            transaction.on_commit(partial(fitment_index.remove, [(car_model.pk, part_id) for part_id in removed]))
+        return removed
+
+car_model_service = CarModelService()
@@ -0,0 +1,91 @@
+from typing import Optional
+
+from django.db.models import F
+from django.utils import timezone
+from django_inscode.services import ModelService
+
+from comum.models import ImportJob
+from comum.repositories import import_job_repository
+from comum.services.part_import import ImportReport
+
+# Campos do ImportJob alimentados, na ordem, pelos contadores do ImportReport.
+PROGRESS_FIELDS = (
+    ("rows_processed", "rows_read"),
+    ("rows_inserted", "inserted"),
+    ("rows_updated", "updated"),
+    ("rows_skipped", "skipped"),
+    ("rows_failed", "failed"),
+)
+
+
+class ImportProgress:
+    """
+    Repassa ao ImportJob o avanço de uma importação, lote a lote. Grava só a
+    diferença desde a última chamada, com incrementos atômicos, para que as
+    partes de uma importação paralela atualizem o mesmo registro.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.seen = dict.fromkeys([field for field, _ in PROGRESS_FIELDS], 0)
+        self.bytes_seen = 0
+
+    def __call__(self, report: ImportReport, bytes_read: int) -> None:
+        changes = {}
+        for field, counter in PROGRESS_FIELDS:
+            delta = getattr(report, counter) - self.seen[field]
+            if delta:
+                changes[field] = F(field) + delta
+                self.seen[field] += delta
+        if bytes_read != self.bytes_seen:
+            changes["bytes_processed"] = F("bytes_processed") + (bytes_read - self.bytes_seen)
+            self.bytes_seen = bytes_read
+        if changes:
+            ImportJob.objects.filter(pk=self.job_id).update(**changes)
+
+
+class ImportJobService(ModelService):
+    def __init__(
+        self,
+    ):
+        self.import_job_repository = import_job_repository
+        super().__init__(import_job_repository)
+
+    def find_active(self, file_hash: str) -> Optional[ImportJob]:
+        """Importação do mesmo conteúdo que não falhou (pendente, em andamento ou concluída)."""
+        return (
+            ImportJob.objects.filter(file_hash=file_hash)
+            .exclude(state=ImportJob.State.FAILED)
+            .order_by("-created_at")
+            .first()
+        )
+
+    def progress(self, job_id) -> Optional[ImportProgress]:
+        return ImportProgress(job_id) if job_id else None
+
+    def start(self, job_id) -> None:
+        if job_id:
+            ImportJob.objects.filter(pk=job_id).update(
+                state=ImportJob.State.RUNNING, started_at=timezone.now()
+            )
+
+    def finish(self, job_id, report: ImportReport) -> None:
+        """Fecha o job com os totais do relatório, que prevalecem sobre os parciais."""
+        if job_id:
+            ImportJob.objects.filter(pk=job_id).update(
+                state=ImportJob.State.SUCCEEDED,
+                finished_at=timezone.now(),
+                bytes_processed=F("total_bytes"),
+                error_report=report.errors,
+                **{field: getattr(report, counter) for field, counter in PROGRESS_FIELDS},
+            )
+
+    def fail(self, job_id, message: str) -> None:
+        """Marca o job como falho; numa importação paralela vale a primeira falha."""
+        if job_id:
+            ImportJob.objects.filter(pk=job_id).exclude(state=ImportJob.State.FAILED).update(
+                state=ImportJob.State.FAILED, finished_at=timezone.now(), message=message
+            )
+
+
+import_job_service = ImportJobService()
@@ -1,5 +1,28 @@
+import re
+from datetime import datetime, timedelta
+from decimal import Decimal
+from difflib import SequenceMatcher
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import connection
+from django.db.models import Count, Exists, F, Func, IntegerField, Q, QuerySet, Subquery, Value
+from django.utils import timezone
+from django_inscode import exceptions
 from django_inscode.services import ModelService
+from comum.models import CarModel, Part
 from comum.repositories import part_repository
+from comum.utils.detail_cache import detail_cache
+from comum.utils.fitment import fitment_index, indexed
+from comum.utils.pagination import KeysetPaginator
+
+SEARCH_CONFIG = "portuguese"
+
+FITMENT_MATCH_ANY = "any"
+FITMENT_MATCH_ALL = "all"
 
 
 class PartService(ModelService):
@@ -9,4 +32,207 @@ class PartService(ModelService):
         self.part_repository = part_repository
         super().__init__(part_repository)
 
-part_service = PartService()
\ No newline at end of file
+    def read(self, id: UUID, context: Dict) -> Part:
+        """Leitura por id através do `detail_cache`."""
+        return detail_cache.get(Part, id, lambda: super(PartService, self).read(id, context))
+
+    def changes(self, cursor: Optional[str], limit: int) -> Tuple[List[Part], Optional[str], bool]:
+        """
+        Peças alteradas depois do cursor, incluindo as excluídas (tombstones), em
+        ordem de (updated_at, id). Retorna as peças, o cursor para a próxima
+        chamada e se há mais alterações já disponíveis.
+
+        Só entram alterações com mais de `PART_CHANGES_SAFETY_LAG` segundos e,
+        no PostgreSQL, anteriores ao início da transação aberta mais antiga que
+        está gravando em comum_part: ela pode gravar um updated_at anterior ao
+        último já entregue (ex.: um lote longo da importação de CSV), e seria
+        pulada pelo cliente. Essa espera vai no máximo até
+        `PART_CHANGES_MAX_HOLD` segundos atrás, para que uma transação esquecida
+        aberta não pare o feed; alterações de transações mais longas que isso
+        podem ser puladas.
+        """
+        now = timezone.now()
+        horizon = now - timedelta(seconds=settings.PART_CHANGES_SAFETY_LAG)
+        oldest_write = self._oldest_open_write()
+        if oldest_write is not None:
+            horizon = min(horizon, max(oldest_write, now - timedelta(seconds=settings.PART_CHANGES_MAX_HOLD)))
+        paginator = KeysetPaginator("updated_at", ("updated_at", "id"), limit)
+        parts, next_cursor = paginator.paginate(Part.global_objects.filter(updated_at__lte=horizon), cursor)
+        has_more = next_cursor is not None
+        # Mesmo na última página o cliente recebe o cursor da última alteração,
+        # para continuar dali na próxima sincronização.
+        if parts:
+            next_cursor = paginator.cursor_for(parts[-1])
+        return parts, next_cursor or cursor, has_more
+
+    @staticmethod
+    def _oldest_open_write() -> Optional[datetime]:
+        """
+        Início da transação mais antiga, em outra conexão, que está gravando em
+        comum_part (tem o RowExclusiveLock da tabela, pego por INSERT, UPDATE e
+        DELETE e mantido até o fim da transação). Escritas em outras tabelas não
+        contam. `None` fora do PostgreSQL.
+        """
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            # pg_stat_activity é lido uma vez por transação; sem isto, a
+            # segunda leitura numa mesma transação repetiria a primeira.
+            cursor.execute("SELECT pg_stat_clear_snapshot()")
+            cursor.execute(
+                "SELECT min(activity.xact_start) FROM pg_stat_activity activity "
+                "JOIN pg_locks lock ON lock.pid = activity.pid "
+                "WHERE lock.relation = %s::regclass AND lock.mode = 'RowExclusiveLock' "
+                "AND activity.pid <> pg_backend_pid() AND activity.datname = current_database()",
+                [Part._meta.db_table],
+            )
+            return cursor.fetchone()[0]
+
+    def search(self, term: str, limit: int) -> List[Part]:
+        """
+        Peças não excluídas que casam com `term` em nome, detalhes ou part_number,
+        da mais para a menos relevante, com a relevância em `rank`. Cada palavra
+        do termo vale como prefixo ("amortec diant" acha "Amortecedor dianteiro").
+        """
+        words = [word.lower() for word in re.findall(r"\w+", term)]
+        if not words:
+            return []
+        if connection.vendor != "postgresql":
+            return self._search_in_process(term, words, limit)
+
+        # Consulta montada a partir de palavras já saneadas, por isso "raw".
+        query = SearchQuery(" & ".join(f"{word}:*" for word in words), config=SEARCH_CONFIG, search_type="raw")
+        condition = Q(search_vector=query)
+        rank = SearchRank(F("search_vector"), query)
+        if self.trigram_available:
+            # Com o índice de trigramas, trechos do part_number também usam índice.
+            condition |= Q(part_number__icontains=term) | Q(part_number__trigram_similar=term)
+            rank = rank + TrigramSimilarity("part_number", Value(term))
+        # Termos comuns casam com muitas peças; só as primeiras candidatas
+        # encontradas pelos índices são ordenadas por relevância.
+        candidates = Part.objects.filter(condition).values("pk")[:settings.PART_SEARCH_CANDIDATES]
+        return list(
+            Part.objects.filter(pk__in=candidates).annotate(rank=rank).order_by("-rank", "name", "id")[:limit]
+        )
+
+    @cached_property
+    def trigram_available(self) -> bool:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            return cursor.fetchone() is not None
+
+    def _search_in_process(self, term: str, words: List[str], limit: int) -> List[Part]:
+        """Alternativa sem PostgreSQL (testes com SQLite): filtra no banco e ordena aqui."""
+        condition = Q()
+        for word in words:
+            condition &= Q(name__icontains=word) | Q(details__icontains=word) | Q(part_number__icontains=word)
+        parts = list(Part.objects.filter(condition | Q(part_number__icontains=term)))
+        for part in parts:
+            name, details = part.name.lower(), part.details.lower()
+            part.rank = (
+                sum(1.0 if word in name else 0.4 if word in details else 0.0 for word in words)
+                + SequenceMatcher(None, term.lower(), part.part_number.lower()).ratio()
+            )
+        parts.sort(key=lambda part: (-part.rank, part.name, str(part.id)))
+        return parts[:limit]
+
+    def export(
+        self,
+        since: Optional[datetime] = None,
+        name: Optional[str] = None,
+        part_number: Optional[str] = None,
+        price_min: Optional[Decimal] = None,
+        price_max: Optional[Decimal] = None,
+    ) -> QuerySet:
+        """
+        Peças não excluídas para exportação, em ordem de (updated_at, id):
+        alteradas a partir de `since` (inclusive), com `name` contendo o trecho
+        informado, `part_number` exato e preço na faixa.
+        """
+        parts = Part.objects.all()
+        if since is not None:
+            parts = parts.filter(updated_at__gte=since)
+        if name:
+            parts = parts.filter(name__icontains=name)
+        if part_number:
+            parts = parts.filter(part_number=part_number)
+        if price_min is not None:
+            parts = parts.filter(price__gte=price_min)
+        if price_max is not None:
+            parts = parts.filter(price__lte=price_max)
+        return parts.order_by("updated_at", "id")
+
+    def fitting(
+        self,
+        car_model_ids: Optional[Iterable[UUID]] = None,
+        match: str = FITMENT_MATCH_ANY,
+        manufacturer: Optional[str] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+    ) -> QuerySet:
+        """
+        Peças compatíveis com um conjunto de modelos: com algum deles (`any`) ou
+        com todos (`all`). O conjunto são os modelos informados em `car_model_ids`
+        e/ou que atendem aos filtros de fabricante e faixa de ano. Um id de
+        `car_model_ids` inexistente ou excluído é um `BadRequest` (com os ids em
+        `errors`): ignorá-lo mudaria a pergunta, e com `all` a resposta seria mais
+        ampla que a pedida.
+
+        Responde pelo `fitment_index` em memória conforme `FITMENT_QUERY_BACKEND`
+        (ver `comum.utils.fitment.indexed`); senão, com uma única consulta sobre a
+        tabela de vínculos.
+        """
+        car_models = CarModel.objects.all()
+        if car_model_ids is not None:
+            car_model_ids = list(dict.fromkeys(car_model_ids))
+            found = set(car_models.filter(pk__in=car_model_ids).values_list("pk", flat=True))
+            missing = [str(car_model_id) for car_model_id in car_model_ids if car_model_id not in found]
+            if missing:
+                raise exceptions.BadRequest(
+                    message="Modelos de carro inexistentes ou excluídos.", errors={"car_models": missing}
+                )
+            car_models = car_models.filter(pk__in=found)
+        if manufacturer:
+            car_models = car_models.filter(manufacturer=manufacturer)
+        if year_min is not None:
+            car_models = car_models.filter(year__gte=year_min)
+        if year_max is not None:
+            car_models = car_models.filter(year__lte=year_max)
+
+        part_ids = indexed(lambda: self._fitting_in_memory(car_models, match))
+        if part_ids is not None:
+            return Part.objects.filter(pk__in=part_ids)
+        return self._fitting_in_sql(car_models, match)
+
+    def of_car_model(self, parts: QuerySet, car_model_id: UUID) -> QuerySet:
+        """
+        Restringe `parts` às peças vinculadas ao modelo; nada para um modelo
+        excluído. Pelo `fitment_index`, quando ele responde (ver `fitting`); senão
+        por um semi-join na tabela de vínculos. Cada peça aparece uma vez.
+        """
+        part_ids = indexed(lambda: fitment_index.parts_for(car_model_id))
+        if part_ids is not None:
+            # O modelo vivo é conferido na própria consulta da página.
+            return parts.filter(Exists(CarModel.objects.filter(pk=car_model_id)), pk__in=part_ids)
+        links = CarModel.parts.through.objects.filter(carmodel_id=car_model_id, carmodel__deleted_at__isnull=True)
+        return parts.filter(pk__in=links.values("part_id"))
+
+    def _fitting_in_sql(self, car_models: QuerySet, match: str) -> QuerySet:
+        links = CarModel.parts.through.objects.filter(carmodel_id__in=car_models.values("pk"))
+        if match == FITMENT_MATCH_ALL:
+            # GROUP BY part_id HAVING COUNT(*) = (total de modelos do conjunto).
+            total = car_models.order_by().values(total=Func(F("pk"), function="COUNT", output_field=IntegerField()))
+            links = (
+                links.order_by().values("part_id")
+                .annotate(models=Count("carmodel_id"))
+                .filter(models=Subquery(total))
+            )
+        return Part.objects.filter(pk__in=links.values("part_id"))
+
+    def _fitting_in_memory(self, car_models: QuerySet, match: str) -> set:
+        ids = list(car_models.values_list("pk", flat=True))
+        if match == FITMENT_MATCH_ALL:
+            return fitment_index.parts_for_all(ids) if ids else set()
+        return fitment_index.parts_for_any(ids)
+
+part_service = PartService()
@@ -0,0 +1,521 @@
+import csv
+import logging
+import math
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from functools import partial
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.utils import timezone
+
+from comum.models import Part
+from comum.utils.detail_cache import detail_cache
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ("part_number", "name", "details", "price", "quantity")
+
+IMPORT_MODE_INSERT = "insert"
+IMPORT_MODE_UPSERT = "upsert"
+IMPORT_MODES = (IMPORT_MODE_INSERT, IMPORT_MODE_UPSERT)
+
+UPSERT_FIELDS = ("price", "quantity", "details", "name")
+UPDATE_BATCH_SIZE = 1000
+
+IMPORT_BACKEND_AUTO = "auto"
+IMPORT_BACKEND_COPY = "copy"
+IMPORT_BACKEND_ORM = "orm"
+IMPORT_BACKENDS = (IMPORT_BACKEND_AUTO, IMPORT_BACKEND_COPY, IMPORT_BACKEND_ORM)
+
+# Faixa do IntegerField (`quantity`) aceita em todos os bancos.
+QUANTITY_RANGE = (-2 ** 31, 2 ** 31 - 1)
+
+STAGING_TABLE = "comum_part_import_staging"
+STAGING_COLUMNS = ("id", "part_number", "name", "details", "price", "quantity")
+
+
+class ImportFileError(ValueError):
+    """Arquivo CSV que não pode ser importado (cabeçalho ausente ou inválido)."""
+
+
+class RowValidationError(ValueError):
+    """Linha do CSV rejeitada durante a validação."""
+
+
+@dataclass
+class ChunkResult:
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    rejected: List[tuple] = field(default_factory=list)
+
+
+@dataclass
+class ImportReport:
+    rows_read: int = 0
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    chunk_timings: List[float] = field(default_factory=list)
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        if not self.elapsed:
+            return 0.0
+        return self.rows_read / self.elapsed
+
+    def add_error(self, location: Dict[str, Any], row: Optional[Dict[str, Any]], message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.CSV_IMPORT_MAX_ERRORS:
+            self.errors.append({**location, "row": row, "error": message})
+
+    def summary(self) -> str:
+        timings = self.chunk_timings or [0.0]
+        return (
+            f"{self.rows_read} linhas lidas, {self.inserted} inseridas, {self.updated} atualizadas, "
+            f"{self.skipped} sem alteração, {self.failed} rejeitadas "
+            f"em {self.elapsed:.2f}s ({self.rows_per_second:.0f} linhas/s; "
+            f"{len(self.chunk_timings)} lotes, média {sum(timings) / len(timings):.3f}s, "
+            f"máx {max(timings):.3f}s por lote)"
+        )
+
+    @classmethod
+    def combine(cls, results: List[Dict[str, Any]]) -> "ImportReport":
+        """
+        Junta os relatórios (`as_dict`) das partes de uma importação paralela.
+        """
+        report = cls()
+        for result in results:
+            report.rows_read += result["rows_read"]
+            report.inserted += result["inserted"]
+            report.updated += result["updated"]
+            report.skipped += result["skipped"]
+            report.failed += result["failed"]
+            report.elapsed = max(report.elapsed, result["elapsed"])
+            report.chunk_timings.extend(result["chunk_timings"])
+            free = settings.CSV_IMPORT_MAX_ERRORS - len(report.errors)
+            report.errors.extend(result["errors"][:max(free, 0)])
+        return report
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "rows_read": self.rows_read,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "elapsed": round(self.elapsed, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "chunk_timings": [round(timing, 4) for timing in self.chunk_timings],
+            "errors": self.errors,
+        }
+
+
+def _as_text(values: Dict[str, Any]) -> Dict[str, str]:
+    return {key: str(value) for key, value in values.items()}
+
+
+def _max_length(field_name: str) -> int:
+    return Part._meta.get_field(field_name).max_length
+
+
+def coerce_row(row: Dict[str, Optional[str]]) -> Dict[str, Any]:
+    """
+    Valida uma linha do CSV e converte os valores para os tipos do modelo `Part`.
+    """
+    values = {}
+    for column in ("part_number", "name", "details"):
+        value = (row.get(column) or "").strip()
+        if not value:
+            raise RowValidationError(f"Campo '{column}' obrigatório.")
+        if len(value) > _max_length(column):
+            raise RowValidationError(
+                f"Campo '{column}' excede {_max_length(column)} caracteres."
+            )
+        values[column] = value
+
+    raw_price = (row.get("price") or "").strip()
+    if "," in raw_price and "." not in raw_price:
+        raw_price = raw_price.replace(",", ".")
+    try:
+        price = Decimal(raw_price).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise RowValidationError(f"Preço inválido: '{row.get('price')}'.")
+    if not price.is_finite() or price < 0 or price >= Decimal("100000000"):
+        raise RowValidationError(f"Preço fora do intervalo permitido: '{row.get('price')}'.")
+    values["price"] = price
+
+    try:
+        quantity = int((row.get("quantity") or "").strip())
+    except ValueError:
+        raise RowValidationError(f"Quantidade inválida: '{row.get('quantity')}'.")
+    if not QUANTITY_RANGE[0] <= quantity <= QUANTITY_RANGE[1]:
+        raise RowValidationError(f"Quantidade fora do intervalo permitido: '{row.get('quantity')}'.")
+    values["quantity"] = quantity
+
+    return values
+
+
+class _LineReader:
+    """
+    Itera as linhas de um intervalo de bytes do arquivo, acompanhando a posição
+    já consumida (usada para localizar linhas rejeitadas e medir o progresso).
+    """
+
+    def __init__(self, file, start: int, end: int):
+        self.file = file
+        self.position = start
+        self.end = end
+        file.seek(start)
+
+    def __iter__(self) -> Iterator[str]:
+        while self.position < self.end:
+            line = self.file.readline()
+            if not line:
+                return
+            self.position += len(line)
+            yield line.decode("utf-8")
+
+
+class PartImportService:
+    """
+    Importa peças a partir de um arquivo CSV em lotes.
+
+    O arquivo é lido em streaming com `csv.DictReader`; cada linha é validada e
+    convertida, e os lotes de `batch_size` peças são gravados com `bulk_create`
+    dentro de uma transação por lote.
+
+    No modo `insert` um `part_number` já cadastrado é rejeitado; no modo `upsert`
+    as peças existentes têm `price`, `quantity`, `details` e `name` atualizados
+    via `bulk_update`, e as linhas sem alteração são ignoradas.
+
+    No PostgreSQL (backend `copy`) cada lote é enviado com `COPY` para uma tabela
+    temporária e mesclado em `comum_part` com um único `INSERT ... ON CONFLICT`;
+    nos demais bancos, ou com `CSV_IMPORT_BACKEND = "orm"`, usa o ORM.
+
+    Arquivos grandes podem ser divididos em intervalos de bytes (`split_file`) e
+    importados em paralelo com `import_range`. A divisão é feita em quebras de
+    linha, portanto o arquivo não pode ter campos entre aspas com quebras de linha.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, backend: Optional[str] = None):
+        self.batch_size = batch_size
+        self.backend = backend
+
+    def get_batch_size(self) -> int:
+        return self.batch_size or settings.CSV_IMPORT_BATCH_SIZE
+
+    def get_backend(self) -> str:
+        """
+        Backend de gravação efetivo: `copy` exige PostgreSQL com psycopg 3; em
+        `auto` ele é usado sempre que disponível.
+        """
+        backend = self.backend or settings.CSV_IMPORT_BACKEND
+        if backend not in IMPORT_BACKENDS:
+            raise ImportFileError(f"Backend de importação inválido: '{backend}'.")
+        if backend == IMPORT_BACKEND_ORM:
+            return IMPORT_BACKEND_ORM
+        if _supports_copy():
+            return IMPORT_BACKEND_COPY
+        if backend == IMPORT_BACKEND_COPY:
+            raise ImportFileError("O backend 'copy' exige PostgreSQL com psycopg 3.")
+        return IMPORT_BACKEND_ORM
+
+    def read_header(self, file_path: str) -> Tuple[List[str], int]:
+        """
+        Retorna as colunas do cabeçalho e a posição, em bytes, do fim do cabeçalho.
+        """
+        with open(file_path, "rb") as file:
+            header = file.readline()
+            fieldnames = next(csv.reader([header.decode("utf-8-sig")]), [])
+            self._check_header(fieldnames)
+            return fieldnames, file.tell()
+
+    def shard_count(self, file_path: str) -> int:
+        """
+        Quantidade de partes em que o arquivo deve ser dividido, de acordo com
+        `CSV_IMPORT_SHARD_SIZE` e limitada a `CSV_IMPORT_MAX_SHARDS`.
+        """
+        size = os.path.getsize(file_path)
+        return max(1, min(math.ceil(size / settings.CSV_IMPORT_SHARD_SIZE), settings.CSV_IMPORT_MAX_SHARDS))
+
+    def split_file(self, file_path: str, shards: int) -> List[Tuple[int, int]]:
+        """
+        Divide o corpo do arquivo em até `shards` intervalos `(início, fim)` de bytes,
+        sempre começando no início de uma linha.
+        """
+        _, header_end = self.read_header(file_path)
+        size = os.path.getsize(file_path)
+        step = max(1, math.ceil((size - header_end) / max(1, shards)))
+
+        boundaries = [header_end]
+        with open(file_path, "rb") as file:
+            for index in range(1, shards):
+                target = header_end + index * step
+                if target >= size:
+                    break
+                file.seek(target - 1)
+                file.readline()
+                position = file.tell()
+                if position >= size:
+                    break
+                if position > boundaries[-1]:
+                    boundaries.append(position)
+        boundaries.append(size)
+
+        return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+    def import_file(
+        self,
+        file_path: str,
+        batch_size: Optional[int] = None,
+        mode: str = IMPORT_MODE_INSERT,
+        progress: Optional[Callable[[ImportReport, int], None]] = None,
+    ) -> ImportReport:
+        _, header_end = self.read_header(file_path)
+        return self.import_range(
+            file_path,
+            header_end,
+            os.path.getsize(file_path),
+            batch_size=batch_size,
+            mode=mode,
+            first_line=2,
+            progress=progress,
+        )
+
+    def import_range(
+        self,
+        file_path: str,
+        start: int,
+        end: int,
+        batch_size: Optional[int] = None,
+        mode: str = IMPORT_MODE_INSERT,
+        first_line: Optional[int] = None,
+        progress: Optional[Callable[[ImportReport, int], None]] = None,
+    ) -> ImportReport:
+        """
+        Importa as linhas entre os bytes `start` e `end` do arquivo. `first_line` é o
+        número da linha em `start`, quando conhecido, usado no relatório de erros.
+        `progress` é chamado ao fim de cada lote com o relatório parcial e os bytes
+        já lidos do intervalo.
+        """
+        if mode not in IMPORT_MODES:
+            raise ImportFileError(f"Modo de importação inválido: '{mode}'.")
+
+        fieldnames, header_end = self.read_header(file_path)
+        batch_size = batch_size or self.get_batch_size()
+        report = ImportReport()
+        started = time.perf_counter()
+
+        with open(file_path, "rb") as file:
+            lines = _LineReader(file, max(start, header_end), end)
+            reader = csv.DictReader(lines, fieldnames=fieldnames)
+            for chunk in self._chunks(reader, lines, first_line, batch_size, report):
+                self._write_chunk(chunk, report, mode)
+                if progress:
+                    progress(report, lines.position - start)
+            if progress:
+                progress(report, lines.position - start)
+
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def _check_header(self, fieldnames: Optional[List[str]]) -> None:
+        if not fieldnames:
+            raise ImportFileError("Arquivo CSV vazio ou sem cabeçalho.")
+        missing = [column for column in REQUIRED_COLUMNS if column not in fieldnames]
+        if missing:
+            raise ImportFileError(f"Colunas obrigatórias ausentes: {', '.join(missing)}")
+
+    def _chunks(
+        self,
+        reader: csv.DictReader,
+        lines: _LineReader,
+        first_line: Optional[int],
+        batch_size: int,
+        report: ImportReport,
+    ) -> Iterator[List[tuple]]:
+        chunk = []
+        offset = lines.position
+        line = first_line
+        for row in reader:
+            report.rows_read += 1
+            location = {"line": line, "offset": offset}
+            offset = lines.position
+            if first_line is not None:
+                line = first_line + reader.line_num
+            try:
+                chunk.append((location, coerce_row(row)))
+            except RowValidationError as e:
+                report.add_error(location, row, str(e))
+                continue
+
+            if len(chunk) >= batch_size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+
+    def _write_chunk(self, chunk: List[tuple], report: ImportReport, mode: str) -> None:
+        started = time.perf_counter()
+        rows = self._deduplicate(chunk, report, mode)
+        try:
+            try:
+                result = self._persist(rows, mode)
+            except IntegrityError:
+                # Outra importação gravou os mesmos part_numbers entre a consulta
+                # das chaves e o insert: refaz o lote com as chaves atualizadas.
+                result = self._persist(rows, mode)
+        except DatabaseError as e:
+            logger.exception("Falha ao gravar lote de peças (a partir do byte %s).", chunk[0][0]["offset"])
+            for location, values in rows:
+                report.add_error(location, _as_text(values), f"Lote rejeitado pelo banco: {e}")
+        else:
+            report.inserted += result.inserted
+            report.updated += result.updated
+            report.skipped += result.skipped
+            for location, values, message in result.rejected:
+                report.add_error(location, _as_text(values), message)
+        report.chunk_timings.append(time.perf_counter() - started)
+
+    def _deduplicate(self, chunk: List[tuple], report: ImportReport, mode: str) -> List[tuple]:
+        """
+        Mantém uma linha por part_number dentro do lote; no modo `upsert` a última
+        ocorrência prevalece.
+        """
+        rows = {}
+        for location, values in chunk:
+            part_number = values["part_number"]
+            if part_number in rows:
+                if mode == IMPORT_MODE_INSERT:
+                    report.add_error(location, _as_text(values), "part_number repetido no arquivo.")
+                    continue
+                report.skipped += 1
+            rows[part_number] = (location, values)
+        return list(rows.values())
+
+    def _persist(self, rows: List[tuple], mode: str) -> ChunkResult:
+        if self.get_backend() == IMPORT_BACKEND_COPY:
+            return self._persist_copy(rows, mode)
+        return self._persist_orm(rows, mode)
+
+    def _persist_orm(self, rows: List[tuple], mode: str) -> ChunkResult:
+        result = ChunkResult()
+        with transaction.atomic():
+            existing = {
+                part.part_number: part
+                for part in Part.objects.filter(
+                    part_number__in=[values["part_number"] for _, values in rows]
+                ).only("id", "part_number", *UPSERT_FIELDS)
+            }
+
+            to_create = []
+            to_update = []
+            now = timezone.now()
+            for location, values in rows:
+                part = existing.get(values["part_number"])
+                if part is None:
+                    to_create.append(Part(**values))
+                elif mode == IMPORT_MODE_INSERT:
+                    result.rejected.append((location, values, "part_number já cadastrado."))
+                elif all(getattr(part, name) == values[name] for name in UPSERT_FIELDS):
+                    result.skipped += 1
+                else:
+                    for name in UPSERT_FIELDS:
+                        setattr(part, name, values[name])
+                    part.updated_at = now
+                    to_update.append(part)
+
+            # Ordem estável das chaves evita deadlocks entre importações paralelas.
+            to_create.sort(key=lambda part: part.part_number)
+            to_update.sort(key=lambda part: part.pk)
+            if to_create:
+                Part.objects.bulk_create(to_create)
+            if to_update:
+                Part.objects.bulk_update(
+                    to_update, [*UPSERT_FIELDS, "updated_at"], batch_size=UPDATE_BATCH_SIZE
+                )
+                # O bulk_update não envia post_save; o cache de detalhe é avisado aqui.
+                transaction.on_commit(partial(detail_cache.invalidate, Part, [part.pk for part in to_update]))
+
+        result.inserted = len(to_create)
+        result.updated = len(to_update)
+        return result
+
+    def _persist_copy(self, rows: List[tuple], mode: str) -> ChunkResult:
+        """
+        Envia o lote com `COPY` para a tabela temporária e o mescla em `comum_part`
+        com um único `INSERT ... ON CONFLICT`. As linhas não devolvidas pelo
+        `RETURNING` são as já cadastradas (`insert`) ou sem alteração (`upsert`).
+        """
+        result = ChunkResult()
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(_STAGING_DDL)
+            # A tabela só é esvaziada no commit; dentro de uma transação externa
+            # (ex.: testes) restariam linhas do lote anterior.
+            cursor.execute(f"TRUNCATE {STAGING_TABLE}")
+            with cursor.copy(f"COPY {STAGING_TABLE} ({', '.join(STAGING_COLUMNS)}) FROM STDIN") as copy:
+                for _, values in rows:
+                    copy.write_row((uuid.uuid4(), *(values[name] for name in STAGING_COLUMNS[1:])))
+            cursor.execute(_MERGE_SQL[mode], [timezone.now()])
+            returned = {part_number: (inserted, pk) for part_number, inserted, pk in cursor.fetchall()}
+            updated_ids = [pk for inserted, pk in returned.values() if not inserted]
+            if updated_ids:
+                transaction.on_commit(partial(detail_cache.invalidate, Part, updated_ids))
+
+        for location, values in rows:
+            inserted, _ = returned.get(values["part_number"], (None, None))
+            if inserted is None:
+                if mode == IMPORT_MODE_INSERT:
+                    result.rejected.append((location, values, "part_number já cadastrado."))
+                else:
+                    result.skipped += 1
+            elif inserted:
+                result.inserted += 1
+            else:
+                result.updated += 1
+        return result
+
+
+def _supports_copy() -> bool:
+    if connection.vendor != "postgresql":
+        return False
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+    return is_psycopg3
+
+
+_STAGING_DDL = (
+    f"CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} ON COMMIT DELETE ROWS AS "
+    f"SELECT {', '.join(STAGING_COLUMNS)} FROM {Part._meta.db_table} WITH NO DATA"
+)
+
+# `xmax = 0` identifica as linhas inseridas; nas atualizadas o xmax é o da própria transação.
+_MERGE_SQL = {
+    IMPORT_MODE_INSERT: (
+        f"INSERT INTO {Part._meta.db_table} ({', '.join(STAGING_COLUMNS)}, updated_at) "
+        f"SELECT {', '.join(STAGING_COLUMNS)}, %s FROM {STAGING_TABLE} ORDER BY part_number "
+        f"ON CONFLICT (part_number) WHERE deleted_at IS NULL DO NOTHING "
+        f"RETURNING part_number, true, id"
+    ),
+    IMPORT_MODE_UPSERT: (
+        f"INSERT INTO {Part._meta.db_table} AS part ({', '.join(STAGING_COLUMNS)}, updated_at) "
+        f"SELECT {', '.join(STAGING_COLUMNS)}, %s FROM {STAGING_TABLE} ORDER BY part_number "
+        f"ON CONFLICT (part_number) WHERE deleted_at IS NULL DO UPDATE SET "
+        f"{', '.join(f'{name} = EXCLUDED.{name}' for name in UPSERT_FIELDS)}, updated_at = EXCLUDED.updated_at "
+        f"WHERE ({', '.join(f'part.{name}' for name in UPSERT_FIELDS)}) "
+        f"IS DISTINCT FROM ({', '.join(f'EXCLUDED.{name}' for name in UPSERT_FIELDS)}) "
+        f"RETURNING part.part_number, (part.xmax = 0), part.id"
+    ),
+}
+
+
+part_import_service = PartImportService()
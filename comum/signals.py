@@ -0,0 +1,117 @@
+from functools import partial
+
+from django.contrib.auth.models import Group, Permission
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django_softdelete.signals import post_restore, post_soft_delete
+
+from comum.authentication import invalidate_permissions
+from comum.models import CarModel, Part, Users
+from comum.utils.detail_cache import detail_cache
+from comum.utils.fitment import fitment_index
+
+CHANGED_ACTIONS = ("post_add", "post_remove", "pre_clear")
+
+
+def _invalidate_on_commit(user_ids):
+    # Os ids são lidos agora (antes de um clear/delete); o descarte da versão fica
+    # para depois do commit: uma requisição entre os dois recriaria a versão e
+    # guardaria as permissões antigas no cache.
+    transaction.on_commit(partial(invalidate_permissions, list(user_ids)))
+
+
+def _users_in_groups(group_ids):
+    return list(Users.objects.filter(groups__in=group_ids).values_list("pk", flat=True).distinct())
+
+
+@receiver(m2m_changed, sender=Users.groups.through)
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in CHANGED_ACTIONS:
+        return
+    if not reverse:
+        _invalidate_on_commit([instance.pk])
+    elif action == "pre_clear":
+        _invalidate_on_commit(instance.users.values_list("pk", flat=True))
+    else:
+        _invalidate_on_commit(pk_set)
+
+
+@receiver(m2m_changed, sender=Users.user_permissions.through)
+def user_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in CHANGED_ACTIONS:
+        return
+    if not reverse:
+        _invalidate_on_commit([instance.pk])
+    elif action == "pre_clear":
+        _invalidate_on_commit(instance.user_set.values_list("pk", flat=True))
+    else:
+        _invalidate_on_commit(pk_set)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in CHANGED_ACTIONS:
+        return
+    if not reverse:
+        _invalidate_on_commit(_users_in_groups([instance.pk]))
+    elif action == "pre_clear":
+        _invalidate_on_commit(_users_in_groups(instance.group_set.values_list("pk", flat=True)))
+    else:
+        _invalidate_on_commit(_users_in_groups(pk_set))
+
+
+@receiver(post_save, sender=Users)
+@receiver(post_delete, sender=Users)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # O login só atualiza `last_login`, que não altera o acesso.
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    _invalidate_on_commit([instance.pk])
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    _invalidate_on_commit(_users_in_groups([instance.pk]))
+
+
+@receiver(pre_delete, sender=Permission)
+def permission_deleted(sender, instance, **kwargs):
+    _invalidate_on_commit(
+        Users.objects.filter(Q(user_permissions=instance) | Q(groups__permissions=instance))
+        .values_list("pk", flat=True)
+        .distinct()
+    )
+
+
+@receiver(m2m_changed, sender=CarModel.parts.through)
+def fitment_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # O índice só muda depois do commit: um rollback não deixa vínculos fantasmas.
+    if action == "pre_clear":
+        pk_set = set(instance.parts.values_list("pk", flat=True))
+    elif action not in ("post_add", "post_remove"):
+        return
+    pairs = [(pk, instance.pk) if reverse else (instance.pk, pk) for pk in pk_set]
+    update = fitment_index.add if action == "post_add" else fitment_index.remove
+    transaction.on_commit(partial(update, pairs))
+
+
+@receiver(post_delete, sender=Part)
+@receiver(post_delete, sender=CarModel)
+def fitment_node_deleted(sender, instance, **kwargs):
+    # A exclusão definitiva apaga os vínculos em cascata, sem m2m_changed.
+    transaction.on_commit(fitment_index.invalidate)
+
+
+@receiver(post_save, sender=Part)
+@receiver(post_save, sender=CarModel)
+@receiver(post_delete, sender=Part)
+@receiver(post_delete, sender=CarModel)
+@receiver(post_soft_delete, sender=Part)
+@receiver(post_soft_delete, sender=CarModel)
+@receiver(post_restore, sender=Part)
+@receiver(post_restore, sender=CarModel)
+def detail_changed(sender, instance, **kwargs):
+    # Depois do commit: uma leitura entre a invalidação e o commit guardaria o valor antigo.
+    transaction.on_commit(partial(detail_cache.invalidate, sender, [instance.pk]))
@@ -1,22 +1,73 @@
-import csv
-from celery import shared_task
-from .models import Part
+import logging
+import time
+from celery import chord, shared_task
+from .services.import_job import import_job_service
+from .services.part_import import ImportReport, part_import_service
+from .utils.upload import finish_upload
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def process_csv_upload(file_path, batch_size=None, mode="insert", shards=None, job_id=None):
+    handed_off = False
+    import_job_service.start(job_id)
+    try:
+        shards = shards or part_import_service.shard_count(file_path)
+        ranges = part_import_service.split_file(file_path, shards) if shards > 1 else []
+        if len(ranges) > 1:
+            callback = aggregate_csv_shards.s(file_path, started_at=time.time(), job_id=job_id)
+            callback.on_error(discard_csv_upload.si(file_path, job_id=job_id))
+            chord(
+                process_csv_shard.s(file_path, start, end, batch_size=batch_size, mode=mode, job_id=job_id)
+                for start, end in ranges
+            )(callback)
+            handed_off = True
+            logger.info("Importação de %s dividida em %s partes.", file_path, len(ranges))
+            return {"shards": len(ranges)}
+
+        report = part_import_service.import_file(
+            file_path, batch_size=batch_size, mode=mode, progress=import_job_service.progress(job_id)
+        )
+    except Exception as e:
+        import_job_service.fail(job_id, str(e))
+        logger.exception("Falha na importação de %s.", file_path)
+        raise
+    finally:
+        if not handed_off:
+            finish_upload(file_path)
+
+    import_job_service.finish(job_id, report)
+    logger.info("Importação de %s concluída: %s", file_path, report.summary())
+    return report.as_dict()
+
+
+@shared_task
+def process_csv_shard(file_path, start, end, batch_size=None, mode="insert", job_id=None):
+    try:
+        report = part_import_service.import_range(
+            file_path, start, end, batch_size=batch_size, mode=mode, progress=import_job_service.progress(job_id)
+        )
+    except Exception as e:
+        import_job_service.fail(job_id, str(e))
+        logger.exception("Falha na parte %s-%s de %s.", start, end, file_path)
+        raise
+    logger.info("Parte %s-%s de %s concluída: %s", start, end, file_path, report.summary())
+    return report.as_dict()
+
+
+@shared_task
+def aggregate_csv_shards(results, file_path, started_at=None, job_id=None):
+    report = ImportReport.combine(results)
+    if started_at is not None:
+        report.elapsed = time.time() - started_at
+    finish_upload(file_path)
+    import_job_service.finish(job_id, report)
+    logger.info("Importação de %s concluída (%s partes): %s", file_path, len(results), report.summary())
+    return report.as_dict()
+
 
 @shared_task
-def process_csv_upload(file_path):
-    with open(file_path, 'r', encoding='utf-8') as file:
-
-        reader = csv.DictReader(file)
-        for row in reader:
-            try:
-
-                part = Part.objects.create(
-                    part_number=row['part_number'],
-                    name=row['name'],
-                    details=row['details'],
-                    price=row['price'],
-                    quantity=row['quantity']
-                )
-                part.save()
-            except Exception as e:
-                print(f"Erro ao processar linha: {row}. Erro: {e}")
\ No newline at end of file
+def discard_csv_upload(file_path, job_id=None):
+    finish_upload(file_path)
+    import_job_service.fail(job_id, "Falha ao importar uma das partes do arquivo.")
@@ -0,0 +1,67 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import Permission
+from django.test import TestCase
+from django.urls import reverse
+
+from comum.factories.group import GroupFactory
+from comum.factories.part import PartFactory
+from comum.factories.user import UserFactory
+from comum.tests.queries import GuardedClient
+from comum.utils.fitment import fitment_index
+
+PASSWORD = "password123"
+
+
+def make_parts(count: int, **fields) -> list:
+    """
+    Cria `count` peças (PN-000, "PECA 00", ...). Cada campo de `fields` é um
+    valor fixo ou uma função do índice da peça.
+    """
+    return [
+        PartFactory(**{
+            "part_number": f"PN-{index:03}",
+            "name": f"PECA {index:02}",
+            "details": "Peça de teste",
+            "price": Decimal("10.00"),
+            "quantity": 1,
+            **{name: value(index) if callable(value) else value for name, value in fields.items()},
+        })
+        for index in range(count)
+    ]
+
+
+class AuthenticatedTestCase(TestCase):
+    """
+    Base dos testes de endpoint: `self.client` é um `GuardedClient` e
+    `self.token` o access token de `self.user`, membro de um grupo com as
+    `permissions` (codenames) da classe. O `fitment_index` do processo começa
+    vazio em cada teste.
+    """
+
+    permissions = ()
+    is_staff = False
+
+    def setUp(self):
+        fitment_index.clear()
+        self.client = GuardedClient()
+        self.user, self.token = self.authenticate(*self.permissions, is_staff=self.is_staff)
+
+    def authenticate(self, *codenames, **fields):
+        """Cria um usuário num grupo com as permissões `codenames`; retorna (usuário, access token)."""
+        user = UserFactory(password=PASSWORD, **fields)
+        if codenames:
+            group = GroupFactory()
+            group.permissions.add(*[Permission.objects.get(codename=codename) for codename in codenames])
+            user.groups.add(group)
+        response = self.client.post(reverse("token_obtain_pair"), data={
+            "username": user.username,
+            "password": PASSWORD,
+        })
+        return user, response.json()["access"]
+
+    def api_get(self, route, /, kwargs=None, headers=None, **params):
+        """GET autenticado na rota `route` (nome da URL), com `params` na query string."""
+        return self.client.get(
+            reverse(route, kwargs=kwargs), data=params, HTTP_AUTHORIZATION=f"Bearer {self.token}", **(headers or {})
+        )
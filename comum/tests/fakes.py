@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import Counter
+
+from django.core.cache.backends.redis import RedisCache, RedisCacheClient
+from redis.exceptions import ConnectionError
+
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+class FakeRedis:
+    """
+    Dublê do cliente do redis-py, em memória, com os comandos usados pelo
+    `RedisCache` do Django. `calls` conta os comandos recebidos e `down` simula
+    o servidor fora do ar.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.calls = Counter()
+        self.down = False
+        self.lock = threading.Lock()
+
+    def _command(self, name):
+        if self.down:
+            raise ConnectionError("Redis fora do ar (FakeRedis).")
+        self.calls[name] += 1
+
+    def _alive(self, key) -> bool:
+        expires = self.expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def get(self, key):
+        self._command("get")
+        with self.lock:
+            return self.data.get(key) if self._alive(key) else None
+
+    def mget(self, keys):
+        self._command("mget")
+        with self.lock:
+            return [self.data.get(key) if self._alive(key) else None for key in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        self._command("set")
+        with self.lock:
+            if nx and self._alive(key):
+                return None
+            self.data[key] = value
+            self.expires.pop(key, None)
+            if ex is not None:
+                self.expires[key] = time.monotonic() + ex
+            return True
+
+    def mset(self, mapping):
+        self._command("mset")
+        with self.lock:
+            for key, value in mapping.items():
+                self.data[key] = value
+                self.expires.pop(key, None)
+            return True
+
+    def delete(self, *keys):
+        self._command("delete")
+        with self.lock:
+            removed = [key for key in keys if self._alive(key)]
+            for key in removed:
+                del self.data[key]
+                self.expires.pop(key, None)
+            return len(removed)
+
+    def exists(self, key):
+        self._command("exists")
+        with self.lock:
+            return int(self._alive(key))
+
+    def expire(self, key, seconds):
+        self._command("expire")
+        with self.lock:
+            if not self._alive(key):
+                return False
+            self.expires[key] = time.monotonic() + seconds
+            return True
+
+    def persist(self, key):
+        self._command("persist")
+        with self.lock:
+            return self._alive(key) and self.expires.pop(key, None) is not None
+
+    def incr(self, key, amount=1):
+        self._command("incr")
+        with self.lock:
+            value = int(self.data.get(key, 0) if self._alive(key) else 0) + amount
+            self.data[key] = str(value).encode()
+            return value
+
+    def flushdb(self):
+        self._command("flushdb")
+        with self.lock:
+            self.data.clear()
+            self.expires.clear()
+            return True
+
+    def pipeline(self):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, client: FakeRedis):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+        return lambda *args, **kwargs: self.commands.append((method, args, kwargs))
+
+    def execute(self):
+        commands, self.commands = self.commands, []
+        return [method(*args, **kwargs) for method, args, kwargs in commands]
+
+
+def fake_redis(location: str) -> FakeRedis:
+    """Servidor falso de `location`, compartilhado por todos os caches que apontam para ele."""
+    with _servers_lock:
+        return _servers.setdefault(location, FakeRedis())
+
+
+class FakeRedisCacheClient(RedisCacheClient):
+    def get_client(self, key=None, *, write=False):
+        return fake_redis(self._servers[0])
+
+
+class FakeRedisCache(RedisCache):
+    """
+    `RedisCache` do Django sobre o `FakeRedis`: os valores passam pela mesma
+    serialização do backend real. Uso nos testes:
+
+        CACHES={"default": {"BACKEND": "comum.tests.fakes.FakeRedisCache", "LOCATION": "redis://fake/1"}}
+    """
+
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        self._class = FakeRedisCacheClient
@@ -0,0 +1,95 @@
+import traceback
+from contextlib import ContextDecorator
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.test import Client
+
+from comum.utils.sql import fingerprint
+
+_THIS_FILE = str(Path(__file__).resolve())
+
+
+class RepeatedQueriesError(AssertionError):
+    pass
+
+
+class assert_no_repeated_queries(ContextDecorator):
+    """
+    Falha quando uma mesma forma de consulta (`comum.utils.sql.fingerprint`)
+    roda `threshold` vezes ou mais dentro do bloco, o sinal de um laço N+1. O
+    relatório traz a consulta e a pilha (só o código do projeto) da primeira
+    execução. Por padrão usa o limite do middleware de métricas,
+    `METRICS_N_PLUS_ONE_THRESHOLD`. Serve como gerenciador de contexto ou
+    decorator de teste:
+
+        with assert_no_repeated_queries():
+            self.client.get(...)
+    """
+
+    def __init__(self, threshold: int = None, using: str = "default", label: str = ""):
+        self.threshold = threshold
+        self.using = using
+        self.label = label
+
+    def __enter__(self):
+        # Forma -> [execuções, SQL e pilha da primeira].
+        self.executed = {}
+        self.wrapper = connections[self.using].execute_wrapper(self._capture)
+        self.wrapper.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.wrapper.__exit__(exc_type, exc_value, tb)
+        if exc_type is None:
+            self.check()
+        return False
+
+    def _capture(self, execute, sql, params, many, context):
+        # A pilha só é extraída na primeira execução de cada forma; as demais só contam.
+        shape = fingerprint(sql)
+        runs = self.executed.get(shape)
+        if runs is None:
+            self.executed[shape] = [1, sql, _project_stack()]
+        else:
+            runs[0] += 1
+        return execute(sql, params, many, context)
+
+    def check(self) -> None:
+        threshold = self.threshold or settings.METRICS_N_PLUS_ONE_THRESHOLD
+        repeated = [(shape, runs) for shape, runs in self.executed.items() if runs[0] >= threshold]
+        if repeated:
+            raise RepeatedQueriesError("\n\n".join(self._report(shape, runs, threshold) for shape, runs in repeated))
+
+    def _report(self, shape: str, runs: list, threshold: int) -> str:
+        count, sql, stack = runs
+        where = f" em {self.label}" if self.label else ""
+        return (
+            f"Consulta repetida {count} vezes{where} (limite: {threshold}):\n"
+            f"  {shape}\n"
+            f"Primeira execução:\n  {sql}\n"
+            f"Pilha:\n{''.join(traceback.format_list(stack))}"
+        )
+
+
+def _project_stack():
+    """Quadros da pilha atual que pertencem ao projeto (sem dependências e sem este módulo)."""
+    base = str(settings.BASE_DIR)
+    return [
+        frame for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(base) and "site-packages" not in frame.filename and frame.filename != _THIS_FILE
+    ]
+
+
+class GuardedClient(Client):
+    """`Client` de teste em que cada requisição passa por `assert_no_repeated_queries`."""
+
+    def __init__(self, *args, query_threshold: int = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.query_threshold = query_threshold
+
+    def request(self, **request):
+        label = f"{request.get('REQUEST_METHOD', 'GET')} {request.get('PATH_INFO', '')}"
+        with assert_no_repeated_queries(self.query_threshold, label=label):
+            return super().request(**request)
@@ -0,0 +1,201 @@
+from django.contrib.auth.models import Permission
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from comum.authentication import ClaimsUser, jwt_authentication
+from comum.backends.permission_backend import permission_cache
+from comum.factories.group import GroupFactory
+from comum.factories.part import PartFactory
+from comum.factories.user import UserFactory
+from comum.models import Users
+from comum.tests.queries import GuardedClient
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class ClaimsAuthenticationTest(TestCase):
+    def setUp(self):
+        self.client = GuardedClient()
+        self.common_group = GroupFactory(name="comum")
+        self.common_group.permissions.add(Permission.objects.get(codename="view_part"))
+        self.common_user = UserFactory(password="password123")
+        self.common_user.groups.add(self.common_group)
+        self.common_token = self._get_jwt_token(self.common_user.username, "password123")
+        self.part = PartFactory(part_number="EREIFHEIUF3929", name="teste", details="teste do Part", price=100.00, quantity=10)
+
+    def _get_jwt_token(self, username, password):
+        response = self.client.post(reverse("token_obtain_pair"), data={
+            "username": username,
+            "password": password,
+        })
+        return response.json().get("access")
+
+    def _view_part(self):
+        return self.client.get(
+            path=reverse("manage-part", kwargs={"part_id": self.part.id}),
+            HTTP_AUTHORIZATION=f"Bearer {self.common_token}",
+        )
+
+    def test_token_carries_permissions(self):
+        token = AccessToken(self.common_token)
+
+        self.assertEqual(token["perms"], ["comum.view_part"])
+        self.assertTrue(token["perms_version"])
+        self.assertEqual(token["username"], self.common_user.username)
+
+    def test_view_part_without_auth_queries(self):
+        # Só a busca da peça, no dispatch do inscode (o retrieve a encontra no
+        # cache de detalhe); usuário e permissões vêm do token.
+        with self.assertNumQueries(1):
+            response = self._view_part()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["name"], "teste")
+
+    def test_group_change_invalidates_token_permissions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.common_user.groups.remove(self.common_group)
+
+        response = self._view_part()
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json()["errors"]["message"], "Você não tem permissão para realizar esta ação.")
+
+    def test_group_permission_change_invalidates_token_permissions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.common_group.permissions.clear()
+
+        response = self._view_part()
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json()["errors"]["message"], "Você não tem permissão para realizar esta ação.")
+
+    def test_stale_token_falls_back_to_database_user(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.common_group.permissions.add(Permission.objects.get(codename="change_part"))
+
+        user = jwt_authentication.get_user(AccessToken(self.common_token))
+
+        self.assertIsInstance(user, Users)
+        self.assertTrue(user.has_perm("comum.change_part"))
+
+    def test_claims_user_permissions(self):
+        user = jwt_authentication.get_user(AccessToken(self.common_token))
+
+        self.assertIsInstance(user, ClaimsUser)
+        self.assertTrue(user.has_perm("comum.view_part"))
+        self.assertFalse(user.has_perm("comum.delete_part"))
+        self.assertTrue(user.has_module_perms("comum"))
+
+    def test_server_timing_per_stage(self):
+        response = self._view_part()
+
+        stages = [entry.split(";")[0] for entry in response["Server-Timing"].split(", ")]
+        self.assertEqual(stages, ["jwt", "user", "perm", "app"])
+
+    def test_invalid_tokens(self):
+        url = reverse("manage-part", kwargs={"part_id": self.part.id})
+        for header, message in (
+            ("Bearer", "Invalid token format."),
+            ("Bearer abc.def.ghi", "Authentication failed: "),
+            (f"Bearer {self.common_token} extra", "Authentication failed: "),
+        ):
+            response = self.client.get(url, HTTP_AUTHORIZATION=header)
+            self.assertEqual(response.status_code, 500, header)
+            self.assertTrue(response.json()["errors"]["message"].startswith(message), header)
+
+    def test_add_user_group_requires_permission(self):
+        response = self.client.patch(
+            reverse("add-user-group", kwargs={"user_id": self.common_user.id}),
+            data={"group_ids": []}, content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {self.common_token}",
+        )
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json()["errors"]["message"], "Você não tem permissão para realizar esta ação.")
+
+        # Com a permissão (o token antigo cai na conferência pelo banco).
+        with self.captureOnCommitCallbacks(execute=True):
+            self.common_group.permissions.add(Permission.objects.get(codename="change_users"))
+        response = self.client.patch(
+            reverse("add-user-group", kwargs={"user_id": self.common_user.id}),
+            data={"group_ids": []}, content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {self.common_token}",
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class CachedPermissionBackendTest(TestCase):
+    def setUp(self):
+        self.client = GuardedClient()
+        self.group = GroupFactory(name="comum")
+        self.group.permissions.add(Permission.objects.get(codename="view_part"))
+        self.user = UserFactory(password="password123")
+        self.user.groups.add(self.group)
+        permission_cache.clear_local()
+
+    def _fresh_user(self):
+        return Users.objects.get(pk=self.user.pk)
+
+    def test_permissions_served_from_cache(self):
+        self.assertTrue(self._fresh_user().has_perm("comum.view_part"))
+        stats = permission_cache.stats()
+        user = self._fresh_user()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm("comum.view_part"))
+            self.assertFalse(user.has_perm("comum.delete_part"))
+
+        self.assertEqual(permission_cache.stats()["local_hits"], stats["local_hits"] + 1)
+
+    def test_shared_tier_after_local_miss(self):
+        self._fresh_user().has_perm("comum.view_part")
+        permission_cache.clear_local()
+        shared_hits = permission_cache.stats()["shared_hits"]
+        user = self._fresh_user()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm("comum.view_part"))
+
+        self.assertEqual(permission_cache.stats()["shared_hits"], shared_hits + 1)
+
+    def test_group_permission_change_invalidates_cache(self):
+        self._fresh_user().has_perm("comum.view_part")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.permissions.add(Permission.objects.get(codename="change_part"))
+
+        self.assertTrue(self._fresh_user().has_perm("comum.change_part"))
+
+    def test_user_group_removal_invalidates_cache(self):
+        self._fresh_user().has_perm("comum.view_part")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.remove(self.group)
+
+        self.assertFalse(self._fresh_user().has_perm("comum.view_part"))
+
+    def test_invalidation_runs_after_commit(self):
+        self._fresh_user().has_perm("comum.view_part")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.remove(self.group)
+            # Uma requisição concorrente antes do commit ainda lê as permissões antigas.
+            permission_cache.clear_local()
+            permission_cache.get(self.user.pk, lambda: {"comum.view_part"})
+
+        self.assertFalse(self._fresh_user().has_perm("comum.view_part"))
+
+    def test_permission_cache_stats_endpoint(self):
+        admin = UserFactory(password="password123", is_staff=True)
+        token = self.client.post(reverse("token_obtain_pair"), data={
+            "username": admin.username,
+            "password": "password123",
+        }).json().get("access")
+
+        response = self.client.get(reverse("permission-cache-stats"), HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {"local_hits", "shared_hits", "misses", "hit_rate", "local_entries"})
@@ -1,5 +1,9 @@
 from django.contrib.auth.models import Permission
-from django.test import TestCase, Client
+import uuid
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from comum.factories.car_model import CarModelFactory
 from comum.factories.group import GroupFactory
 from comum.factories.part import PartFactory
@@ -8,11 +12,12 @@ from comum.factories.user import UserFactory
 from django.urls import reverse
 
 from comum.models import CarModel, Part
+from comum.tests.queries import GuardedClient
 
 
 class CarModelTest(TestCase):
     def setUp(self):
-        self.client = Client()
+        self.client = GuardedClient()
 
         #Groups
         self.common_group = GroupFactory(name="comum")
@@ -274,4 +279,74 @@ class CarModelTest(TestCase):
             content_type="application/json",
         )
         self.assertEqual(response.status_code, 401)
-        self.assertEqual(response.json()['detail'], 'As credenciais de autenticação não foram fornecidas.')
\ No newline at end of file
+        self.assertEqual(response.json()['detail'], 'As credenciais de autenticação não foram fornecidas.')
+
+    def _associate(self, part_ids, car_model_ids):
+        return self.client.post(
+            path=reverse("associate-parts-cars-model"),
+            data={"part_ids": part_ids, "car_model_ids": car_model_ids},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {self.common_token}",
+        )
+
+    def test_associate_parts_car_model_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as baseline:
+            self._associate([str(self.part.id)], [str(self.car_model.id)])
+
+        parts = [
+            PartFactory(part_number=f"PN-{index}", name="teste", details="teste do Part", price=10, quantity=1)
+            for index in range(10)
+        ]
+        car_models = [CarModelFactory(name="UNO", manufacturer="FIAT", year=2000) for _ in range(5)]
+        part_ids = [str(part.id) for part in parts] + [str(self.part.id), str(uuid.uuid4()), "invalido"]
+        car_model_ids = [str(car_model.id) for car_model in car_models] + [str(uuid.uuid4())]
+
+        with self.assertNumQueries(len(baseline.captured_queries)):
+            response = self._associate(part_ids, car_model_ids)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["associated_parts"][car_model_ids[0]], part_ids[:11])
+        self.assertEqual(data["not_found_parts"][car_model_ids[0]], part_ids[11:])
+        self.assertEqual(data["not_found_car_models"], car_model_ids[5:])
+        self.assertEqual(CarModel.parts.through.objects.count(), 1 + 5 * 11)
+
+    def test_associate_parts_car_model_not_found(self):
+        response = self._associate([str(self.part.id)], [str(uuid.uuid4())])
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(len(response.json()["not_found_car_models"]), 1)
+
+    def _remove_parts(self, part_ids):
+        return self.client.patch(
+            path=reverse("cars-model-remove-parts", kwargs={"car_model_id": self.car_model.id}),
+            data={"part_ids": part_ids},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {self.admin_token}",
+        )
+
+    def test_remove_parts_car_model_query_count_is_constant(self):
+        self.client.login(username=self.admin_user.username, password="password123")
+        parts = [
+            PartFactory(part_number=f"PN-{index}", name="teste", details="teste do Part", price=10, quantity=1)
+            for index in range(10)
+        ]
+        self.car_model.parts.add(self.part, *parts)
+        # Deixa o modelo no cache de detalhe, como estará na chamada medida.
+        self._remove_parts([str(uuid.uuid4())])
+
+        with CaptureQueriesContext(connection) as baseline:
+            self._remove_parts([str(self.part.id)])
+
+        part_ids = [str(part.id) for part in parts]
+        invalid_ids = [str(self.part.id), str(uuid.uuid4()), "invalido", part_ids[0]]
+        with self.assertNumQueries(len(baseline.captured_queries)):
+            response = self._remove_parts(part_ids + invalid_ids)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["detail"], "10 peças removidas.")
+        self.assertEqual(data["removed_part_ids"], part_ids)
+        self.assertEqual(data["invalid_part_ids"], invalid_ids)
+        self.assertFalse(self.car_model.parts.exists())
+        self.assertEqual(Part.objects.count(), 11)
@@ -0,0 +1,124 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+
+from comum.factories.car_model import CarModelFactory
+from comum.models import Part
+from comum.tests.base import AuthenticatedTestCase, make_parts
+from comum.utils.detail_cache import detail_cache
+
+
+class ConditionalRequestsTest(AuthenticatedTestCase):
+    permissions = ("view_part", "view_carmodel")
+
+    def setUp(self):
+        detail_cache.clear_local()
+        super().setUp()
+        self.parts = make_parts(12, price=lambda index: Decimal("10.00") + index, quantity=lambda index: index)
+        self.car_model = CarModelFactory(name="UNO", manufacturer="FIAT", year=2010)
+        self.car_model.parts.add(*self.parts[:3])
+
+    def _revalidate(self, name, kwargs=None, **params):
+        first = self.api_get(name, kwargs, **params)
+        self.assertEqual(first.status_code, 200)
+        return first, self.api_get(name, kwargs, {"HTTP_IF_NONE_MATCH": first["ETag"]}, **params)
+
+    def test_list_not_modified(self):
+        first, second = self._revalidate("part")
+
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b"")
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertNotIn("Last-Modified", first)
+
+    def test_not_modified_skips_serialization(self):
+        first = self.api_get("part", cursor="", page_size=5)
+
+        with mock.patch("comum.views.mixins.ValuesListMixin.serialize_rows") as serialize_rows, \
+                CaptureQueriesContext(connection) as queries:
+            second = self.api_get("part", headers={"HTTP_IF_NONE_MATCH": first["ETag"]}, cursor="", page_size=5)
+
+        self.assertEqual(second.status_code, 304)
+        serialize_rows.assert_not_called()
+        part_queries = [query["sql"] for query in queries if "comum_part" in query["sql"]]
+        # Página só com id/updated_at e o total.
+        self.assertEqual(len(part_queries), 2)
+        self.assertNotIn('"price"', part_queries[0])
+
+    def test_update_changes_etag(self):
+        first = self.api_get("part")
+
+        part = Part.objects.get(pk=self.parts[0].pk)
+        part.name = "PECA ALTERADA"
+        part.save()
+        second = self.api_get("part", headers={"HTTP_IF_NONE_MATCH": first["ETag"]})
+
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second["ETag"], first["ETag"])
+
+    def test_delete_changes_etag(self):
+        first = self.api_get("car-model")
+
+        self.car_model.delete()
+        second = self.api_get("car-model", headers={"HTTP_IF_NONE_MATCH": first["ETag"]})
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json()["results"], [])
+
+    def test_if_modified_since(self):
+        kwargs = {"part_id": self.parts[0].id}
+        Part.objects.filter(pk=self.parts[0].pk).update(updated_at=timezone.now() - timedelta(minutes=5))
+        first = self.api_get("manage-part", kwargs)
+
+        not_modified = self.api_get("manage-part", kwargs, {"HTTP_IF_MODIFIED_SINCE": first["Last-Modified"]})
+        stale = self.api_get("manage-part", kwargs, {"HTTP_IF_MODIFIED_SINCE": http_date(0)})
+
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(stale.status_code, 200)
+
+    def test_no_last_modified_within_the_same_second(self):
+        # Uma alteração ainda neste segundo teria o mesmo Last-Modified.
+        first = self.api_get("manage-part", {"part_id": self.parts[0].id})
+
+        self.assertNotIn("Last-Modified", first)
+        self.assertIn("ETag", first)
+
+    def test_list_ignores_if_modified_since(self):
+        response = self.api_get("car-model", headers={"HTTP_IF_MODIFIED_SINCE": http_date()}, page=1)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Last-Modified", response)
+
+    def test_relationship_link_change(self):
+        kwargs = {"car_model_id": self.car_model.id}
+        first, second = self._revalidate("parts-car-model", kwargs)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.car_model.parts.add(self.parts[5])
+        third = self.api_get("parts-car-model", kwargs, {"HTTP_IF_NONE_MATCH": first["ETag"]})
+
+        self.assertEqual(second.status_code, 304)
+        self.assertNotIn("Last-Modified", first)
+        self.assertEqual(third.status_code, 200)
+        self.assertEqual(len(third.json()["results"]), 4)
+
+    def test_relationship_cursor_mode(self):
+        _, second = self._revalidate("cars-model-part", {"part_id": self.parts[0].id}, cursor="")
+
+        self.assertEqual(second.status_code, 304)
+
+    def test_detail_not_modified(self):
+        kwargs = {"part_id": self.parts[0].id}
+        first, second = self._revalidate("manage-part", kwargs)
+
+        self.assertEqual(first.json()["part_number"], "PN-000")
+        self.assertEqual(second.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.parts[0].save()
+        self.assertEqual(self.api_get("manage-part", kwargs, {"HTTP_IF_NONE_MATCH": first["ETag"]}).status_code, 200)
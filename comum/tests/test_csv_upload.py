@@ -0,0 +1,183 @@
+import hashlib
+import os
+import uuid
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import Permission
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from comum.factories.group import GroupFactory
+from comum.factories.user import UserFactory
+from comum.models import ImportJob, Part
+from comum.tasks import process_csv_upload
+from comum.tests.queries import GuardedClient
+from comum.utils.upload import finish_upload
+
+
+class CSVUploadTest(TestCase):
+    def setUp(self):
+        self.client = GuardedClient()
+        self.upload_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.upload_dir.cleanup)
+        settings_override = override_settings(CSV_UPLOAD_DIR=self.upload_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.admin_group = GroupFactory(name="administrador")
+        self.admin_group.permissions.add(
+            Permission.objects.get(codename="add_part"),
+            Permission.objects.get(codename="view_importjob"),
+        )
+        self.admin_user = UserFactory(password="password123")
+        self.admin_user.groups.add(self.admin_group)
+        self.admin_token = self._get_jwt_token(self.admin_user.username, "password123")
+
+        self.content = (
+            "part_number,name,details,price,quantity\n"
+            "PN-001,AMORTECEDOR,Amortecedor dianteiro,200.00,15\n"
+            "PN-002,PASTILHA,Pastilha de freio,abc,10\n"
+        ).encode()
+        self.sha256 = hashlib.sha256(self.content).hexdigest()
+
+    def _get_jwt_token(self, username, password):
+        response = self.client.post(reverse("token_obtain_pair"), data={
+            "username": username,
+            "password": password,
+        })
+        return response.json().get("access")
+
+    def _upload(self, **data):
+        return self.client.post(
+            path=reverse("upload_csv"),
+            data={"file": SimpleUploadedFile("pecas.csv", self.content, content_type="text/csv"), **data},
+            HTTP_AUTHORIZATION=f"Bearer {self.admin_token}",
+        )
+
+    @mock.patch("comum.views.csv_upload.process_csv_upload.delay")
+    def test_upload_csv_spools_file_by_hash(self, delay):
+        response = self._upload()
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["sha256"], self.sha256)
+        job = ImportJob.objects.get(id=response.json()["job_id"])
+        self.assertEqual(job.state, ImportJob.State.PENDING)
+        self.assertEqual(job.total_bytes, len(self.content))
+        self.assertEqual(job.created_by, self.admin_user)
+        spool_path = os.path.join(self.upload_dir.name, f"{self.sha256}.csv")
+        delay.assert_called_once_with(spool_path, mode="insert", job_id=str(job.id))
+        with open(spool_path, "rb") as file:
+            self.assertEqual(file.read(), self.content)
+        self.assertEqual(os.listdir(self.upload_dir.name), [f"{self.sha256}.csv"])
+
+    @mock.patch("comum.views.csv_upload.process_csv_upload.delay")
+    def test_upload_same_csv_twice(self, delay):
+        first = self._upload()
+        response = self._upload()
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["job_id"], first.json()["job_id"])
+        self.assertEqual(delay.call_count, 1)
+
+    @mock.patch("comum.views.csv_upload.process_csv_upload.delay")
+    def test_upload_already_imported_csv(self, delay):
+        self._upload()
+        process_csv_upload(*delay.call_args.args, **delay.call_args.kwargs)
+
+        response = self._upload()
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(os.listdir(self.upload_dir.name), [])
+
+    @mock.patch("comum.views.csv_upload.process_csv_upload.delay")
+    def test_upload_csv_again_after_failed_import(self, delay):
+        self._upload()
+        ImportJob.objects.update(state=ImportJob.State.FAILED)
+        finish_upload(delay.call_args.args[0])
+
+        response = self._upload()
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(ImportJob.objects.count(), 2)
+
+    @mock.patch("comum.views.csv_upload.process_csv_upload.delay")
+    def test_upload_csv_with_invalid_mode(self, delay):
+        response = self._upload(mode="replace")
+
+        self.assertEqual(response.status_code, 400)
+        delay.assert_not_called()
+        self.assertFalse(ImportJob.objects.exists())
+        self.assertEqual(os.listdir(self.upload_dir.name), [])
+
+    @mock.patch("comum.views.csv_upload.process_csv_upload.delay")
+    def test_process_csv_upload_tracks_job(self, delay):
+        job_id = self._upload().json()["job_id"]
+
+        result = process_csv_upload(*delay.call_args.args, **delay.call_args.kwargs)
+
+        self.assertEqual(result["inserted"], 1)
+        self.assertEqual(Part.objects.count(), 1)
+        self.assertEqual(os.listdir(self.upload_dir.name), [])
+        job = ImportJob.objects.get(id=job_id)
+        self.assertEqual(job.state, ImportJob.State.SUCCEEDED)
+        self.assertEqual((job.rows_processed, job.rows_inserted, job.rows_failed), (2, 1, 1))
+        self.assertEqual(job.bytes_processed, job.total_bytes)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(job.error_report[0]["line"], 3)
+
+    @mock.patch("comum.views.csv_upload.process_csv_upload.delay")
+    def test_process_csv_upload_records_failure(self, delay):
+        job_id = self._upload().json()["job_id"]
+
+        with mock.patch("comum.tasks.part_import_service.import_file", side_effect=OSError("disco cheio")):
+            with self.assertRaises(OSError), self.assertLogs("comum.tasks", level="ERROR"):
+                process_csv_upload(*delay.call_args.args, **delay.call_args.kwargs)
+
+        job = ImportJob.objects.get(id=job_id)
+        self.assertEqual(job.state, ImportJob.State.FAILED)
+        self.assertEqual(job.message, "disco cheio")
+
+    @mock.patch("comum.views.csv_upload.process_csv_upload.delay")
+    def test_import_job_status(self, delay):
+        job_id = self._upload().json()["job_id"]
+        process_csv_upload(*delay.call_args.args, **delay.call_args.kwargs)
+
+        response = self.client.get(
+            path=reverse("import-job", kwargs={"import_job_id": job_id}),
+            HTTP_AUTHORIZATION=f"Bearer {self.admin_token}",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["id"], job_id)
+        self.assertEqual(data["state"], "succeeded")
+        self.assertEqual(data["rows_processed"], 2)
+        self.assertEqual(data["rows_failed"], 1)
+        self.assertIn("rows_per_second", data)
+        self.assertIsNone(data["eta_seconds"])
+
+    @mock.patch("comum.views.csv_upload.process_csv_upload.delay")
+    def test_import_job_errors_download(self, delay):
+        job_id = self._upload().json()["job_id"]
+        process_csv_upload(*delay.call_args.args, **delay.call_args.kwargs)
+
+        response = self.client.get(
+            path=reverse("import-job-errors", kwargs={"import_job_id": job_id}),
+            HTTP_AUTHORIZATION=f"Bearer {self.admin_token}",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        lines = response.content.decode().splitlines()
+        self.assertEqual(lines[0], "line,offset,error,row")
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith("3,"))
+
+    def test_import_job_not_found(self):
+        response = self.client.get(
+            path=reverse("import-job", kwargs={"import_job_id": uuid.uuid4()}),
+            HTTP_AUTHORIZATION=f"Bearer {self.admin_token}",
+        )
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,149 @@
+import unittest
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from comum.factories.car_model import CarModelFactory
+from comum.factories.part import PartFactory
+from comum.models import Part
+from comum.services.part_import import IMPORT_BACKEND_COPY, IMPORT_BACKEND_ORM, IMPORT_MODE_UPSERT, PartImportService
+from comum.authentication import local_versions
+from comum.tests.base import AuthenticatedTestCase
+from comum.tests.fakes import fake_redis
+from comum.utils.detail_cache import detail_cache
+
+FAKE_REDIS = "redis://fake-detail-cache/1"
+
+
+@override_settings(CACHES={"default": {"BACKEND": "comum.tests.fakes.FakeRedisCache", "LOCATION": FAKE_REDIS}})
+class DetailCacheTest(AuthenticatedTestCase):
+    permissions = ("view_part", "view_carmodel", "change_carmodel")
+    is_staff = True
+
+    def setUp(self):
+        cache.clear()
+        detail_cache.clear_local()
+        detail_cache.reset_stats()
+        self.redis = fake_redis(FAKE_REDIS)
+        self.addCleanup(setattr, self.redis, "down", False)
+
+        super().setUp()
+        self.part = PartFactory(part_number="PN-001", name="AMORTECEDOR", details="Dianteiro", price=Decimal("200.00"), quantity=15)
+        self.car_model = CarModelFactory(name="UNO", manufacturer="FIAT", year=2010)
+
+    def _get(self, name, **kwargs):
+        return self.api_get(name, kwargs)
+
+    def _part_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self._get("manage-part", part_id=self.part.id)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), [query for query in queries if "comum_part" in query["sql"]]
+
+    def test_read_through_local_and_shared_tiers(self):
+        first, first_queries = self._part_queries()
+        second, second_queries = self._part_queries()
+        detail_cache.clear_local()
+        third, third_queries = self._part_queries()
+
+        self.assertEqual(len(first_queries), 1)
+        self.assertEqual(second_queries, [])
+        self.assertEqual(third_queries, [])
+        self.assertEqual(first, second)
+        self.assertEqual(first, third)
+        self.assertEqual(first["price"], "200.00")
+        stats = detail_cache.stats()
+        # dispatch e retrieve do inscode leem o objeto em cada requisição.
+        self.assertEqual((stats["misses"], stats["shared_hits"], stats["local_hits"]), (1, 1, 4))
+        self.assertEqual(set(stats["latency_ms"]), {"misses", "shared_hits", "local_hits"})
+
+    def test_save_invalidates(self):
+        self._part_queries()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.part.name = "AMORTECEDOR NOVO"
+            self.part.save()
+
+        data, queries = self._part_queries()
+        self.assertEqual(data["name"], "AMORTECEDOR NOVO")
+        self.assertEqual(len(queries), 1)
+
+    def test_soft_delete_and_restore(self):
+        self._part_queries()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.part.delete()
+        self.assertEqual(self._get("manage-part", part_id=self.part.id).status_code, 404)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Part.deleted_objects.get(pk=self.part.pk).restore()
+        self.assertEqual(self._get("manage-part", part_id=self.part.id).status_code, 200)
+
+    def test_car_model_update_through_api(self):
+        self.assertEqual(self._get("manage-car-model", car_model_id=self.car_model.id).json()["year"], 2010)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse("manage-car-model", kwargs={"car_model_id": self.car_model.id}),
+                data={"year": 2012}, content_type="application/json", HTTP_AUTHORIZATION=f"Bearer {self.token}",
+            )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self._get("manage-car-model", car_model_id=self.car_model.id).json()["year"], 2012)
+
+    def _upsert_invalidates(self, backend):
+        self._part_queries()
+        rows = [(2, {"part_number": "PN-001", "name": "AMORTECEDOR", "details": "Traseiro", "price": Decimal("210.00"), "quantity": 15})]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = PartImportService(backend=backend)._persist(rows, IMPORT_MODE_UPSERT)
+
+        self.assertEqual(result.updated, 1)
+        data, _ = self._part_queries()
+        self.assertEqual((data["details"], data["price"]), ("Traseiro", "210.00"))
+
+    def test_import_upsert_invalidates(self):
+        self._upsert_invalidates(IMPORT_BACKEND_ORM)
+
+    @unittest.skipUnless(connection.vendor == "postgresql", "COPY exige PostgreSQL")
+    def test_import_upsert_with_copy_invalidates(self):
+        self._upsert_invalidates(IMPORT_BACKEND_COPY)
+
+    @override_settings(DETAIL_CACHE_VERSION_CHECK_INTERVAL=60, PERMISSION_CACHE_VERSION_CHECK_INTERVAL=60)
+    def test_local_hit_skips_shared_cache(self):
+        first, _ = self._part_queries()
+        self.redis.down = True
+
+        # Versões e objeto vêm da memória do processo: nenhuma ida ao Redis.
+        second, queries = self._part_queries()
+
+        self.assertEqual(first, second)
+        self.assertEqual(queries, [])
+        self.assertEqual(detail_cache.stats()["errors"], 0)
+
+    def test_redis_down_reads_from_database(self):
+        # A versão de permissões do token, emitido neste processo, fica na memória.
+        local_versions.clear()
+        self.redis.down = True
+
+        with self.assertLogs("comum.utils.detail_cache", "WARNING"), self.assertLogs("comum.authentication", "WARNING"):
+            data, queries = self._part_queries()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.part.save()
+
+        self.assertEqual(data["name"], "AMORTECEDOR")
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(detail_cache.stats()["errors"], 2)
+
+    def test_stats_endpoint(self):
+        self._part_queries()
+
+        response = self.api_get("detail-cache-stats")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["misses"], 1)
+        self.assertIn("p95", response.json()["latency_ms"]["local_hits"])
@@ -0,0 +1,36 @@
+import unittest
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+
+from comum.models import CarModel, Part
+
+
+class ExplainEndpointsTest(TestCase):
+    @unittest.skipUnless(connection.vendor == "postgresql", "EXPLAIN ANALYZE exige PostgreSQL")
+    def test_explains_every_endpoint_and_discards_data(self):
+        out = StringIO()
+
+        call_command("explain_endpoints", parts=300, car_models=40, links=5, stdout=out)
+
+        self.assertIn("car-model: lista por fabricante e ano", out.getvalue())
+        self.assertIn("part: feed de alterações", out.getvalue())
+        self.assertFalse(Part.global_objects.exists())
+        self.assertFalse(CarModel.global_objects.exists())
+
+    @unittest.skipUnless(connection.vendor == "postgresql", "EXPLAIN ANALYZE exige PostgreSQL")
+    def test_high_deleted_ratio(self):
+        out = StringIO()
+
+        call_command("explain_endpoints", parts=50, car_models=10, links=2, deleted_ratio=0.9, stdout=out)
+
+        self.assertIn("part: lista OFFSET profundo", out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command("explain_endpoints", parts=10, deleted_ratio=1, stdout=StringIO())
+
+    @unittest.skipIf(connection.vendor == "postgresql", "só fora do PostgreSQL")
+    def test_requires_postgresql(self):
+        with self.assertRaises(CommandError):
+            call_command("explain_endpoints", parts=10, stdout=StringIO())
@@ -0,0 +1,101 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from comum.factories.car_model import CarModelFactory
+from comum.factories.part import PartFactory
+from comum.services import car_model_service
+from comum.utils.fitment import FITMENT_VERSION_KEY, _Adjacency, fitment_index
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class FitmentIndexTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        fitment_index.clear()
+        self.car_models = [
+            CarModelFactory(name=f"MODELO {index}", manufacturer="FIAT", year=2010 + index) for index in range(3)
+        ]
+        self.parts = [
+            PartFactory(
+                part_number=f"PN-{index:03}", name="PECA", details="Peça de teste",
+                price=Decimal("10.00"), quantity=1,
+            )
+            for index in range(4)
+        ]
+        self.car_models[0].parts.add(*self.parts[:3])
+        self.car_models[1].parts.add(*self.parts[1:])
+
+    def _ids(self, objects):
+        return {obj.pk for obj in objects}
+
+    def test_lookups_from_memory(self):
+        fitment_index.load()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(fitment_index.parts_for(self.car_models[0].pk), self._ids(self.parts[:3]))
+            self.assertEqual(fitment_index.car_models_for(self.parts[1].pk), self._ids(self.car_models[:2]))
+            self.assertEqual(fitment_index.parts_for_all([m.pk for m in self.car_models[:2]]), self._ids(self.parts[1:3]))
+            self.assertEqual(fitment_index.parts_for_any([m.pk for m in self.car_models]), self._ids(self.parts))
+            self.assertEqual(fitment_index.parts_for_all([m.pk for m in self.car_models]), set())
+
+    def test_m2m_changes_update_index_after_commit(self):
+        fitment_index.load()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.car_models[2].parts.add(self.parts[0])
+            self.parts[2].parts.remove(self.car_models[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.car_models[1].parts.clear()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(fitment_index.parts_for(self.car_models[2].pk), {self.parts[0].pk})
+            self.assertEqual(fitment_index.parts_for(self.car_models[0].pk), self._ids(self.parts[:2]))
+            self.assertEqual(fitment_index.parts_for(self.car_models[1].pk), set())
+            self.assertEqual(fitment_index.car_models_for(self.parts[0].pk), {self.car_models[0].pk, self.car_models[2].pk})
+
+    @override_settings(FITMENT_INDEX_MAX_PENDING=1)
+    def test_bulk_service_changes_are_compacted(self):
+        fitment_index.load()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            car_model_service.associate_parts([self.car_models[2].pk], [self.parts[0].pk, self.parts[3].pk])
+            car_model_service.remove_parts(self.car_models[1], [self.parts[3].pk])
+
+        self.assertEqual(fitment_index.stats()["pending_changes"], 0)
+        self.assertEqual(fitment_index.parts_for(self.car_models[2].pk), {self.parts[0].pk, self.parts[3].pk})
+        self.assertEqual(fitment_index.car_models_for(self.parts[3].pk), {self.car_models[2].pk})
+
+    @override_settings(FITMENT_INDEX_CHECK_INTERVAL=0)
+    def test_reloads_when_another_process_changes_links(self):
+        fitment_index.load()
+        # Vínculo gravado "por outro processo": sem on_commit aqui, só a versão muda.
+        self.car_models[2].parts.add(self.parts[3])
+        cache.set(FITMENT_VERSION_KEY, "outro-processo")
+
+        self.assertEqual(fitment_index.parts_for(self.car_models[2].pk), {self.parts[3].pk})
+
+    def test_changes_without_index_only_publish_the_version(self):
+        with mock.patch("comum.utils.fitment.cache") as shared:
+            fitment_index.add([(self.car_models[2].pk, self.parts[0].pk)])
+
+        shared.get_or_set.assert_not_called()
+        shared.set.assert_called_once()
+        self.assertFalse(fitment_index.loaded)
+
+    def test_load_builds_outside_the_lock(self):
+        held = []
+        build = _Adjacency.__init__
+
+        def spy(adjacency, size, pairs):
+            if pairs:
+                held.append(fitment_index.lock._is_owned())
+            build(adjacency, size, pairs)
+
+        with mock.patch.object(_Adjacency, "__init__", spy):
+            fitment_index.load()
+
+        self.assertEqual(held, [False, False])
+        self.assertEqual(fitment_index.parts_for(self.car_models[0].pk), self._ids(self.parts[:3]))
@@ -0,0 +1,80 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django_inscode.serializers import Serializer
+
+from comum.factories.car_model import CarModelFactory
+from comum.models import CarModel, Part
+from comum.tests.base import AuthenticatedTestCase, make_parts
+from comum.transports import CarModelTransport, PartTransport
+
+
+class ListViewsTest(AuthenticatedTestCase):
+    permissions = ("view_part", "view_carmodel")
+
+    def setUp(self):
+        super().setUp()
+        make_parts(12, price=lambda index: Decimal("10.50") + index, quantity=lambda index: index)
+        for index in range(12):
+            CarModelFactory(name=f"MODELO {index:02}", manufacturer="FIAT", year=2000 + index)
+        Part.objects.filter(part_number="PN-011").delete()
+
+    def _get(self, name, **params):
+        response = self.api_get(name, **params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        return response.json()
+
+    def _expected(self, model, transport, results):
+        serializer = Serializer(model, transport)
+        return [serializer.serialize(model.objects.get(pk=result["id"])) for result in results]
+
+    def test_parts_payload_matches_serializer(self):
+        first = self._get("part")
+        second = self._get("part", page=2)
+
+        self.assertEqual(first["pagination"], {
+            "current_page": 1, "total_items": 11, "has_next": True, "has_previous": False,
+        })
+        self.assertFalse(second["pagination"]["has_next"])
+        results = first["results"] + second["results"]
+        self.assertEqual(len(results), 11)
+        self.assertEqual(results, self._expected(Part, PartTransport, results))
+        self.assertEqual(results[0]["price"], "10.50")
+
+    def test_parts_cursor_payload_matches_serializer(self):
+        first = self._get("part", cursor="", ordering="name", page_size=5)
+        second = self._get("part", cursor=first["pagination"]["next_cursor"], ordering="name", page_size=5)
+
+        results = first["results"] + second["results"]
+        self.assertEqual([part["name"] for part in results], [f"PECA {index:02}" for index in range(10)])
+        self.assertEqual(results, self._expected(Part, PartTransport, results))
+
+    def test_car_models_payload_matches_serializer(self):
+        page = self._get("car-model")
+        cursor = self._get("car-model", cursor="", page_size=20)
+
+        self.assertEqual(page["pagination"]["total_items"], 12)
+        self.assertEqual([car_model["name"] for car_model in page["results"]], [f"MODELO {index:02}" for index in range(10)])
+        self.assertEqual(page["results"], self._expected(CarModel, CarModelTransport, page["results"]))
+        self.assertEqual(cursor["results"][:10], page["results"])
+        self.assertIsNone(cursor["pagination"]["next_cursor"])
+
+    def test_page_beyond_the_end(self):
+        response = self._get("part", page=5)
+
+        self.assertEqual(response["results"], [])
+        self.assertEqual(response["pagination"]["total_items"], 11)
+
+
+class ListsBenchmarkTest(TestCase):
+    def test_runs_and_discards_data(self):
+        out = StringIO()
+
+        call_command("benchmark", "lists", rows=20, repeat=2, stdout=out)
+
+        self.assertIn("lista: 20 peças, values_list + orjson", out.getvalue())
+        self.assertIn("pico KiB", out.getvalue())
+        self.assertFalse(Part.global_objects.exists())
@@ -0,0 +1,137 @@
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, SimpleTestCase, override_settings
+from django.urls import reverse
+
+from comum.factories.part import PartFactory
+from comum.models import Part
+from comum.tests.base import AuthenticatedTestCase
+from comum.tests.queries import GuardedClient
+from comum.utils import metrics
+from comum.utils.metrics import RequestSample, parse, registry
+from comum.utils.sql import fingerprint
+
+
+class FingerprintTest(SimpleTestCase):
+    def test_values_and_lists_are_normalized(self):
+        self.assertEqual(
+            fingerprint('SELECT "id" FROM "comum_part" WHERE "id" IN (%s, %s, %s) AND "name" = \'x\' LIMIT 21'),
+            'SELECT "id" FROM "comum_part" WHERE "id" IN (...) AND "name" = ? LIMIT ?',
+        )
+        self.assertEqual(
+            fingerprint("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)"),
+            fingerprint("INSERT INTO t (a, b)\n VALUES (%s, %s)"),
+        )
+
+    def test_identifiers_with_digits_are_kept(self):
+        self.assertEqual(fingerprint('SELECT "t2"."col1" FROM t2'), 'SELECT "t2"."col1" FROM t2')
+
+
+@override_settings(METRICS_ENABLED=True)
+class RequestMetricsTest(AuthenticatedTestCase):
+    permissions = ("view_part",)
+    is_staff = True
+
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+        super().setUp()
+        self.part = PartFactory(part_number="PN-001", name="AMORTECEDOR", details="Dianteiro", price=Decimal("200.00"), quantity=15)
+
+    def _get(self, name, **kwargs):
+        return self.api_get(name, kwargs)
+
+    def _samples(self):
+        return {(name, tuple(sorted(labels.items()))): value for name, labels, value in parse(registry.render())}
+
+    def test_records_per_route(self):
+        self._get("part")
+        self._get("part")
+        self._get("manage-part", part_id=self.part.id)
+
+        samples = self._samples()
+        self.assertEqual(samples[("http_requests_total", (("route", "part"), ("status", "200")))], 2)
+        self.assertEqual(samples[("http_requests_total", (("route", "manage-part"), ("status", "200")))], 1)
+        self.assertEqual(samples[("http_request_queries_count", (("route", "part"),))], 2)
+        self.assertEqual(samples[("http_request_serialize_seconds_count", (("route", "part"),))], 2)
+        self.assertEqual(samples[("http_request_duration_seconds_bucket", (("le", "+Inf"), ("route", "part")))], 2)
+        self.assertGreater(samples[("http_response_size_bytes_sum", (("route", "part"),))], 0)
+
+    def test_queries_pass_through_one_wrapper(self):
+        self._get("part")
+        self._get("part")
+
+        self.assertEqual(connection.execute_wrappers.count(metrics.execute), 1)
+        self.assertGreaterEqual(self._samples()[("http_request_queries_sum", (("route", "part"),))], 2)
+
+    def test_errors_are_recorded(self):
+        self.client.get(reverse("part"))
+
+        self.assertEqual(self._samples()[("http_requests_total", (("route", "part"), ("status", "500")))], 1)
+
+    @override_settings(METRICS_N_PLUS_ONE_THRESHOLD=3)
+    def test_repeated_queries(self):
+        sample = RequestSample()
+        for part_id in range(4):
+            sample.queries[f'SELECT * FROM "comum_part" WHERE "id" = {part_id}'] = 1
+        sample.queries['SELECT COUNT(*) FROM "comum_part"'] = 1
+
+        registry.record("part", 200, 0.01, sample, 10)
+
+        samples = self._samples()
+        self.assertEqual(samples[("http_n_plus_one_requests_total", (("route", "part"),))], 1)
+        query = 'SELECT * FROM "comum_part" WHERE "id" = ?'
+        self.assertEqual(samples[("http_repeated_queries_total", (("query", query), ("route", "part")))], 3)
+
+    def test_endpoint_requires_staff(self):
+        self._get("part")
+
+        response = self._get("metrics")
+        denied = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn('http_requests_total{route="part",status="200"} 1', response.content.decode())
+        self.assertEqual(denied.status_code, 401)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        # A cadeia de middlewares é montada na primeira requisição de cada Client.
+        self.client = GuardedClient()
+        self._get("part")
+
+        self.assertNotIn('route="part"', registry.render())
+
+    def test_metrics_top_command(self):
+        for _ in range(3):
+            self._get("part")
+        self._get("manage-part", part_id=self.part.id)
+        sample = RequestSample()
+        sample.queries.update({f'SELECT * FROM "comum_carmodel" WHERE "id" = {index}': 1 for index in range(6)})
+        registry.record("cars-model-part", 200, 0.001, sample, 10)
+        out = StringIO()
+
+        with tempfile.NamedTemporaryFile("w", suffix=".txt") as scrape:
+            scrape.write(registry.render())
+            scrape.flush()
+            call_command("metrics_top", scrape.name, sort="n+1", limit=2, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[1].startswith("cars-model-part"))
+        self.assertEqual(len([line for line in lines if line.startswith(("part ", "manage-part"))]), 1)
+        self.assertIn('cars-model-part: 5 execuções repetidas; a mais frequente: SELECT * FROM "comum_carmodel"', out.getvalue())
+
+
+class MetricsBenchmarkTest(TestCase):
+    def test_runs_and_discards_data(self):
+        out = StringIO()
+
+        call_command("benchmark", "metrics", rows=20, repeat=2, stdout=out)
+
+        self.assertIn("métricas: lista de peças, com métricas", out.getvalue())
+        self.assertFalse(Part.global_objects.exists())
+        self.assertEqual(registry.endpoints, {})
@@ -0,0 +1,91 @@
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+
+from comum.factories.part import PartFactory
+from comum.models import Part
+from comum.tests.base import AuthenticatedTestCase, make_parts
+from comum.utils.pagination import CursorError, KeysetPaginator, encode_cursor
+
+
+class KeysetPaginatorTest(TestCase):
+    def setUp(self):
+        # Nomes repetidos forçam o desempate pelo id.
+        for index in range(23):
+            PartFactory(
+                part_number=f"PN-{index:03}", name=f"PECA {index % 4}", details="Peça de teste",
+                price=Decimal("10.00"), quantity=1,
+            )
+
+    def _walk(self, ordering, fields):
+        paginator = KeysetPaginator(ordering, fields, page_size=5)
+        cursor, pages, seen = None, 0, []
+        while True:
+            rows, cursor = paginator.paginate(Part.objects.all(), cursor)
+            seen.extend(rows)
+            pages += 1
+            if cursor is None:
+                return seen, pages
+
+    def test_walks_every_row_once(self):
+        seen, pages = self._walk("name", ("name", "id"))
+
+        self.assertEqual(pages, 5)
+        self.assertEqual([part.pk for part in seen], list(Part.objects.order_by("name", "id").values_list("pk", flat=True)))
+
+    def test_walks_descending(self):
+        seen, _ = self._walk("-updated_at", ("updated_at", "id"))
+
+        self.assertEqual(
+            [part.pk for part in seen],
+            list(Part.objects.order_by("-updated_at", "-id").values_list("pk", flat=True)),
+        )
+
+    def test_rejects_cursor_from_other_ordering(self):
+        paginator = KeysetPaginator("name", ("name", "id"), page_size=5)
+
+        with self.assertRaises(CursorError):
+            paginator.paginate(Part.objects.all(), encode_cursor("-name", ["PECA 1", Part.objects.first().pk]))
+        with self.assertRaises(CursorError):
+            paginator.paginate(Part.objects.all(), "nao-e-um-cursor")
+
+
+class CursorPaginationViewTest(AuthenticatedTestCase):
+    permissions = ("view_part",)
+
+    def setUp(self):
+        super().setUp()
+        make_parts(12)
+
+    def _list(self, **params):
+        return self.api_get("part", **params)
+
+    def test_list_parts_with_cursor(self):
+        first = self._list(cursor="", ordering="name", page_size=5).json()
+        second = self._list(cursor=first["pagination"]["next_cursor"], ordering="name", page_size=5).json()
+
+        self.assertEqual([part["name"] for part in first["results"]], [f"PECA {index:02}" for index in range(5)])
+        self.assertEqual([part["name"] for part in second["results"]], [f"PECA {index:02}" for index in range(5, 10)])
+        self.assertEqual(first["pagination"]["total_items"], 12)
+        self.assertTrue(second["pagination"]["has_next"])
+
+    def test_list_parts_with_cursor_without_count(self):
+        with self.assertNumQueries(1):
+            response = self._list(cursor="", count="false", page_size=20)
+
+        self.assertEqual(len(response.json()["results"]), 12)
+        self.assertNotIn("total_items", response.json()["pagination"])
+        self.assertIsNone(response.json()["pagination"]["next_cursor"])
+
+    @override_settings(CURSOR_PAGE_SIZE_MAX=3)
+    def test_page_size_is_capped(self):
+        response = self._list(cursor="", page_size=100)
+
+        self.assertEqual(response.json()["pagination"]["page_size"], 3)
+        self.assertEqual(len(response.json()["results"]), 3)
+
+    def test_invalid_cursor(self):
+        response = self._list(cursor="invalido")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["message"], "Cursor inválido.")
@@ -1,16 +1,17 @@
 from django.contrib.auth.models import Permission
-from django.test import TestCase, Client
+from django.test import TestCase
 
 from comum.factories.car_model import CarModelFactory
 from comum.factories.group import GroupFactory
 from comum.factories.user import UserFactory
 from django.urls import reverse
 from comum.factories.part import PartFactory
+from comum.tests.queries import GuardedClient
 
 
 class PartTest(TestCase):
     def setUp(self):
-        self.client = Client()
+        self.client = GuardedClient()
         #Groups
         self.common_group = GroupFactory(name="comum")
         self.admin_group = GroupFactory(name="administrador")
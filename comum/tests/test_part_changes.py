@@ -0,0 +1,108 @@
+import unittest
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection, connections
+from django.test import override_settings
+from django.utils import timezone
+
+from comum.models import Part
+from comum.services.part import PartService
+from comum.tests.base import AuthenticatedTestCase, make_parts
+
+
+@override_settings(PART_CHANGES_SAFETY_LAG=0)
+class PartChangesTest(AuthenticatedTestCase):
+    permissions = ("view_part",)
+
+    def setUp(self):
+        super().setUp()
+        self.parts = make_parts(5, name="PECA")
+
+    def _changes(self, **params):
+        response = self.api_get("part-changes", **params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_full_sync_in_pages(self):
+        first = self._changes(limit=3)
+        second = self._changes(limit=3, cursor=first["next_cursor"])
+
+        self.assertTrue(first["has_more"])
+        self.assertFalse(second["has_more"])
+        self.assertEqual(
+            [part["part_number"] for part in first["results"] + second["results"]],
+            [part.part_number for part in self.parts],
+        )
+
+    def test_incremental_sync_includes_tombstones(self):
+        cursor = self._changes()["next_cursor"]
+        self.parts[1].quantity = 7
+        self.parts[1].save()
+        self.parts[3].delete()
+
+        changes = self._changes(cursor=cursor)
+
+        self.assertEqual([part["part_number"] for part in changes["results"]], ["PN-001", "PN-003"])
+        self.assertEqual([part["deleted"] for part in changes["results"]], [False, True])
+        self.assertIsNotNone(changes["results"][1]["deleted_at"])
+
+    def test_no_changes_keeps_cursor(self):
+        cursor = self._changes()["next_cursor"]
+
+        changes = self._changes(cursor=cursor)
+
+        self.assertEqual(changes["results"], [])
+        self.assertEqual(changes["next_cursor"], cursor)
+
+    @override_settings(PART_CHANGES_SAFETY_LAG=60)
+    def test_recent_changes_wait_for_safety_lag(self):
+        self.assertEqual(self._changes()["results"], [])
+
+    @unittest.skipUnless(connection.vendor == "postgresql", "pg_stat_activity exige PostgreSQL")
+    def test_open_write_transaction_holds_the_feed(self):
+        cursor = self._changes()["next_cursor"]
+        other = connections.create_connection("default")
+        self.addCleanup(other.close)
+        other.set_autocommit(False)
+        with other.cursor() as other_cursor:
+            # O lock que INSERT/UPDATE/DELETE pegam em comum_part (as peças do
+            # teste não são visíveis de outra conexão).
+            other_cursor.execute(f"LOCK TABLE {Part._meta.db_table} IN ROW EXCLUSIVE MODE")
+
+        # Alterada depois do início da transação aberta: espera o fim dela.
+        self.parts[1].quantity = 7
+        self.parts[1].save()
+        held = self._changes(cursor=cursor)
+        other.rollback()
+        released = self._changes(cursor=cursor)
+
+        self.assertEqual(held["results"], [])
+        self.assertEqual(held["next_cursor"], cursor)
+        self.assertEqual([part["part_number"] for part in released["results"]], ["PN-001"])
+
+    @unittest.skipUnless(connection.vendor == "postgresql", "pg_stat_activity exige PostgreSQL")
+    def test_open_write_to_other_tables_does_not_hold_the_feed(self):
+        cursor = self._changes()["next_cursor"]
+        other = connections.create_connection("default")
+        self.addCleanup(other.close)
+        other.set_autocommit(False)
+        with other.cursor() as other_cursor:
+            other_cursor.execute("SELECT txid_current()")
+
+        self.parts[1].quantity = 7
+        self.parts[1].save()
+        changes = self._changes(cursor=cursor)
+        other.rollback()
+
+        self.assertEqual([part["part_number"] for part in changes["results"]], ["PN-001"])
+
+    @override_settings(PART_CHANGES_SAFETY_LAG=0, PART_CHANGES_MAX_HOLD=60)
+    def test_open_write_holds_the_feed_up_to_max_hold(self):
+        now = timezone.now()
+        Part.objects.filter(pk=self.parts[1].pk).update(updated_at=now - timedelta(minutes=10))
+
+        with mock.patch.object(PartService, "_oldest_open_write", return_value=now - timedelta(days=1)):
+            changes = self._changes()
+
+        self.assertEqual([part["part_number"] for part in changes["results"]], ["PN-001"])
@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+from decimal import Decimal
+
+from django.test import override_settings
+from django.utils import timezone
+from django_inscode.serializers import Serializer
+
+from comum.models import Part
+from comum.tests.base import AuthenticatedTestCase, make_parts
+from comum.transports import PartTransport
+
+
+@override_settings(PART_EXPORT_CHUNK_SIZE=4)
+class PartExportTest(AuthenticatedTestCase):
+    permissions = ("view_part",)
+
+    def setUp(self):
+        super().setUp()
+        make_parts(
+            10, details="Peça, \"de teste\"", price=lambda index: Decimal("10.00") + index, quantity=lambda index: index
+        )
+        Part.objects.filter(part_number="PN-009").delete()
+
+    def _export(self, **params):
+        response = self.api_get("part-export", **params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_ndjson_exports_every_part_in_order(self):
+        response, content = self._export()
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual([row["part_number"] for row in rows], [f"PN-{index:03}" for index in range(9)])
+        serializer = Serializer(Part, PartTransport)
+        self.assertEqual(rows, [serializer.serialize(part) for part in Part.objects.order_by("updated_at", "id")])
+
+    def test_csv_has_header_and_quoted_values(self):
+        response, content = self._export(format="csv")
+
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="parts.csv"')
+        self.assertEqual(len(rows), 9)
+        self.assertEqual(rows[0]["details"], "Peça, \"de teste\"")
+        self.assertEqual(rows[3]["price"], "13.00")
+
+    def test_filters_and_since(self):
+        since = timezone.now()
+        Part.objects.filter(part_number__in=["PN-001", "PN-002", "PN-003"]).update(updated_at=since)
+
+        _, content = self._export(since=since.isoformat(), price_min="12", price_max="13")
+        _, by_name = self._export(name="peca 0", part_number="PN-005")
+
+        self.assertEqual(sorted(json.loads(line)["part_number"] for line in content.splitlines()), ["PN-002", "PN-003"])
+        self.assertEqual([json.loads(line)["part_number"] for line in by_name.splitlines()], ["PN-005"])
+
+    def test_invalid_params(self):
+        for params in ({"format": "xml"}, {"since": "ontem"}, {"price_min": "dez"}, {"price_max": "NaN"}):
+            response = self.api_get("part-export", **params)
+            self.assertEqual(response.status_code, 400, params)
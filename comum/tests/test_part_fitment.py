@@ -0,0 +1,101 @@
+import uuid
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from comum.factories.car_model import CarModelFactory
+from comum.tests.base import AuthenticatedTestCase, make_parts
+from comum.utils.fitment import fitment_index
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    FITMENT_QUERY_BACKEND="sql",
+)
+class PartFitmentTest(AuthenticatedTestCase):
+    permissions = ("view_part",)
+
+    def setUp(self):
+        cache.clear()
+        fitment_index.clear()
+        super().setUp()
+        self.uno = CarModelFactory(name="UNO", manufacturer="FIAT", year=2010)
+        self.palio = CarModelFactory(name="PALIO", manufacturer="FIAT", year=2014)
+        self.gol = CarModelFactory(name="GOL", manufacturer="VOLKSWAGEN", year=2012)
+        names = ["FILTRO", "VELA", "CORREIA", "PASTILHA"]
+        self.parts = {part.name: part for part in make_parts(len(names), name=lambda index: names[index])}
+        self.uno.parts.add(self.parts["FILTRO"], self.parts["VELA"])
+        self.palio.parts.add(self.parts["FILTRO"], self.parts["CORREIA"])
+        self.gol.parts.add(self.parts["PASTILHA"], self.parts["FILTRO"])
+
+    def _fitment(self, **params):
+        return self.api_get("part-fitment", **params)
+
+    def _names(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [part["name"] for part in response.json()["results"]]
+
+    def test_any_and_all_of_car_models(self):
+        car_models = f"{self.uno.pk},{self.palio.pk}"
+
+        self.assertEqual(self._names(self._fitment(car_models=car_models)), ["CORREIA", "FILTRO", "VELA"])
+        self.assertEqual(self._names(self._fitment(car_models=car_models, match="all")), ["FILTRO"])
+
+    def test_car_models_with_spaces_after_commas(self):
+        car_models = f"{self.uno.pk}, {self.palio.pk} ,"
+
+        self.assertEqual(self._names(self._fitment(car_models=car_models, match="all")), ["FILTRO"])
+
+    def test_in_memory_index_gives_same_results(self):
+        car_models = f"{self.uno.pk},{self.palio.pk},{self.gol.pk}"
+        with self.settings(FITMENT_QUERY_BACKEND="memory"):
+            self.assertEqual(self._names(self._fitment(car_models=car_models, match="all")), ["FILTRO"])
+            self.assertEqual(self._names(self._fitment(manufacturer="FIAT")), ["CORREIA", "FILTRO", "VELA"])
+
+    def test_auto_uses_sql_for_large_results(self):
+        fitment_index.load()
+        with self.settings(FITMENT_QUERY_BACKEND="auto", FITMENT_MEMORY_MAX_PARTS=2), \
+                CaptureQueriesContext(connection) as queries:
+            small = self._names(self._fitment(car_models=str(self.uno.pk)))
+            large = self._names(self._fitment(manufacturer="FIAT"))
+
+        self.assertEqual(small, ["FILTRO", "VELA"])
+        self.assertEqual(large, ["CORREIA", "FILTRO", "VELA"])
+        pages = [query["sql"] for query in queries if 'FROM "comum_part"' in query["sql"] and "ORDER BY" in query["sql"]]
+        self.assertNotIn("comum_carmodel_parts", pages[0])
+        self.assertIn("comum_carmodel_parts", pages[1])
+
+    def test_unknown_or_deleted_car_models_are_rejected(self):
+        self.palio.delete()
+        unknown = uuid.uuid4()
+
+        for match in ("all", "any"):
+            response = self._fitment(car_models=f"{self.uno.pk},{self.palio.pk},{unknown}", match=match)
+
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()["errors"], {"car_models": [str(self.palio.pk), str(unknown)]})
+
+    def test_manufacturer_and_year_range(self):
+        self.assertEqual(self._names(self._fitment(manufacturer="FIAT", year_min=2012)), ["CORREIA", "FILTRO"])
+        self.assertEqual(self._names(self._fitment(year_min=2010, year_max=2012, match="all")), ["FILTRO"])
+
+    def test_deleted_car_models_and_parts_are_ignored(self):
+        self.palio.delete()
+        self.parts["VELA"].delete()
+
+        self.assertEqual(self._names(self._fitment(manufacturer="FIAT", match="all")), ["FILTRO"])
+
+    def test_cursor_page_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self._fitment(manufacturer="FIAT", cursor="", page_size=2, count="false")
+
+        self.assertEqual(self._names(response), ["CORREIA", "FILTRO"])
+        self.assertTrue(response.json()["pagination"]["has_next"])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self._fitment().status_code, 400)
+        self.assertEqual(self._fitment(car_models="nao-e-uuid").status_code, 400)
+        self.assertEqual(self._fitment(manufacturer="FIAT", match="some").status_code, 400)
+        self.assertEqual(self._fitment(manufacturer="FIAT", year_min="dois mil").status_code, 400)
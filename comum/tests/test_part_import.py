@@ -0,0 +1,222 @@
+import csv
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from comum.factories.part import PartFactory
+from comum.models import ImportJob, Part
+from comum.services.part_import import (
+    IMPORT_BACKEND_COPY,
+    IMPORT_BACKEND_ORM,
+    IMPORT_MODE_UPSERT,
+    ImportFileError,
+    PartImportService,
+)
+from comum.tasks import aggregate_csv_shards, process_csv_shard, process_csv_upload
+from pecas_automotivas.celerys import app as celery_app
+
+
+class PartImportTest(TestCase):
+    def setUp(self):
+        self.service = PartImportService(batch_size=2)
+        self.header = ["part_number", "name", "details", "price", "quantity"]
+        self.rows = [
+            ["PN-001", "AMORTECEDOR", "Amortecedor dianteiro", "200.00", "15"],
+            ["PN-002", "PASTILHA", "Pastilha de freio", "89,90", "40"],
+            ["PN-003", "FILTRO", "Filtro de óleo", "abc", "3"],
+            ["PN-004", "VELA", "Vela de ignição", "25.50", "100"],
+            ["", "SEM CODIGO", "Linha sem part_number", "10.00", "1"],
+        ]
+
+    def _write_csv(self, rows, header=None):
+        file = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8", newline="")
+        self.addCleanup(os.remove, file.name)
+        writer = csv.writer(file)
+        writer.writerow(header or self.header)
+        writer.writerows(rows)
+        file.close()
+        return file.name
+
+    def test_import_file_in_batches(self):
+        file_path = self._write_csv(self.rows)
+
+        report = self.service.import_file(file_path)
+
+        self.assertEqual(report.rows_read, 5)
+        self.assertEqual(report.inserted, 3)
+        self.assertEqual(report.failed, 2)
+        self.assertEqual(len(report.chunk_timings), 2)
+        self.assertEqual(Part.objects.count(), 3)
+        self.assertEqual(Part.objects.get(part_number="PN-002").price, Decimal("89.90"))
+        self.assertEqual([error["line"] for error in report.errors], [4, 6])
+
+    def test_quantity_out_of_range_rejects_only_the_row(self):
+        rows = [
+            ["PN-001", "AMORTECEDOR", "Amortecedor dianteiro", "200.00", "15"],
+            ["PN-002", "PASTILHA", "Pastilha de freio", "89.90", "2147483648"],
+        ]
+        file_path = self._write_csv(rows)
+
+        report = self.service.import_file(file_path)
+
+        self.assertEqual(report.inserted, 1)
+        self.assertEqual(report.failed, 1)
+        self.assertIn("Quantidade fora do intervalo", report.errors[0]["error"])
+        self.assertTrue(Part.objects.filter(part_number="PN-001").exists())
+
+    def test_import_file_reports_progress_per_batch(self):
+        file_path = self._write_csv(self.rows)
+        _, header_end = self.service.read_header(file_path)
+        calls = []
+
+        self.service.import_file(file_path, progress=lambda report, bytes_read: calls.append((report.rows_read, bytes_read)))
+
+        self.assertEqual([rows for rows, _ in calls], [2, 5, 5])
+        self.assertEqual(calls[-1][1], os.path.getsize(file_path) - header_end)
+
+    def test_import_file_without_required_columns(self):
+        file_path = self._write_csv([["PN-001", "AMORTECEDOR"]], header=["part_number", "name"])
+
+        with self.assertRaises(ImportFileError):
+            self.service.import_file(file_path)
+
+        self.assertEqual(Part.objects.count(), 0)
+
+    def test_import_file_rejects_existing_part_number(self):
+        PartFactory(part_number="PN-001", name="AMORTECEDOR", details="Antigo", price=150, quantity=1)
+        file_path = self._write_csv(self.rows[:2])
+
+        report = self.service.import_file(file_path)
+
+        self.assertEqual(report.inserted, 1)
+        self.assertEqual(report.failed, 1)
+        self.assertEqual(report.errors[0]["error"], "part_number já cadastrado.")
+        self.assertEqual(Part.objects.filter(part_number="PN-001").count(), 1)
+
+    def _upsert_file(self, backend, queries):
+        unchanged = PartFactory(part_number="PN-001", name="AMORTECEDOR", details="Amortecedor dianteiro", price=Decimal("200.00"), quantity=15)
+        changed = PartFactory(part_number="PN-002", name="PASTILHA", details="Pastilha de freio", price=Decimal("50.00"), quantity=5)
+        updated_at = changed.updated_at
+        file_path = self._write_csv([self.rows[0], self.rows[1], self.rows[3]])
+
+        with self.assertNumQueries(queries):
+            report = PartImportService(batch_size=10, backend=backend).import_file(file_path, mode=IMPORT_MODE_UPSERT)
+
+        self.assertEqual((report.inserted, report.updated, report.skipped, report.failed), (1, 1, 1, 0))
+        self.assertEqual(Part.objects.count(), 3)
+        changed.refresh_from_db()
+        self.assertEqual(changed.price, Decimal("89.90"))
+        self.assertEqual(changed.quantity, 40)
+        self.assertGreater(changed.updated_at, updated_at)
+        unchanged.refresh_from_db()
+        self.assertEqual(unchanged.quantity, 15)
+
+    def test_upsert_file(self):
+        # SAVEPOINT, SELECT das chaves existentes, INSERT, UPDATE e RELEASE SAVEPOINT
+        self._upsert_file(IMPORT_BACKEND_ORM, 5)
+
+    @unittest.skipUnless(connection.vendor == "postgresql", "COPY exige PostgreSQL")
+    def test_upsert_file_with_copy(self):
+        # SAVEPOINT, CREATE TEMPORARY TABLE, TRUNCATE, COPY, INSERT ... ON CONFLICT e RELEASE SAVEPOINT
+        self._upsert_file(IMPORT_BACKEND_COPY, 6)
+
+    @unittest.skipUnless(connection.vendor == "postgresql", "COPY exige PostgreSQL")
+    def test_copy_inserts_over_soft_deleted_part(self):
+        PartFactory(part_number="PN-001", name="AMORTECEDOR", details="Antigo", price=150, quantity=1).delete()
+        file_path = self._write_csv(self.rows[:2])
+
+        report = PartImportService(backend=IMPORT_BACKEND_COPY).import_file(file_path)
+
+        self.assertEqual((report.inserted, report.failed), (2, 0))
+        self.assertEqual(Part.global_objects.filter(part_number="PN-001").count(), 2)
+
+    def test_backend_falls_back_to_orm_outside_postgresql(self):
+        with mock.patch.object(connection, "vendor", "sqlite"):
+            self.assertEqual(PartImportService().get_backend(), IMPORT_BACKEND_ORM)
+            with self.assertRaises(ImportFileError):
+                PartImportService(backend=IMPORT_BACKEND_COPY).get_backend()
+
+    def test_upsert_file_twice_does_not_duplicate(self):
+        file_path = self._write_csv(self.rows)
+
+        self.service.import_file(file_path, mode=IMPORT_MODE_UPSERT)
+        report = self.service.import_file(file_path, mode=IMPORT_MODE_UPSERT)
+
+        self.assertEqual((report.inserted, report.updated, report.skipped), (0, 0, 3))
+        self.assertEqual(Part.objects.count(), 3)
+
+    def test_process_csv_upload_task(self):
+        file_path = self._write_csv(self.rows[:2])
+
+        result = process_csv_upload(file_path)
+
+        self.assertEqual(result["inserted"], 2)
+        self.assertEqual(result["failed"], 0)
+        self.assertIn("rows_per_second", result)
+
+    def test_split_file_at_line_boundaries(self):
+        rows = [[f"PN-{index:03}", "PECA", "Peça de teste", "10.00", "1"] for index in range(50)]
+        file_path = self._write_csv(rows)
+        _, header_end = self.service.read_header(file_path)
+
+        ranges = self.service.split_file(file_path, 4)
+
+        self.assertEqual(len(ranges), 4)
+        self.assertEqual(ranges[0][0], header_end)
+        self.assertEqual(ranges[-1][1], os.path.getsize(file_path))
+        with open(file_path, "rb") as file:
+            for start, end in ranges:
+                file.seek(start - 1)
+                self.assertEqual(file.read(1), b"\n")
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+
+    def test_import_shards_and_aggregate(self):
+        rows = [[f"PN-{index:03}", "PECA", "Peça de teste", "10.00", "1"] for index in range(30)]
+        rows[7][3] = "abc"
+        file_path = self._write_csv(rows)
+
+        results = [
+            process_csv_shard(file_path, start, end, mode=IMPORT_MODE_UPSERT)
+            for start, end in self.service.split_file(file_path, 3)
+        ]
+        summary = aggregate_csv_shards(results, file_path)
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(summary["rows_read"], 30)
+        self.assertEqual(summary["inserted"], 29)
+        self.assertEqual(summary["failed"], 1)
+        self.assertIsNone(summary["errors"][0]["line"])
+        self.assertEqual(Part.objects.count(), 29)
+
+    def test_import_shards_update_job_progress(self):
+        rows = [[f"PN-{index:03}", "PECA", "Peça de teste", "10.00", "1"] for index in range(30)]
+        rows[7][3] = "abc"
+        file_path = self._write_csv(rows)
+        job = ImportJob.objects.create(file_name="pecas.csv", file_hash="0" * 64, mode="insert", total_bytes=os.path.getsize(file_path))
+
+        _, header_end = self.service.read_header(file_path)
+
+        for start, end in self.service.split_file(file_path, 3):
+            process_csv_shard(file_path, start, end, job_id=str(job.id))
+
+        job.refresh_from_db()
+        self.assertEqual((job.rows_processed, job.rows_inserted, job.rows_failed), (30, 29, 1))
+        self.assertEqual(job.bytes_processed, job.total_bytes - header_end)
+
+    @override_settings(CSV_IMPORT_SHARD_SIZE=256)
+    def test_process_csv_upload_fans_out_shards(self):
+        rows = [[f"PN-{index:03}", "PECA", "Peça de teste", "10.00", "1"] for index in range(40)]
+        file_path = self._write_csv(rows)
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+
+        result = process_csv_upload(file_path)
+
+        self.assertGreater(result["shards"], 1)
+        self.assertEqual(Part.objects.count(), 40)
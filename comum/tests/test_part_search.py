@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from comum.factories.part import PartFactory
+from comum.models import Part
+from comum.tests.base import AuthenticatedTestCase
+
+
+class PartSearchTest(AuthenticatedTestCase):
+    permissions = ("view_part",)
+
+    def setUp(self):
+        super().setUp()
+        for part_number, name, details in [
+            ("AMX-44712", "Amortecedor dianteiro", "Amortecedor a gás, lado esquerdo"),
+            ("AMX-44713", "Amortecedor traseiro", "Amortecedor a óleo"),
+            ("FLT-10020", "Filtro de óleo", "Compatível com motores 1.0 e 1.6"),
+        ]:
+            PartFactory(
+                part_number=part_number, name=name, details=details,
+                price=Decimal("10.00"), quantity=1,
+            )
+
+    def _search(self, **params):
+        return self.api_get("part-search", **params)
+
+    def test_search_by_word_fragments(self):
+        response = self._search(q="amortec diant")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([part["part_number"] for part in response.json()["results"]], ["AMX-44712"])
+
+    def test_search_by_partial_part_number(self):
+        results = self._search(q="4471").json()["results"]
+
+        self.assertEqual({part["part_number"] for part in results}, {"AMX-44712", "AMX-44713"})
+
+    def test_name_ranks_above_details(self):
+        results = self._search(q="óleo").json()["results"]
+
+        self.assertEqual([part["part_number"] for part in results], ["FLT-10020", "AMX-44713"])
+        self.assertGreater(results[0]["rank"], results[1]["rank"])
+
+    def test_search_skips_deleted_parts(self):
+        Part.objects.get(part_number="FLT-10020").delete()
+
+        self.assertEqual(self._search(q="filtro").json()["results"], [])
+
+    def test_search_requires_term(self):
+        response = self._search(q=" ")
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_search_vector_is_not_loaded_elsewhere(self):
+        part = Part.objects.get(part_number="FLT-10020")
+
+        with CaptureQueriesContext(connection) as queries:
+            detail = self.api_get("manage-part", {"part_id": part.id})
+            changes = self.api_get("part-changes")
+
+        self.assertEqual((detail.status_code, changes.status_code), (200, 200))
+        self.assertEqual(part.get_deferred_fields(), {"search_vector"})
+        self.assertEqual(Part.global_objects.get(pk=part.pk).get_deferred_fields(), {"search_vector"})
+        self.assertFalse([query for query in queries if "search_vector" in query["sql"]])
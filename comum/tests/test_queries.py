@@ -0,0 +1,54 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from comum.models import Part
+from comum.tests.base import make_parts
+from comum.tests.queries import RepeatedQueriesError, assert_no_repeated_queries
+
+
+class RepeatedQueriesTest(TestCase):
+    def setUp(self):
+        self.parts = make_parts(5)
+
+    def _one_by_one(self, parts):
+        return [Part.objects.get(pk=part.pk).name for part in parts]
+
+    def test_reports_query_and_stack(self):
+        with self.assertRaises(RepeatedQueriesError) as error:
+            with assert_no_repeated_queries(threshold=5, label="laço"):
+                self._one_by_one(self.parts)
+
+        report = str(error.exception)
+        self.assertIn("Consulta repetida 5 vezes em laço (limite: 5)", report)
+        self.assertIn('FROM "comum_part" WHERE', report)
+        self.assertIn("in _one_by_one", report)
+
+    def test_below_threshold(self):
+        with assert_no_repeated_queries(threshold=5):
+            self._one_by_one(self.parts[:4])
+            # IN com tamanhos diferentes é a mesma forma: também 4 execuções.
+            for size in range(1, 5):
+                list(Part.objects.filter(pk__in=[part.pk for part in self.parts[:size]]))
+
+    def test_stack_is_captured_once_per_shape(self):
+        with mock.patch("comum.tests.queries._project_stack", return_value=[]) as project_stack:
+            with assert_no_repeated_queries(threshold=10):
+                self._one_by_one(self.parts)
+                Part.objects.count()
+
+        self.assertEqual(project_stack.call_count, 2)
+
+    def test_decorator(self):
+        @assert_no_repeated_queries(threshold=3)
+        def load():
+            self._one_by_one(self.parts[:3])
+
+        with self.assertRaises(RepeatedQueriesError):
+            load()
+
+    def test_failures_inside_the_block_are_not_masked(self):
+        with self.assertRaises(Part.DoesNotExist):
+            with assert_no_repeated_queries(threshold=2):
+                self._one_by_one(self.parts[:3])
+                Part.objects.get(part_number="inexistente")
@@ -0,0 +1,114 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from comum.factories.car_model import CarModelFactory
+from comum.models import Part, Users
+from comum.tests.base import AuthenticatedTestCase, make_parts
+from comum.utils.fitment import fitment_index
+
+
+class RelationshipViewsTest(AuthenticatedTestCase):
+    permissions = ("view_part", "view_carmodel")
+
+    def setUp(self):
+        super().setUp()
+        self.car_models = [
+            CarModelFactory(name=f"MODELO {index:02}", manufacturer="FIAT", year=2010) for index in range(12)
+        ]
+        self.parts = make_parts(12)
+        self.car_models[0].parts.add(*self.parts)
+        for car_model in self.car_models:
+            car_model.parts.add(self.parts[0])
+        fitment_index.load()
+
+    def _get(self, name, kwargs, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api_get(name, kwargs, **params)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), queries
+
+    def test_parts_of_car_model_pages_in_one_query(self):
+        kwargs = {"car_model_id": self.car_models[0].id}
+        first, queries = self._get("parts-car-model", kwargs)
+        second, _ = self._get("parts-car-model", kwargs, page=2)
+
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("search_vector", queries[0]["sql"])
+        self.assertNotIn("comum_carmodel_parts", queries[0]["sql"])
+        self.assertEqual(first["pagination"]["total_items"], 12)
+        self.assertTrue(first["pagination"]["has_next"])
+        self.assertFalse(second["pagination"]["has_next"])
+        self.assertEqual(
+            [part["name"] for part in first["results"] + second["results"]],
+            [f"PECA {index:02}" for index in range(12)],
+        )
+
+    def test_car_models_of_part_pages_in_one_query(self):
+        kwargs = {"part_id": self.parts[0].id}
+        first, queries = self._get("cars-model-part", kwargs)
+        third, _ = self._get("cars-model-part", kwargs, page=3)
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(first["pagination"]["total_items"], 12)
+        self.assertEqual([car_model["name"] for car_model in first["results"]], [f"MODELO {index:02}" for index in range(10)])
+        self.assertEqual(third["results"], [])
+        self.assertEqual(third["pagination"]["total_items"], 12)
+
+    def test_cursor_page_in_one_query(self):
+        page, queries = self._get(
+            "parts-car-model", {"car_model_id": self.car_models[0].id}, cursor="", page_size=5, count="false",
+        )
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual([part["name"] for part in page["results"]], [f"PECA {index:02}" for index in range(5)])
+
+    def test_deleted_rows_are_not_listed(self):
+        self.parts[1].delete()
+        self.car_models[1].delete()
+
+        parts, _ = self._get("parts-car-model", {"car_model_id": self.car_models[0].id})
+        car_models, _ = self._get("cars-model-part", {"part_id": self.parts[0].id})
+        deleted_model, _ = self._get("parts-car-model", {"car_model_id": self.car_models[1].id})
+
+        self.assertEqual(parts["pagination"]["total_items"], 11)
+        self.assertEqual(car_models["pagination"]["total_items"], 11)
+        self.assertEqual(deleted_model["results"], [])
+
+
+    def test_index_is_loaded_on_first_read(self):
+        fitment_index.clear()
+
+        page, queries = self._get("parts-car-model", {"car_model_id": self.car_models[1].id})
+        _, second = self._get("cars-model-part", {"part_id": self.parts[0].id})
+
+        self.assertEqual([part["name"] for part in page["results"]], ["PECA 00"])
+        self.assertTrue(fitment_index.loaded)
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(len(second), 1)
+
+    def test_large_or_sql_backend_uses_the_link_table(self):
+        kwargs = {"car_model_id": self.car_models[0].id}
+        with self.settings(FITMENT_MEMORY_MAX_PARTS=5):
+            large, large_queries = self._get("parts-car-model", kwargs)
+        with self.settings(FITMENT_QUERY_BACKEND="sql"):
+            sql, sql_queries = self._get("parts-car-model", kwargs)
+
+        self.assertEqual(large["pagination"]["total_items"], 12)
+        self.assertEqual(sql["pagination"]["total_items"], 12)
+        self.assertIn("comum_carmodel_parts", large_queries[0]["sql"])
+        self.assertIn("comum_carmodel_parts", sql_queries[0]["sql"])
+
+
+class BenchmarkCommandTest(TestCase):
+    def test_runs_and_discards_data(self):
+        out = StringIO()
+
+        call_command("benchmark", "relationships", parts_per_model=30, car_models=2, repeat=2, stdout=out)
+
+        self.assertIn("view: peças do modelo, cursor no fim", out.getvalue())
+        self.assertFalse(Part.global_objects.exists())
+        self.assertFalse(Users.objects.exists())
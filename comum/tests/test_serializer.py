@@ -0,0 +1,70 @@
+import uuid
+from dataclasses import dataclass
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import List, Optional
+
+from django.test import SimpleTestCase
+from django_inscode.serializers import Serializer
+from django.utils import timezone
+
+from comum.base_transport import BaseTransport
+from comum.benchmarks.serializer import CarModelPartsTransport, serializer_reflexivo
+from comum.models import Part, Users
+from comum.transports import PartChangeTransport, PartTransport, UserTransport
+from comum.utils.serializer import row_serializer, serializer
+
+
+@dataclass(frozen=True)
+class PartOwnerTransport(BaseTransport):
+    owner: Optional[UserTransport]
+    tags: List[str]
+
+
+class SerializerTest(SimpleTestCase):
+    def setUp(self):
+        self.user = Users(id=uuid.uuid4(), username="joao", email="joao@example.com")
+        self.parts = [
+            Part(
+                id=uuid.uuid4(), part_number=f"PN-{index:03}", name="PECA", details="Peça",
+                price=Decimal("10.00"), quantity=index, updated_at=timezone.now(),
+            )
+            for index in range(3)
+        ]
+
+    def test_user_transport(self):
+        self.assertEqual(
+            serializer(self.user, UserTransport),
+            {"id": self.user.id, "username": "joao", "email": "joao@example.com"},
+        )
+
+    def test_nested_list_matches_previous_serializer(self):
+        car_model = SimpleNamespace(id=uuid.uuid4(), name="MODELO", parts=self.parts)
+
+        data = serializer(car_model, CarModelPartsTransport)
+
+        self.assertEqual(data, serializer_reflexivo(car_model, CarModelPartsTransport))
+        self.assertEqual([part["quantity"] for part in data["parts"]], [0, 1, 2])
+        self.assertEqual(set(data["parts"][0]), {field for field in PartTransport.__dataclass_fields__})
+
+    def test_optional_nested_transport_and_plain_list(self):
+        with_owner = SimpleNamespace(id=uuid.uuid4(), owner=self.user, tags=("freio", "dianteiro"))
+        without_owner = SimpleNamespace(id=uuid.uuid4(), owner=None, tags=[])
+
+        self.assertEqual(serializer(with_owner, PartOwnerTransport)["owner"]["username"], "joao")
+        self.assertEqual(serializer(with_owner, PartOwnerTransport)["tags"], ["freio", "dianteiro"])
+        self.assertIsNone(serializer(without_owner, PartOwnerTransport)["owner"])
+
+    def test_row_serializer_matches_inscode_serializer(self):
+        part = self.parts[1]
+        columns, convert = row_serializer(PartChangeTransport)
+        row = tuple(getattr(part, column) for column in columns) + ("coluna extra",)
+
+        self.assertEqual(columns, [field for field in PartChangeTransport.__dataclass_fields__])
+        self.assertEqual(convert(row), Serializer(Part, PartChangeTransport).serialize(part))
+        self.assertEqual(convert(row)["price"], "10.00")
+        self.assertIsNone(convert(row)["deleted_at"])
+
+    def test_row_serializer_rejects_nested_transports(self):
+        with self.assertRaises(TypeError):
+            row_serializer(CarModelPartsTransport)
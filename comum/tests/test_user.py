@@ -0,0 +1,48 @@
+from django.contrib.auth.models import Group
+from django.urls import reverse
+
+from comum.factories.group import GroupFactory
+from comum.factories.user import UserFactory
+from comum.tests.base import AuthenticatedTestCase
+
+
+class AddUserGroupTest(AuthenticatedTestCase):
+    permissions = ("change_users",)
+
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory(password="password123")
+        self.groups = [GroupFactory(name=f"grupo {index}") for index in range(8)]
+        self.user.groups.add(self.groups[0])
+
+    def _add(self, group_ids):
+        return self.client.patch(
+            reverse("add-user-group", kwargs={"user_id": self.user.id}),
+            data={"group_ids": group_ids}, content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+
+    def test_add_groups(self):
+        ids = [group.id for group in self.groups]
+
+        response = self._add(ids)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["add_group_ids"], ids[1:])
+        self.assertEqual(response.json()["invalid_group_ids"], [ids[0]])
+        self.assertEqual(set(self.user.groups.values_list("id", flat=True)), set(ids))
+
+    def test_invalid_and_repeated_ids(self):
+        missing = Group.objects.order_by("-id").first().id + 1
+        group_id = self.groups[1].id
+
+        response = self._add([group_id, str(group_id), "abc", None, missing])
+
+        self.assertEqual(response.json()["add_group_ids"], [group_id])
+        self.assertEqual(response.json()["invalid_group_ids"], [str(group_id), "abc", None, missing])
+
+    def test_no_groups_added(self):
+        response = self._add([])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["detail"], "Nenhum grupo foi vinculado.")
@@ -1,3 +1,4 @@
 from .car_model import CarModelTransport, PartsToRemoveTransport
-from .part import PartTransport
-from .user import UserTransport
\ No newline at end of file
+from .part import PartTransport, PartChangeTransport
+from .user import UserTransport
+from .import_job import ImportJobTransport
\ No newline at end of file
@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from django_inscode.transports import Transport
+
+
+@dataclass(frozen=True)
+class ImportJobTransport(Transport):
+    file_name: str
+    file_hash: str
+    mode: str
+    state: str
+    total_bytes: int
+    bytes_processed: int
+    rows_processed: int
+    rows_inserted: int
+    rows_updated: int
+    rows_skipped: int
+    rows_failed: int
+    message: str
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
\ No newline at end of file
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
+from typing import Optional
 from django_inscode.transports import Transport
 
 
@@ -11,4 +12,8 @@ class PartTransport(Transport):
     details: str
     price: Decimal
     quantity: int
-    updated_at: datetime
\ No newline at end of file
+    updated_at: datetime
+
+@dataclass(frozen=True)
+class PartChangeTransport(PartTransport):
+    deleted_at: Optional[datetime]
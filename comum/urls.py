@@ -2,10 +2,13 @@ from django.urls import path
 from rest_framework import permissions
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from comum.views import CarModelView, UserView
-from comum.views.auth import SignInView, SignUpView, SignOutView
+from comum.views.auth import SignInView, SignUpView, SignOutView, PermissionCacheStatsView
+from comum.views.cache import DetailCacheStatsView
 from comum.views.car_model import CarsModelPartView, RemovePartsCarModelView, AssociatePartsToCarModelsView
 from comum.views.csv_upload import CSVUploadView
-from comum.views.part import PartView, PartsCarModelView
+from comum.views.import_job import ImportJobView, ImportJobErrorsView
+from comum.views.metrics import MetricsView
+from comum.views.part import PartView, PartsCarModelView, PartChangesView, PartSearchView, PartFitmentView, PartExportView
 from comum.views.user import AddUserGroupModelView
 
 urlpatterns = [
@@ -15,6 +18,26 @@ urlpatterns = [
         PartView.as_view(),
         name="part",
     ),
+    path(
+        "part/changes/",
+        PartChangesView.as_view(),
+        name="part-changes",
+    ),
+    path(
+        "part/search/",
+        PartSearchView.as_view(),
+        name="part-search",
+    ),
+    path(
+        "part/fitment/",
+        PartFitmentView.as_view(),
+        name="part-fitment",
+    ),
+    path(
+        "part/export/",
+        PartExportView.as_view(),
+        name="part-export",
+    ),
     path(
         "part/<uuid:part_id>/",
         PartView.as_view(),
@@ -72,10 +95,17 @@ urlpatterns = [
     path("sign-in/", SignInView.as_view(), name="sign-in"),
     path("sign-up/", SignUpView.as_view(), name="sign-up"),
     path("sign-out/", SignOutView.as_view(), name="sign-out"),
+    path("auth/permission-cache/", PermissionCacheStatsView.as_view(), name="permission-cache-stats"),
+    #Cache
+    path("cache/detail/", DetailCacheStatsView.as_view(), name="detail-cache-stats"),
+    #Métricas
+    path("metrics/", MetricsView.as_view(), name="metrics"),
     #Token JWT
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     #CSV Upload
     path('upload_csv/', CSVUploadView.as_view(), name='upload_csv'),
+    path('import-job/<uuid:import_job_id>/', ImportJobView.as_view(), name='import-job'),
+    path('import-job/<uuid:import_job_id>/errors/', ImportJobErrorsView.as_view(), name='import-job-errors'),
 
 ]
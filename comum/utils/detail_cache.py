@@ -0,0 +1,151 @@
+import copy
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Callable, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Model
+
+from comum.utils.versions import LocalVersions
+
+logger = logging.getLogger(__name__)
+
+DETAIL_KEY = "detail:{}:{}:{}"
+DETAIL_VERSION_KEY = "detail:version:{}:{}"
+
+OUTCOMES = ("local_hits", "shared_hits", "misses", "errors")
+
+
+class DetailCache:
+    """
+    Leituras por id (detalhe de peça e de modelo) em dois níveis: LRU na
+    memória do processo e o cache compartilhado (Redis), na frente do banco.
+
+    Cada objeto tem uma versão no cache compartilhado, descartada pelos signals
+    quando ele é salvo, excluído ou restaurado; as chaves dos dois níveis levam
+    essa versão, então as entradas antigas deixam de ser usadas. A versão também
+    fica na memória do processo por `DETAIL_CACHE_VERSION_CHECK_INTERVAL`
+    segundos, e um acerto local não vai ao Redis; por isso uma alteração feita em
+    outro processo pode levar esse intervalo para aparecer aqui. Se o Redis
+    falhar, a leitura vai direto ao banco.
+    """
+
+    def __init__(self):
+        self.local = OrderedDict()
+        self.versions = LocalVersions("DETAIL_CACHE_VERSION_CHECK_INTERVAL", "DETAIL_CACHE_LOCAL_SIZE")
+        self.lock = threading.Lock()
+        self.counters = dict.fromkeys(OUTCOMES, 0)
+        self.latencies = {outcome: deque(maxlen=settings.DETAIL_CACHE_LATENCY_SAMPLES) for outcome in OUTCOMES}
+
+    def get(self, model: type, pk, loader: Callable[[], Model]) -> Model:
+        started = time.perf_counter()
+        label = model._meta.label_lower
+        try:
+            # O mesmo id em texto ou UUID precisa cair na mesma chave da invalidação.
+            pk = model._meta.pk.to_python(pk)
+        except ValidationError:
+            return loader()
+        version_key = DETAIL_VERSION_KEY.format(label, pk)
+        try:
+            version = self.versions.get(
+                version_key, lambda: cache.get_or_set(version_key, uuid.uuid4().hex, timeout=None)
+            )
+        except Exception:
+            logger.warning("Cache indisponível ao consultar a versão de %s %s.", label, pk, exc_info=True)
+            instance = loader()
+            self._record("errors", started)
+            return instance
+
+        key = DETAIL_KEY.format(label, pk, version)
+        with self.lock:
+            instance = self.local.get(key)
+            if instance is not None:
+                self.local.move_to_end(key)
+        if instance is not None:
+            self._record("local_hits", started)
+            # A instância local é compartilhada entre requisições; cada uma recebe a sua cópia.
+            return copy.copy(instance)
+
+        try:
+            instance = cache.get(key)
+        except Exception:
+            logger.warning("Cache indisponível ao ler %s %s.", label, pk, exc_info=True)
+            instance = None
+        if instance is not None:
+            outcome = "shared_hits"
+        else:
+            outcome = "misses"
+            instance = loader()
+            try:
+                cache.set(key, instance, settings.DETAIL_CACHE_TIMEOUT)
+            except Exception:
+                logger.warning("Cache indisponível ao gravar %s %s.", label, pk, exc_info=True)
+                outcome = "errors"
+        self._remember(key, instance)
+        self._record(outcome, started)
+        return copy.copy(instance)
+
+    def invalidate(self, model: type, pks: Iterable) -> None:
+        label = model._meta.label_lower
+        keys = [DETAIL_VERSION_KEY.format(label, pk) for pk in pks]
+        if not keys:
+            return
+        self.versions.discard(keys)
+        try:
+            cache.delete_many(keys)
+        except Exception:
+            logger.error("Cache indisponível ao invalidar %s objetos de %s.", len(keys), label, exc_info=True)
+
+    def clear_local(self) -> None:
+        self.versions.clear()
+        with self.lock:
+            self.local.clear()
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.counters = dict.fromkeys(OUTCOMES, 0)
+            for samples in self.latencies.values():
+                samples.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = sum(self.counters.values())
+            hits = self.counters["local_hits"] + self.counters["shared_hits"]
+            return {
+                **self.counters,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "local_entries": len(self.local),
+                "latency_ms": {
+                    outcome: _latency(samples) for outcome, samples in self.latencies.items() if samples
+                },
+            }
+
+    def _record(self, outcome: str, started: float) -> None:
+        elapsed = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.counters[outcome] += 1
+            self.latencies[outcome].append(elapsed)
+
+    def _remember(self, key, instance) -> None:
+        with self.lock:
+            self.local[key] = instance
+            self.local.move_to_end(key)
+            while len(self.local) > settings.DETAIL_CACHE_LOCAL_SIZE:
+                self.local.popitem(last=False)
+
+
+def _latency(samples) -> dict:
+    """Média e p95 (ms) das últimas leituras."""
+    ordered = sorted(samples)
+    return {
+        "avg": round(sum(ordered) / len(ordered), 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+    }
+
+
+detail_cache = DetailCache()
@@ -0,0 +1,54 @@
+import csv
+import io
+from typing import Iterable, Iterator, Type
+
+import orjson
+from django.db.models import QuerySet
+
+from comum.utils.serializer import row_serializer
+
+EXPORT_NDJSON = "ndjson"
+EXPORT_CSV = "csv"
+EXPORT_FORMATS = (EXPORT_NDJSON, EXPORT_CSV)
+
+CONTENT_TYPES = {
+    EXPORT_NDJSON: "application/x-ndjson",
+    EXPORT_CSV: "text/csv; charset=utf-8",
+}
+
+
+def stream_rows(queryset: QuerySet, transport: Type, export_format: str, chunk_size: int) -> Iterator[bytes]:
+    """
+    Gera o conteúdo da exportação em pedaços de até `chunk_size` linhas: uma
+    linha JSON por registro (NDJSON) ou CSV com cabeçalho, nos campos do
+    transport. A leitura usa um cursor no servidor (`iterator`), então a
+    memória não cresce com o tamanho do resultado.
+    """
+    columns, convert = row_serializer(transport)
+    rows = queryset.values_list(*columns).iterator(chunk_size=chunk_size)
+    encode = _ndjson if export_format == EXPORT_NDJSON else _csv
+    if export_format == EXPORT_CSV:
+        yield _csv_rows([columns])
+
+    batch = []
+    for row in rows:
+        batch.append(convert(row))
+        if len(batch) >= chunk_size:
+            yield encode(batch)
+            batch = []
+    if batch:
+        yield encode(batch)
+
+
+def _ndjson(batch: list) -> bytes:
+    return b"".join(orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE) for item in batch)
+
+
+def _csv(batch: list) -> bytes:
+    return _csv_rows(item.values() for item in batch)
+
+
+def _csv_rows(rows: Iterable) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
@@ -0,0 +1,321 @@
+import logging
+import threading
+import time
+import uuid
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+FITMENT_VERSION_KEY = "fitment:version"
+
+FITMENT_BACKEND_AUTO = "auto"
+FITMENT_BACKEND_SQL = "sql"
+
+
+class _Adjacency:
+    """
+    Lista de adjacência em CSR: os vizinhos do nó `n` são
+    `indices[indptr[n]:indptr[n + 1]]`, em ordem crescente.
+    """
+
+    def __init__(self, size: int, pairs: List[Tuple[int, int]]):
+        counts = [0] * (size + 1)
+        for source, _ in pairs:
+            counts[source + 1] += 1
+        for node in range(size):
+            counts[node + 1] += counts[node]
+        self.indptr = array("q", counts)
+        self.indices = array("i", bytes(4 * len(pairs)))
+        position = list(counts[:-1])
+        for source, target in sorted(pairs):
+            self.indices[position[source]] = target
+            position[source] += 1
+
+    def neighbours(self, node: int) -> array:
+        if node + 1 >= len(self.indptr):
+            return array("i")
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+
+class FitmentIndex:
+    """
+    Compatibilidade peça ↔ modelo de carro em memória, sem consultar a tabela
+    `CarModel.parts` a cada requisição. Os UUIDs são internados em inteiros e
+    as adjacências dos dois lados ficam em CSR (`array`), com as alterações
+    recentes em conjuntos à parte até a próxima compactação.
+
+    O índice é carregado da tabela na primeira leitura e atualizado pelos
+    signals deste processo. As alterações feitas por outros processos trocam a
+    versão no cache compartilhado; a versão é conferida a cada
+    `FITMENT_INDEX_CHECK_INTERVAL` segundos e, se mudou, o índice é recarregado
+    enquanto as leituras seguem na versão anterior. Guarda os vínculos como
+    estão na tabela, inclusive de peças e modelos excluídos (soft delete).
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        # Uma carga por vez; as leituras não esperam por ela (só a primeira).
+        self.loading = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Descarta o índice; o próximo uso recarrega da tabela."""
+        with self.lock:
+            self.loaded = False
+            self.version = None
+            self.checked_at = 0.0
+            self.part_ids: List[UUID] = []
+            self.part_index: Dict[UUID, int] = {}
+            self.car_model_ids: List[UUID] = []
+            self.car_model_index: Dict[UUID, int] = {}
+            self.parts_of = _Adjacency(0, [])
+            self.car_models_of = _Adjacency(0, [])
+            # Alterações ainda fora do CSR, indexadas pelos dois lados.
+            self.added: Set[Tuple[int, int]] = set()
+            self.removed: Set[Tuple[int, int]] = set()
+            self.pending_of_car_model: Dict[int, Set[int]] = {}
+            self.pending_of_part: Dict[int, Set[int]] = {}
+
+    def load(self) -> None:
+        """
+        Reconstrói o índice a partir da tabela de vínculos. A leitura da tabela
+        e o CSR são montados fora de `lock`; o índice novo só entra no lugar do
+        anterior no fim.
+        """
+        from comum.models import CarModel
+
+        # A versão é lida antes da tabela: uma alteração no meio da carga
+        # troca a versão e força outra carga na próxima conferência.
+        version = self._shared_version()
+        part_ids, part_index, car_model_ids, car_model_index = [], {}, [], {}
+        links = CarModel.parts.through.objects.values_list("carmodel_id", "part_id")
+        pairs = [
+            (_intern(car_model_ids, car_model_index, car_model_id), _intern(part_ids, part_index, part_id))
+            for car_model_id, part_id in links.iterator()
+        ]
+        parts_of = _Adjacency(len(car_model_ids), pairs)
+        car_models_of = _Adjacency(len(part_ids), [(part, car_model) for car_model, part in pairs])
+        with self.lock:
+            self.clear()
+            self.part_ids, self.part_index = part_ids, part_index
+            self.car_model_ids, self.car_model_index = car_model_ids, car_model_index
+            self.parts_of, self.car_models_of = parts_of, car_models_of
+            self.version = version
+            self.checked_at = time.monotonic()
+            self.loaded = True
+
+    def parts_for(self, car_model_id: UUID) -> Set[UUID]:
+        """Peças vinculadas ao modelo."""
+        self._ensure_fresh()
+        with self.lock:
+            node = self.car_model_index.get(car_model_id)
+            if node is None:
+                return set()
+            return {self.part_ids[part] for part in self._parts_of(node)}
+
+    def car_models_for(self, part_id: UUID) -> Set[UUID]:
+        """Modelos vinculados à peça."""
+        self._ensure_fresh()
+        with self.lock:
+            node = self.part_index.get(part_id)
+            if node is None:
+                return set()
+            return {self.car_model_ids[car_model] for car_model in self._car_models_of(node)}
+
+    def parts_for_all(self, car_model_ids: Iterable[UUID]) -> Set[UUID]:
+        """Peças vinculadas a todos os modelos informados."""
+        self._ensure_fresh()
+        with self.lock:
+            nodes = [self.car_model_index.get(car_model_id) for car_model_id in set(car_model_ids)]
+            if not nodes or None in nodes:
+                return set()
+            # Começa pelo modelo com menos peças: a interseção só diminui.
+            neighbour_sets = sorted((self._parts_of(node) for node in nodes), key=len)
+            parts = neighbour_sets[0]
+            for neighbours in neighbour_sets[1:]:
+                parts &= neighbours
+                if not parts:
+                    break
+            return {self.part_ids[part] for part in parts}
+
+    def parts_for_any(self, car_model_ids: Iterable[UUID]) -> Set[UUID]:
+        """Peças vinculadas a pelo menos um dos modelos informados."""
+        self._ensure_fresh()
+        with self.lock:
+            parts = set()
+            for car_model_id in set(car_model_ids):
+                node = self.car_model_index.get(car_model_id)
+                if node is not None:
+                    parts |= self._parts_of(node)
+            return {self.part_ids[part] for part in parts}
+
+    def add(self, pairs: Iterable[Tuple[UUID, UUID]]) -> None:
+        """Registra vínculos (car_model_id, part_id) gravados por este processo."""
+        self._apply(pairs, added=True)
+
+    def remove(self, pairs: Iterable[Tuple[UUID, UUID]]) -> None:
+        """Registra vínculos (car_model_id, part_id) removidos por este processo."""
+        self._apply(pairs, added=False)
+
+    def invalidate(self) -> None:
+        """Descarta o índice em todos os processos (ex.: exclusão definitiva de peças)."""
+        self._bump_version()
+        self.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "loaded": self.loaded,
+                "parts": len(self.part_ids),
+                "car_models": len(self.car_model_ids),
+                "links": len(self.parts_of) + len(self.added) - len(self.removed),
+                "pending_changes": len(self.added) + len(self.removed),
+            }
+
+    def _apply(self, pairs: Iterable[Tuple[UUID, UUID]], added: bool) -> None:
+        pairs = list(pairs)
+        if not pairs:
+            return
+        if not self.loaded:
+            # Sem índice aqui, basta avisar os outros processos.
+            self._bump_version()
+            return
+        previous = self._shared_version()
+        version = self._bump_version()
+        with self.lock:
+            if not self.loaded:
+                return
+            for car_model_id, part_id in pairs:
+                pair = (self._intern_car_model(car_model_id), self._intern_part(part_id))
+                in_base = pair[1] in self.parts_of.neighbours(pair[0])
+                self.added.discard(pair)
+                self.removed.discard(pair)
+                if added and not in_base:
+                    self.added.add(pair)
+                elif not added and in_base:
+                    self.removed.add(pair)
+                self.pending_of_car_model.setdefault(pair[0], set()).add(pair[1])
+                self.pending_of_part.setdefault(pair[1], set()).add(pair[0])
+            # Se só esta alteração mudou a versão, o índice continua válido; senão
+            # outro processo também alterou e a próxima leitura recarrega.
+            if version is not None and previous == self.version:
+                self.version = version
+            else:
+                self.checked_at = 0.0
+            if len(self.added) + len(self.removed) >= settings.FITMENT_INDEX_MAX_PENDING:
+                self._compact()
+
+    def _ensure_fresh(self) -> None:
+        now = time.monotonic()
+        with self.lock:
+            if self.loaded and now - self.checked_at < settings.FITMENT_INDEX_CHECK_INTERVAL:
+                return
+            loaded, known = self.loaded, self.version
+            if loaded:
+                # As demais leituras não repetem a conferência enquanto esta roda.
+                self.checked_at = now
+        if loaded:
+            version = self._shared_version()
+            if version is None or version == known:
+                return
+            logger.info("Índice de compatibilidade desatualizado; recarregando.")
+        # Com um índice carregado, se outra thread já recarrega, segue com ele.
+        if not self.loading.acquire(blocking=not loaded):
+            return
+        try:
+            if loaded or not self.loaded:
+                self.load()
+        finally:
+            self.loading.release()
+
+    def _parts_of(self, node: int) -> Set[int]:
+        parts = set(self.parts_of.neighbours(node))
+        for part in self.pending_of_car_model.get(node, ()):
+            if (node, part) in self.added:
+                parts.add(part)
+            elif (node, part) in self.removed:
+                parts.discard(part)
+        return parts
+
+    def _car_models_of(self, node: int) -> Set[int]:
+        car_models = set(self.car_models_of.neighbours(node))
+        for car_model in self.pending_of_part.get(node, ()):
+            if (car_model, node) in self.added:
+                car_models.add(car_model)
+            elif (car_model, node) in self.removed:
+                car_models.discard(car_model)
+        return car_models
+
+    def _compact(self) -> None:
+        """Incorpora as alterações pendentes às adjacências em CSR."""
+        pairs = [
+            (car_model, part)
+            for car_model in range(len(self.car_model_ids))
+            for part in self.parts_of.neighbours(car_model)
+            if (car_model, part) not in self.removed
+        ]
+        pairs.extend(self.added)
+        self.added, self.removed = set(), set()
+        self.pending_of_car_model, self.pending_of_part = {}, {}
+        self._build(pairs)
+
+    def _build(self, pairs: List[Tuple[int, int]]) -> None:
+        self.parts_of = _Adjacency(len(self.car_model_ids), pairs)
+        self.car_models_of = _Adjacency(len(self.part_ids), [(part, car_model) for car_model, part in pairs])
+
+    def _intern_part(self, part_id: UUID) -> int:
+        return _intern(self.part_ids, self.part_index, part_id)
+
+    def _intern_car_model(self, car_model_id: UUID) -> int:
+        return _intern(self.car_model_ids, self.car_model_index, car_model_id)
+
+    def _shared_version(self) -> Optional[str]:
+        try:
+            return cache.get_or_set(FITMENT_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        except Exception:
+            logger.warning("Cache indisponível ao consultar a versão do índice de compatibilidade.", exc_info=True)
+            return None
+
+    def _bump_version(self) -> Optional[str]:
+        version = uuid.uuid4().hex
+        try:
+            cache.set(FITMENT_VERSION_KEY, version, timeout=None)
+        except Exception:
+            logger.error("Cache indisponível ao publicar alteração de compatibilidade.", exc_info=True)
+            return None
+        return version
+
+
+def _intern(ids: List[UUID], index: Dict[UUID, int], value: UUID) -> int:
+    node = index.get(value)
+    if node is None:
+        node = index[value] = len(ids)
+        ids.append(value)
+    return node
+
+
+fitment_index = FitmentIndex()
+
+
+def indexed(lookup: Callable[[], Set[UUID]]) -> Optional[Set[UUID]]:
+    """
+    Ids respondidos pelo `fitment_index` (via `lookup`), ou `None` quando a
+    consulta deve ir ao banco: com `FITMENT_QUERY_BACKEND = "sql"` ou, em
+    `auto`, quando o resultado passa de `FITMENT_MEMORY_MAX_PARTS` ids (um
+    `pk IN (...)` desse tamanho custa mais que o join).
+    """
+    backend = settings.FITMENT_QUERY_BACKEND
+    if backend == FITMENT_BACKEND_SQL:
+        return None
+    ids = lookup()
+    if backend == FITMENT_BACKEND_AUTO and len(ids) > settings.FITMENT_MEMORY_MAX_PARTS:
+        return None
+    return ids
@@ -0,0 +1,246 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from comum.utils.sql import fingerprint
+
+# Limites dos buckets (Prometheus: cada bucket conta as observações <= limite).
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HISTOGRAMS = {
+    "http_request_duration_seconds": ("Tempo total da requisição.", LATENCY_BUCKETS),
+    "http_request_db_seconds": ("Tempo gasto em consultas ao banco.", LATENCY_BUCKETS),
+    "http_request_serialize_seconds": ("Tempo de serialização da resposta.", LATENCY_BUCKETS),
+    "http_request_queries": ("Consultas SQL por requisição.", QUERY_BUCKETS),
+    "http_response_size_bytes": ("Tamanho do corpo da resposta.", SIZE_BUCKETS),
+}
+
+_current = ContextVar("request_metrics", default=None)
+
+# Requisições enfileiradas por `record` antes de entrar nos histogramas; a que
+# completa o lote paga a agregação de todas.
+RECORD_BATCH = 64
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Pares (limite, observações <= limite), terminando em `+Inf`."""
+        total = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            yield bound, total
+
+
+class RequestSample:
+    """
+    Medições de uma requisição, preenchidas durante o processamento. Como
+    gerenciador de contexto, é a amostra da requisição em andamento: recebe
+    as consultas do `execute` instalado nas conexões e o tempo de
+    `timed_serialization`.
+    """
+
+    __slots__ = ("queries", "db_seconds", "serialize_seconds", "token")
+
+    def __init__(self):
+        # SQL -> execuções; dict e não Counter, que custa mais a cada requisição.
+        self.queries = {}
+        self.db_seconds = 0.0
+        self.serialize_seconds = None
+
+    def __enter__(self):
+        self.token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        _current.reset(self.token)
+        return False
+
+    def execute(self, execute, sql, params, many, context):
+        """`execute_wrapper` do Django: tempo e forma de cada consulta."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries[sql] = self.queries.get(sql, 0) + 1
+
+    def repeated(self) -> Counter:
+        """Execuções além da primeira de cada forma de consulta."""
+        shapes = Counter()
+        for sql, count in self.queries.items():
+            shapes[fingerprint(sql)] += count
+        return Counter({shape: count - 1 for shape, count in shapes.items() if count > 1})
+
+
+def execute(execute, sql, params, many, context):
+    """`execute_wrapper` fixo das conexões: repassa a consulta à amostra em andamento, se houver."""
+    sample = _current.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    return sample.execute(execute, sql, params, many, context)
+
+
+def install(connection, **kwargs) -> None:
+    """
+    Instala `execute` em `connection` uma única vez (também serve de receptor
+    de `connection_created`). Fica no início da lista para que os
+    `execute_wrapper` temporários, que saem com `pop()`, não o removam.
+    """
+    if execute not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, execute)
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.histograms = {name: Histogram(buckets) for name, (_, buckets) in HISTOGRAMS.items()}
+        self.responses = Counter()
+        self.n_plus_one = 0
+        self.repeated = Counter()
+
+
+class MetricsRegistry:
+    """
+    Métricas por rota (nome da URL) deste processo: histogramas de tempo,
+    consultas e tamanho da resposta, e as consultas repetidas numa mesma
+    requisição. Exportadas no formato texto do Prometheus.
+
+    `record` só enfileira a requisição; os histogramas são atualizados de
+    `RECORD_BATCH` em `RECORD_BATCH` requisições e antes de cada `render`,
+    fora do caminho da maioria das requisições.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = defaultdict(EndpointMetrics)
+        self.pending = []
+
+    def record(self, route: str, status: int, seconds: float, sample: RequestSample, size) -> None:
+        with self.lock:
+            self.pending.append((route, status, seconds, sample, size))
+            if len(self.pending) >= RECORD_BATCH:
+                self._flush()
+
+    def _flush(self) -> None:
+        """Leva as requisições enfileiradas aos histogramas. Chamado com `lock`."""
+        pending, self.pending = self.pending, []
+        for route, status, seconds, sample, size in pending:
+            queries = sum(sample.queries.values())
+            repeated = sample.repeated() if queries > 1 else None
+            endpoint = self.endpoints[route]
+            endpoint.responses[status] += 1
+            histograms = endpoint.histograms
+            histograms["http_request_duration_seconds"].observe(seconds)
+            histograms["http_request_db_seconds"].observe(sample.db_seconds)
+            histograms["http_request_queries"].observe(queries)
+            if sample.serialize_seconds is not None:
+                histograms["http_request_serialize_seconds"].observe(sample.serialize_seconds)
+            if size is not None:
+                histograms["http_response_size_bytes"].observe(size)
+            if repeated:
+                endpoint.repeated.update(repeated)
+                if max(repeated.values()) + 1 >= settings.METRICS_N_PLUS_ONE_THRESHOLD:
+                    endpoint.n_plus_one += 1
+
+    def reset(self) -> None:
+        with self.lock:
+            self.pending = []
+            self.endpoints.clear()
+
+    def render(self) -> str:
+        with self.lock:
+            self._flush()
+            endpoints = sorted(self.endpoints.items())
+            lines = [
+                "# HELP http_requests_total Requisições respondidas.",
+                "# TYPE http_requests_total counter",
+            ]
+            for route, endpoint in endpoints:
+                for status, count in sorted(endpoint.responses.items()):
+                    lines.append(f'http_requests_total{{route="{_escape(route)}",status="{status}"}} {count}')
+
+            for name, (help_text, _) in HISTOGRAMS.items():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for route, endpoint in endpoints:
+                    histogram = endpoint.histograms[name]
+                    label = f'route="{_escape(route)}"'
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+                    lines.append(f"{name}_sum{{{label}}} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{{{label}}} {histogram.count}")
+
+            lines += [
+                f"# HELP http_n_plus_one_requests_total Requisições com uma consulta repetida "
+                f"{settings.METRICS_N_PLUS_ONE_THRESHOLD} vezes ou mais.",
+                "# TYPE http_n_plus_one_requests_total counter",
+            ]
+            lines += [
+                f'http_n_plus_one_requests_total{{route="{_escape(route)}"}} {endpoint.n_plus_one}'
+                for route, endpoint in endpoints
+            ]
+            lines += [
+                "# HELP http_repeated_queries_total Execuções repetidas de uma mesma forma de consulta numa requisição.",
+                "# TYPE http_repeated_queries_total counter",
+            ]
+            for route, endpoint in endpoints:
+                for shape, count in endpoint.repeated.most_common(settings.METRICS_REPEATED_QUERIES):
+                    lines.append(
+                        f'http_repeated_queries_total{{route="{_escape(route)}",query="{_escape(shape)}"}} {count}'
+                    )
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def timed_serialization():
+    """Soma o tempo do bloco à serialização da requisição em andamento, se medida."""
+    sample = _current.get()
+    if sample is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        sample.serialize_seconds = (sample.serialize_seconds or 0.0) + time.perf_counter() - started
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+_LINE = re.compile(r'^(?P<name>[a-zA-Z_:][\w:]*)(?:\{(?P<labels>.*)\})? (?P<value>\S+)$')
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse(text: str):
+    """Amostras (nome, rótulos, valor) de um texto no formato do Prometheus."""
+    for line in text.splitlines():
+        match = _LINE.match(line)
+        if line.startswith("#") or match is None:
+            continue
+        labels = {
+            key: re.sub(r"\\(.)", lambda m: "\n" if m.group(1) == "n" else m.group(1), value)
+            for key, value in _LABEL.findall(match["labels"] or "")
+        }
+        yield match["name"], labels, float(match["value"])
+
+
+registry = MetricsRegistry()
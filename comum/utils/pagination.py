@@ -0,0 +1,95 @@
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+
+
+class CursorError(ValueError):
+    """Cursor malformado ou gerado para outra ordenação."""
+
+
+def encode_cursor(ordering: str, values: Sequence[Any]) -> str:
+    payload = json.dumps([ordering, [str(value) for value in values]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, List[str]]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ordering, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise CursorError("Cursor inválido.")
+    if not isinstance(ordering, str) or not isinstance(values, list):
+        raise CursorError("Cursor inválido.")
+    return ordering, values
+
+
+class KeysetPaginator:
+    """
+    Paginação por chave (keyset): cada página continua a partir dos valores da
+    última linha da anterior, com `WHERE (a, id) > (x, y) ORDER BY a, id LIMIT n`,
+    sem OFFSET. O custo é o mesmo na primeira página e na milésima, desde que
+    haja índice sobre os campos da ordenação.
+
+    `ordering` é o nome público da ordenação (ex.: "-updated_at"), que vai no
+    cursor; `fields` são os campos do modelo, o último deles único (o id).
+    """
+
+    def __init__(self, ordering: str, fields: Sequence[str], page_size: int):
+        self.ordering = ordering
+        self.fields = list(fields)
+        self.descending = ordering.startswith("-")
+        self.page_size = page_size
+
+    def paginate(
+        self, queryset: QuerySet, cursor: Optional[str], columns: Optional[Sequence[str]] = None
+    ) -> Tuple[list, Optional[str]]:
+        """
+        Retorna as linhas da página e o cursor da próxima (ou `None` na última).
+        Com `columns`, as linhas são tuplas de `values_list(*columns)`, que
+        precisam incluir os campos da ordenação.
+        """
+        if columns is not None:
+            queryset = queryset.values_list(*columns)
+        rows = list(self.page_queryset(queryset, cursor))
+        if len(rows) <= self.page_size:
+            return rows, None
+        rows = rows[: self.page_size]
+        return rows, self.cursor_for(rows[-1], columns)
+
+    def page_queryset(self, queryset: QuerySet, cursor: Optional[str]) -> QuerySet:
+        """Consulta de uma página, com uma linha a mais para saber se há próxima."""
+        prefix = "-" if self.descending else ""
+        queryset = queryset.order_by(*(f"{prefix}{field}" for field in self.fields))
+        if cursor:
+            queryset = queryset.filter(self._after(queryset, cursor))
+        return queryset[: self.page_size + 1]
+
+    def cursor_for(self, row, columns: Optional[Sequence[str]] = None) -> str:
+        """Cursor que continua a paginação depois de `row` (instância, ou tupla de `columns`)."""
+        if columns is not None:
+            values = [row[list(columns).index(field)] for field in self.fields]
+        else:
+            values = [getattr(row, field) for field in self.fields]
+        return encode_cursor(self.ordering, values)
+
+    def _after(self, queryset: QuerySet, cursor: str) -> Q:
+        ordering, raw_values = decode_cursor(cursor)
+        if ordering != self.ordering or len(raw_values) != len(self.fields):
+            raise CursorError("Cursor não corresponde à ordenação pedida.")
+        opts = queryset.model._meta
+        try:
+            values = [opts.get_field(field).to_python(value) for field, value in zip(self.fields, raw_values)]
+        except ValidationError:
+            raise CursorError("Cursor inválido.")
+
+        lookup = "lt" if self.descending else "gt"
+        # (a, b, id) > (x, y, z) expandido em OR; o filtro extra a >= x (ou <=)
+        # permite ao banco começar a varredura do índice no ponto certo.
+        condition = Q()
+        for position in range(len(self.fields)):
+            equal = {field: value for field, value in zip(self.fields[:position], values[:position])}
+            condition |= Q(**equal, **{f"{self.fields[position]}__{lookup}": values[position]})
+        return Q(**{f"{self.fields[0]}__{lookup}e": values[0]}) & condition
@@ -1,44 +1,130 @@
-from typing import Type, TypeVar, get_type_hints, get_origin, get_args, Union, Dict, Any
-from dataclasses import fields, is_dataclass, asdict
-from django.db.models import Model
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, TypeVar, Union, get_args, get_origin, get_type_hints
+from dataclasses import fields, is_dataclass
+from uuid import UUID
+from django.db.models import FileField, Model
+from django.core.exceptions import FieldDoesNotExist
 from comum.base_transport import BaseTransport
 from django.db.models.fields.files import FieldFile
 
 T = TypeVar("T", bound=BaseTransport)
 R = TypeVar("R", bound=Model)
 
+_compiled: Dict[Tuple[type, type], Callable[[Any], Dict[str, Any]]] = {}
+_compiled_rows: Dict[type, Tuple[List[str], Callable[[Sequence], Dict[str, Any]]]] = {}
+
+# Conversões do `Serializer` do inscode para os valores vindos do banco.
+ROW_CONVERSIONS = {
+    str: None,
+    int: None,
+    float: None,
+    bool: None,
+    Decimal: "str({})",
+    UUID: "str({})",
+    date: "{}.isoformat()",
+}
+
 
 def serializer(instance: R, dataclass_type: Type[T]) -> Dict[str, Any]:
-    data = {}
-    type_hints = get_type_hints(dataclass_type)
+    """
+    Converte `instance` no dicionário do transport `dataclass_type`. A função
+    de cada par (classe da instância, transport) é gerada na primeira chamada e
+    reaproveitada; os transports aninhados passam pelo mesmo cache.
+    """
+    key = (type(instance), dataclass_type)
+    compiled = _compiled.get(key)
+    if compiled is None:
+        compiled = _compiled[key] = _compile(type(instance), dataclass_type)
+    return compiled(instance)
+
 
+def _compile(instance_type: type, dataclass_type: type) -> Callable[[Any], Dict[str, Any]]:
+    """Gera `def serialize(instance): return {"campo": instance.campo, ...}` para o transport."""
+    type_hints = get_type_hints(dataclass_type)
+    namespace = {}
+    items = []
     for field in fields(dataclass_type):
-        value = getattr(instance, field.name)
-        field_type = type_hints[field.name]
-        origin = get_origin(field_type)
+        access = f"instance.{field.name}"
+        converter = _converter(instance_type, field.name, type_hints[field.name])
+        if converter is not None:
+            namespace[f"convert_{field.name}"] = converter
+            access = f"convert_{field.name}({access})"
+        items.append(f"{field.name!r}: {access}")
+    source = f"def serialize(instance):\n    return {{{', '.join(items)}}}\n"
+    exec(source, namespace)
+    return namespace["serialize"]
+
 
-        if origin is list:
-            item_type = get_args(field_type)[0]
-            related_manager = list(value.all()) if hasattr(value, "all") else value
-            data[field.name] = [serializer(item, item_type) for item in related_manager]
+def _converter(instance_type: type, name: str, field_type: Any) -> Optional[Callable[[Any], Any]]:
+    """Conversão do valor de um campo, ou `None` quando ele vai como está."""
+    origin = get_origin(field_type)
 
-        elif origin is Union and type(None) in get_args(field_type):
-            inner_type = get_args(field_type)[0]
-            if value is not None:
-                if is_dataclass(inner_type):
-                    data[field.name] = serializer(value, inner_type)
-                else:
-                    data[field.name] = value
-            else:
-                data[field.name] = None
+    if origin is list:
+        item_type = get_args(field_type)[0]
+        if is_dataclass(item_type):
+            return lambda value: [
+                serializer(item, item_type) for item in (value.all() if hasattr(value, "all") else value)
+            ]
+        return lambda value: list(value.all()) if hasattr(value, "all") else list(value)
 
-        elif is_dataclass(field_type):
-            data[field.name] = serializer(value, field_type)
+    if origin is Union and type(None) in get_args(field_type):
+        inner_type = get_args(field_type)[0]
+        if is_dataclass(inner_type):
+            return lambda value: None if value is None else serializer(value, inner_type)
+        return None
 
-        elif isinstance(value, FieldFile):
-            data[field.name] = value.url if value else None
+    if is_dataclass(field_type):
+        return lambda value: serializer(value, field_type)
 
-        else:
-            data[field.name] = value
+    if issubclass(instance_type, Model):
+        try:
+            model_field = instance_type._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        return _file_url if isinstance(model_field, FileField) else None
+    return lambda value: _file_url(value) if isinstance(value, FieldFile) else value
 
-    return asdict(dataclass_type(**data))
\ No newline at end of file
+
+def _file_url(value: FieldFile) -> Optional[str]:
+    return value.url if value else None
+
+
+def row_serializer(dataclass_type: Type[T]) -> Tuple[List[str], Callable[[Sequence], Dict[str, Any]]]:
+    """
+    Colunas do transport `dataclass_type` e a função que converte uma linha de
+    `values_list(*colunas)` no mesmo dicionário do `Serializer` do inscode
+    (Decimal e UUID como texto, datas em ISO 8601), sem instanciar o modelo.
+    Colunas além das do transport, no fim da linha, são ignoradas. Só serve a
+    transports de campos simples: listas, transports aninhados e arquivos
+    levantam `TypeError`.
+    """
+    compiled = _compiled_rows.get(dataclass_type)
+    if compiled is None:
+        compiled = _compiled_rows[dataclass_type] = _compile_row(dataclass_type)
+    return compiled
+
+
+def _compile_row(dataclass_type: type) -> Tuple[List[str], Callable[[Sequence], Dict[str, Any]]]:
+    type_hints = get_type_hints(dataclass_type)
+    columns = []
+    items = []
+    for index, field in enumerate(fields(dataclass_type)):
+        field_type = type_hints[field.name]
+        if get_origin(field_type) is Union and type(None) in get_args(field_type):
+            field_type = next(arg for arg in get_args(field_type) if arg is not type(None))
+        # datetime é subclasse de date.
+        base_type = next(
+            (base for base in ROW_CONVERSIONS if isinstance(field_type, type) and issubclass(field_type, base)), None
+        )
+        if base_type is None:
+            raise TypeError(f"Campo {field.name} ({field_type}) não pode vir de values_list.")
+        value = f"row[{index}]"
+        conversion = ROW_CONVERSIONS[base_type]
+        if conversion is not None:
+            value = f"(None if {value} is None else {conversion.format(value)})"
+        columns.append(field.name)
+        items.append(f"{field.name!r}: {value}")
+    namespace = {}
+    exec(f"def serialize(row):\n    return {{{', '.join(items)}}}\n", namespace)
+    return columns, namespace["serialize"]
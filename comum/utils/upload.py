@@ -0,0 +1,103 @@
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+SPOOL_NAME_PATTERN = re.compile(r"^(?P<sha256>[0-9a-f]{64})\.csv$")
+
+
+def upload_dir() -> Path:
+    path = Path(settings.CSV_UPLOAD_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def spool_path(sha256: str) -> Path:
+    return upload_dir() / f"{sha256}.csv"
+
+
+class SpooledUpload(UploadedFile):
+    """
+    Arquivo recebido pelo `CSVSpoolUploadHandler`, já gravado em disco no
+    diretório de uploads, com o SHA-256 do conteúdo calculado durante o envio.
+    """
+
+    def __init__(self, path, name, content_type, size, charset, sha256, content_type_extra=None):
+        super().__init__(open(path, "rb"), name, content_type, size, charset, content_type_extra)
+        self.path = path
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.path
+
+
+class CSVSpoolUploadHandler(FileUploadHandler):
+    """
+    Grava o arquivo enviado direto no diretório de uploads, em blocos, calculando
+    o hash do conteúdo no caminho; nada do arquivo é mantido em memória.
+    """
+
+    chunk_size = 1024 * 1024
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        descriptor, self.path = tempfile.mkstemp(dir=upload_dir(), prefix="upload-", suffix=".part")
+        self.file = os.fdopen(descriptor, "wb")
+        self.hash = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.file.write(raw_data)
+        self.hash.update(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.close()
+        return SpooledUpload(
+            self.path,
+            self.file_name,
+            self.content_type,
+            file_size,
+            self.charset,
+            self.hash.hexdigest(),
+            self.content_type_extra,
+        )
+
+    def upload_interrupted(self):
+        if hasattr(self, "file"):
+            self.file.close()
+            discard(self.path)
+
+
+def claim_upload(upload: SpooledUpload) -> Optional[Path]:
+    """
+    Move o arquivo recebido para o nome definitivo, derivado do hash. Retorna
+    `None`, descartando o arquivo, quando o mesmo conteúdo já aguarda importação.
+    """
+    try:
+        target = spool_path(upload.sha256)
+        try:
+            os.link(upload.path, target)
+        except FileExistsError:
+            return None
+        return target
+    finally:
+        upload.close()
+        discard(upload.path)
+
+
+def finish_upload(file_path) -> None:
+    """Remove o arquivo do spool ao fim da importação."""
+    if SPOOL_NAME_PATTERN.match(Path(file_path).name):
+        discard(file_path)
+
+
+def discard(file_path) -> None:
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
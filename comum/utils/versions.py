@@ -0,0 +1,49 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+
+
+class LocalVersions:
+    """
+    Cópia na memória do processo das versões guardadas no cache compartilhado,
+    conferida de novo a cada `interval_setting` segundos (como o
+    `FITMENT_INDEX_CHECK_INTERVAL` do índice de compatibilidade). Dentro desse
+    intervalo a leitura não vai ao Redis; em troca, uma invalidação feita por
+    outro processo só é vista aqui depois dele. As do próprio processo passam
+    por `discard` e valem na hora. Com intervalo 0 toda leitura vai ao Redis.
+    """
+
+    def __init__(self, interval_setting: str, size_setting: str):
+        self.interval_setting = interval_setting
+        self.size_setting = size_setting
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str, load: Callable[[], Optional[str]]) -> Optional[str]:
+        interval = getattr(settings, self.interval_setting)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and now - entry[1] < interval:
+                return entry[0]
+
+        version = load()
+        if version is not None and interval > 0:
+            with self.lock:
+                self.entries[key] = (version, now)
+                self.entries.move_to_end(key)
+                while len(self.entries) > getattr(settings, self.size_setting):
+                    self.entries.popitem(last=False)
+        return version
+
+    def discard(self, keys: Iterable[str]) -> None:
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
@@ -1,6 +1,10 @@
 from comum.services import auth_service, user_service
 from django.views import View
 from django.http import HttpRequest, JsonResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from comum.backends.permission_backend import permission_cache
 from comum.transports.user import UserTransport
 import json
 
@@ -40,3 +44,12 @@ class SignOutView(View):
     def post(self, request):
         auth_service.sign_out(request)
         return JsonResponse(data={}, status=200)
+
+
+class PermissionCacheStatsView(APIView):
+    """Contadores de acerto e falha do cache de permissões deste processo."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(permission_cache.stats())
@@ -0,0 +1,14 @@
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from comum.utils.detail_cache import detail_cache
+
+
+class DetailCacheStatsView(APIView):
+    """Acertos, falhas e latência (ms) do cache de detalhe de peças e modelos deste processo."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(detail_cache.stats())
@@ -1,20 +1,28 @@
 import uuid
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.http import HttpRequest, JsonResponse
-from django.utils.decorators import method_decorator
-from django.views.decorators.csrf import csrf_exempt
 from django_inscode import mixins
 from django_inscode.serializers import Serializer
 from django_inscode.views import ModelView, GenericModelView
 from rest_framework import status
-from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
 from rest_framework.views import APIView
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from comum.models import CarModel, Part
+from comum.models import CarModel
 from comum.services import car_model_service
 from comum.transports import CarModelTransport, PartsToRemoveTransport
+from comum.views.mixins import (
+    ConditionalListMixin, CursorPaginationMixin, JWTPermissionMixin, SingleQueryPaginationMixin, ValuesListMixin,
+)
 
-class CarModelView(ModelView, PermissionRequiredMixin):
+
+def _parse_uuid(value):
+    """Converte o id recebido na requisição; `None` quando não é um UUID válido."""
+    try:
+        return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+class CarModelView(JWTPermissionMixin, ConditionalListMixin, ValuesListMixin, CursorPaginationMixin, SingleQueryPaginationMixin, ModelView, PermissionRequiredMixin):
 
     fields = {
         "name",
@@ -23,6 +31,12 @@ class CarModelView(ModelView, PermissionRequiredMixin):
     }
 
     paginate_by = 10
+    page_ordering = ("name", "id")
+    cursor_orderings = {
+        "name": ("name", "id"),
+        "-name": ("name", "id"),
+    }
+    default_cursor_ordering = "name"
     service = car_model_service
     serializer = Serializer(CarModel, CarModelTransport)
     lookup_field = "car_model_id"
@@ -40,95 +54,35 @@ class CarModelView(ModelView, PermissionRequiredMixin):
 
         }
 
-    @method_decorator(csrf_exempt)
-    def dispatch(self, *args, **kwargs):
-
-        self._check_jwt_authentication(self.request)
-        if self.request.user.is_authenticated:
-            self._check_permission(self.request, self.request.method)
-        return super().dispatch(*args, **kwargs)
-
-    def _check_permission(self, request: HttpRequest, method: str):
-        """
-        Verifica se o usuário tem a permissão necessária para o método HTTP.
-        """
-        required_permission = self.permission_map.get(method)
-        if required_permission:
-            if not request.user.has_perm(required_permission):
-                raise PermissionDenied(
-                    f"Você não tem permissão para realizar esta ação.")
-
-    def _check_jwt_authentication(self, request):
-        """ Verifica a autenticação JWT manualmente. """
-
-        auth = request.headers.get('Authorization')
-        if not auth:
-            raise AuthenticationFailed('No Authorization header provided.')
-
-        try:
-            token = auth.split(' ')[1]
-            JWTAuthentication().authenticate(request)
-        except (IndexError, ValueError):
-            raise AuthenticationFailed('Invalid token format.')
-        except Exception as e:
-            raise AuthenticationFailed(f'Authentication failed: {str(e)}')
-        if not request.user.is_authenticated:
-            raise AuthenticationFailed('User is not logged in.')
-
-class CarsModelPartView(GenericModelView, mixins.ViewRetrieveModelMixin):
+
+class CarsModelPartView(JWTPermissionMixin, ConditionalListMixin, CursorPaginationMixin, SingleQueryPaginationMixin, GenericModelView, mixins.ViewRetrieveModelMixin):
+    """
+    Modelos de carro vinculados a uma peça, paginados por página ou por cursor
+    (ordem por nome).
+    """
 
     service = car_model_service
     serializer = Serializer(CarModel, CarModelTransport)
     lookup_field = "car_model_id"
 
+    paginate_by = 10
+    page_ordering = ("name", "id")
+    cursor_orderings = {
+        "name": ("name", "id"),
+        "-name": ("name", "id"),
+    }
+    default_cursor_ordering = "name"
+
     permission_map = {
         'GET': 'comum.view_carmodel',
     }
 
     def get_queryset(self, filter_kwargs=None):
         queryset = super().get_queryset(filter_kwargs)
-        part_id = self.kwargs.get('part_id')
-        queryset = queryset.filter(parts__id=part_id)
-        return queryset
-
-    @method_decorator(csrf_exempt)
-    def dispatch(self, *args, **kwargs):
-
-        self._check_jwt_authentication(self.request)
-        if self.request.user.is_authenticated:
-            self._check_permission(self.request, self.request.method)
-        return super().dispatch(*args, **kwargs)
-
-    def _check_permission(self, request: HttpRequest, method: str):
-        """
-        Verifica se o usuário tem a permissão necessária para o método HTTP.
-        """
-        required_permission = self.permission_map.get(method)
-        if required_permission:
-            if not request.user.has_perm(required_permission):
-                raise PermissionDenied(
-                    f"Você não tem permissão para realizar esta ação.")
-
-    def _check_jwt_authentication(self, request):
-        """ Verifica a autenticação JWT manualmente. """
-        auth = request.headers.get('Authorization')
+        return self.service.of_part(queryset, self.kwargs.get('part_id')).only(*self.get_only_fields())
 
-        if not auth:
-            raise AuthenticationFailed('No Authorization header provided.')
 
-        try:
-            token = auth.split(' ')[1]
-
-            JWTAuthentication().authenticate(request)
-        except (IndexError, ValueError):
-            raise AuthenticationFailed('Invalid token format.')
-        except Exception as e:
-            raise AuthenticationFailed(f'Authentication failed: {str(e)}')
-
-        if not request.user.is_authenticated:
-            raise AuthenticationFailed('User is not logged in.')
-
-class RemovePartsCarModelView(GenericModelView, mixins.ViewUpdateModelMixin):
+class RemovePartsCarModelView(JWTPermissionMixin, GenericModelView, mixins.ViewUpdateModelMixin):
 
     service = car_model_service
     serializer = Serializer(CarModel, PartsToRemoveTransport)
@@ -137,69 +91,26 @@ class RemovePartsCarModelView(GenericModelView, mixins.ViewUpdateModelMixin):
         'DELETE': 'comum.delete_carmodel',
     }
 
-    @method_decorator(csrf_exempt)
-    def dispatch(self, *args, **kwargs):
-
-        self._check_jwt_authentication(self.request)
-        if self.request.user.is_authenticated:
-            self._check_permission(self.request, self.request.method)
-        return super().dispatch(*args, **kwargs)
-
-    def _check_permission(self, request: HttpRequest, method: str):
-        """
-        Verifica se o usuário tem a permissão necessária para o método HTTP.
-        """
-        required_permission = self.permission_map.get(method)
-        if required_permission:
-            if not request.user.has_perm(required_permission):
-                raise PermissionDenied(
-                    f"Você não tem permissão para realizar esta ação.")
-
-    def _check_jwt_authentication(self, request):
-        """ Verifica a autenticação JWT manualmente. """
-        auth = request.headers.get('Authorization')
-
-        if not auth:
-            raise AuthenticationFailed('No Authorization header provided.')
-
-        try:
-            token = auth.split(' ')[1]
-            JWTAuthentication().authenticate(request)
-        except (IndexError, ValueError):
-            raise AuthenticationFailed('Invalid token format.')
-        except Exception as e:
-            raise AuthenticationFailed(f'Authentication failed: {str(e)}')
-
-        if not request.user.is_authenticated:
-            raise AuthenticationFailed('User is not logged in.')
-
     def _update(self, request: HttpRequest, *args, **kwargs):
         car_model = self.get_object()
         data = self.parse_request_data(request)
         ids = data.get('part_ids', [])
-        parts_removed_count = 0
         invalid_part_ids = []
         removed_part_ids = []
 
         if not isinstance(ids, list):
             return JsonResponse({"detail": "O campo 'part_ids' deve ser uma lista."}, status=status.HTTP_400_BAD_REQUEST)
 
-        for part_id_str in ids:
-            try:
-                part_id = uuid.UUID(part_id_str)
-                if car_model.parts.filter(pk=part_id).exists():
-                    part = Part.objects.get(pk=part_id)
-                    car_model.parts.remove(part)
-                    parts_removed_count += 1
-                    removed_part_ids.append(part_id_str)
-                else:
-                    invalid_part_ids.append(part_id_str)
-            except (ValueError, TypeError):
-                invalid_part_ids.append(part_id_str)
-            except Part.DoesNotExist:
-                invalid_part_ids.append(part_id_str)
+        part_uuids = [_parse_uuid(part_id) for part_id in ids]
+        removed = car_model_service.remove_parts(car_model, [part_id for part_id in part_uuids if part_id])
 
-        car_model.save()
+        for part_id_str, part_id in zip(ids, part_uuids):
+            if part_id in removed:
+                removed_part_ids.append(part_id_str)
+                removed.discard(part_id)
+            else:
+                invalid_part_ids.append(part_id_str)
+        parts_removed_count = len(removed_part_ids)
 
         if parts_removed_count > 0 or invalid_part_ids:
             response_data = {
@@ -232,28 +143,27 @@ class AssociatePartsToCarModelsView(APIView):
         if not isinstance(part_ids, list):
             return JsonResponse({'error': 'part_ids deve ser uma lista'}, status=status.HTTP_400_BAD_REQUEST)
 
+        car_model_uuids = [_parse_uuid(car_model_id) for car_model_id in car_model_ids]
+        part_uuids = [_parse_uuid(part_id) for part_id in part_ids]
+        found_car_models, found_parts = car_model_service.associate_parts(
+            [car_model_id for car_model_id in car_model_uuids if car_model_id],
+            [part_id for part_id in part_uuids if part_id],
+        )
+
         associated_parts = {}
         not_found_parts = {}
         not_found_car_models = []
 
-        for car_model_id in car_model_ids:
-            try:
-                car_model = CarModel.objects.get(pk=car_model_id)
-                associated_parts[car_model_id] = []
-                not_found_parts[car_model_id] = []
-
-                for part_id in part_ids:
-                    try:
-                        part = Part.objects.get(pk=part_id)
-                        car_model.parts.add(part)
-                        associated_parts[car_model_id].append(part_id)
-                    except Part.DoesNotExist:
-                        not_found_parts[car_model_id].append(part_id)
-
-                car_model.save()
-
-            except CarModel.DoesNotExist:
+        for car_model_id, car_model_uuid in zip(car_model_ids, car_model_uuids):
+            if car_model_uuid not in found_car_models:
                 not_found_car_models.append(car_model_id)
+                continue
+            associated_parts[car_model_id] = [
+                part_id for part_id, part_uuid in zip(part_ids, part_uuids) if part_uuid in found_parts
+            ]
+            not_found_parts[car_model_id] = [
+                part_id for part_id, part_uuid in zip(part_ids, part_uuids) if part_uuid not in found_parts
+            ]
 
         if associated_parts:
             message = {'message': 'Peças associadas com sucesso', 'associated_parts': associated_parts}
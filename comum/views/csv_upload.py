@@ -1,11 +1,13 @@
-import os
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.http import HttpRequest
 from rest_framework import views, parsers, status, generics
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 
+from comum.services import import_job_service
+from comum.services.part_import import IMPORT_MODE_INSERT, IMPORT_MODES
 from comum.tasks import process_csv_upload
+from comum.utils.upload import CSVSpoolUploadHandler, SpooledUpload, claim_upload, discard
 
 class CSVUploadView(generics.GenericAPIView, PermissionRequiredMixin):
 
@@ -28,15 +30,51 @@ class CSVUploadView(generics.GenericAPIView, PermissionRequiredMixin):
         if self.request.user.is_authenticated:
             self._check_permission(self.request, self.request.method)
 
-        file_obj = request.FILES['file']
-        temp_dir = 'temp'
-        if not os.path.exists(temp_dir):
-            os.makedirs(temp_dir)
+        # O arquivo é gravado em disco durante o parse do multipart, já com o hash calculado.
+        request.upload_handlers = [CSVSpoolUploadHandler(request)]
 
-        with open(f'temp/{file_obj.name}', 'wb') as f:
-            for chunk in file_obj.chunks():
-                f.write(chunk)
+        file_obj = request.FILES.get('file')
+        if not isinstance(file_obj, SpooledUpload):
+            return Response({"message": "Envie o arquivo CSV no campo 'file'."}, status=status.HTTP_400_BAD_REQUEST)
 
-        process_csv_upload.delay(f'temp/{file_obj.name}')
+        mode = request.data.get('mode', IMPORT_MODE_INSERT)
+        if mode not in IMPORT_MODES:
+            file_obj.close()
+            discard(file_obj.path)
+            return Response(
+                {"message": f"Modo de importação inválido. Use: {', '.join(IMPORT_MODES)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        return Response({"message": "Arquivo CSV enviado para processamento."}, status=status.HTTP_202_ACCEPTED)
\ No newline at end of file
+        # Conteúdo já importado (ou em importação) é recusado pelo hash registrado no
+        # ImportJob; o link do spool cobre envios simultâneos do mesmo arquivo.
+        job = import_job_service.find_active(file_obj.sha256)
+        if job is None:
+            file_path = claim_upload(file_obj)
+        else:
+            file_obj.close()
+            discard(file_obj.path)
+            file_path = None
+        if file_path is None:
+            return Response(
+                {
+                    "message": "Este arquivo já foi enviado para processamento.",
+                    "sha256": file_obj.sha256,
+                    "job_id": str(job.id) if job else None,
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        job = import_job_service.perform_action("create", data={
+            "file_name": file_obj.name,
+            "file_hash": file_obj.sha256,
+            "mode": mode,
+            "total_bytes": file_obj.size,
+            "created_by_id": request.user.pk,
+        })
+        process_csv_upload.delay(str(file_path), mode=mode, job_id=str(job.id))
+
+        return Response(
+            {"message": "Arquivo CSV enviado para processamento.", "sha256": file_obj.sha256, "job_id": str(job.id)},
+            status=status.HTTP_202_ACCEPTED,
+        )
@@ -0,0 +1,68 @@
+import csv
+import json
+
+from django.contrib.auth.mixins import PermissionRequiredMixin
+from django.http import HttpRequest, HttpResponse
+from django_inscode.serializers import Serializer
+from rest_framework import generics
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+
+from comum.models import ImportJob
+from comum.services import import_job_service
+from comum.transports import ImportJobTransport
+
+
+class ImportJobView(generics.GenericAPIView, PermissionRequiredMixin):
+
+    service = import_job_service
+    serializer = Serializer(ImportJob, ImportJobTransport)
+    lookup_field = "import_job_id"
+
+    permission_map = {
+        'GET': 'comum.view_importjob',
+    }
+
+    def _check_permission(self, request: HttpRequest, method: str):
+        """
+        Verifica se o usuário tem a permissão necessária para o método HTTP.
+        """
+        required_permission = self.permission_map.get(method)
+        if required_permission:
+            if not request.user.has_perm(required_permission):
+                raise PermissionDenied(
+                    f"Você não tem permissão para realizar esta ação.")
+
+    def get_job(self) -> ImportJob:
+        if self.request.user.is_authenticated:
+            self._check_permission(self.request, self.request.method)
+        return self.service.perform_action("read", self.kwargs.get(self.lookup_field))
+
+    def get(self, request, *args, **kwargs):
+        job = self.get_job()
+        return Response({
+            **self.serializer.serialize(job),
+            "rows_per_second": job.rows_per_second,
+            "eta_seconds": job.eta_seconds,
+            "errors_reported": len(job.error_report),
+        })
+
+
+class ImportJobErrorsView(ImportJobView):
+    """Relatório das linhas rejeitadas na importação, em CSV."""
+
+    def get(self, request, *args, **kwargs):
+        job = self.get_job()
+        response = HttpResponse(content_type="text/csv; charset=utf-8")
+        response["Content-Disposition"] = f'attachment; filename="import-{job.id}-erros.csv"'
+
+        writer = csv.writer(response)
+        writer.writerow(["line", "offset", "error", "row"])
+        for error in job.error_report:
+            writer.writerow([
+                error.get("line"),
+                error.get("offset"),
+                error.get("error"),
+                json.dumps(error.get("row"), ensure_ascii=False),
+            ])
+        return response
@@ -0,0 +1,324 @@
+import hashlib
+import time
+from calendar import timegm
+from dataclasses import fields
+
+import orjson
+from django.conf import settings
+from django.db.models import F, Func, IntegerField, Subquery
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.utils import timezone
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.csrf import csrf_exempt
+from django_inscode import exceptions
+from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
+
+from comum.authentication import jwt_authentication
+from comum.utils import metrics
+from comum.utils.pagination import CursorError, KeysetPaginator
+from comum.utils.serializer import row_serializer
+
+CURSOR_PARAMS = ("cursor", "ordering", "page_size", "count")
+
+
+class JWTPermissionMixin:
+    """
+    Autenticação JWT e permissão por método (`permission_map`) no dispatch das
+    views do inscode. O cabeçalho é lido uma vez e o token passa pelo
+    `jwt_authentication` do módulo; os tempos de cada etapa (ms) ficam em
+    `request.auth_timings` e vão no cabeçalho `Server-Timing` da resposta.
+    """
+
+    permission_map = {}
+
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        request.auth_timings = timings = {}
+        self.authenticate(request, timings)
+        started = time.perf_counter()
+        self.check_permission(request, request.method)
+        started = _lap(timings, "perm", started)
+        response = super().dispatch(request, *args, **kwargs)
+        _lap(timings, "app", started)
+        response["Server-Timing"] = ", ".join(f"{name};dur={duration:.3f}" for name, duration in timings.items())
+        return response
+
+    def authenticate(self, request: HttpRequest, timings: dict) -> None:
+        started = time.perf_counter()
+        header = jwt_authentication.get_header(request)
+        if not header:
+            raise AuthenticationFailed('No Authorization header provided.')
+        if len(header.split()) < 2:
+            raise AuthenticationFailed('Invalid token format.')
+
+        try:
+            # Outro esquema (ex.: Basic) não é JWT: fica o usuário da sessão, se houver.
+            raw_token = jwt_authentication.get_raw_token(header)
+            if raw_token is not None:
+                validated_token = jwt_authentication.get_validated_token(raw_token)
+                started = _lap(timings, "jwt", started)
+                request.user = jwt_authentication.get_user(validated_token)
+                _lap(timings, "user", started)
+        except AuthenticationFailed as e:
+            raise AuthenticationFailed(f'Authentication failed: {str(e)}')
+
+        if not request.user.is_authenticated:
+            raise AuthenticationFailed('User is not logged in.')
+
+    def check_permission(self, request: HttpRequest, method: str) -> None:
+        """Verifica se o usuário tem a permissão exigida para o método HTTP."""
+        required_permission = self.permission_map.get(method)
+        if required_permission and not request.user.has_perm(required_permission):
+            raise PermissionDenied("Você não tem permissão para realizar esta ação.")
+
+
+def _lap(timings: dict, name: str, started: float) -> float:
+    now = time.perf_counter()
+    timings[name] = (now - started) * 1000
+    return now
+
+
+class ListRowsMixin:
+    """
+    Pontos de extensão comuns às listagens paginadas: por padrão as linhas são
+    instâncias do modelo, serializadas uma a uma pelo serializer da view.
+    """
+
+    def get_list_columns(self):
+        """Colunas de `values_list()` das linhas, ou `None` para instâncias."""
+        return None
+
+    def serialize_rows(self, rows) -> list:
+        return [self.serialize_object(obj) for obj in rows]
+
+    def list_response(self, data: dict) -> HttpResponse:
+        return JsonResponse(data, status=200)
+
+    def page_response(self, request: HttpRequest, rows, pagination: dict, columns) -> HttpResponse:
+        with metrics.timed_serialization():
+            return self.list_response({"pagination": pagination, "results": self.serialize_rows(rows)})
+
+
+class ValuesListMixin:
+    """
+    Listagens sem instanciar o modelo nem o transport: as linhas vêm de
+    `values_list()` com os campos do transport, são convertidas numa só
+    passada e o JSON é gerado pelo orjson. O conteúdo é o mesmo do
+    `Serializer`. Deve vir antes dos mixins de paginação.
+    """
+
+    def get_list_columns(self):
+        return row_serializer(self.serializer.transport)[0]
+
+    def serialize_rows(self, rows) -> list:
+        convert = row_serializer(self.serializer.transport)[1]
+        return [convert(row) for row in rows]
+
+    def list_response(self, data: dict) -> HttpResponse:
+        return HttpResponse(orjson.dumps(data), content_type="application/json")
+
+
+class CursorPaginationMixin(ListRowsMixin):
+    """
+    Modo de paginação por cursor para as listagens. É usado quando a requisição
+    traz o parâmetro `cursor` (vazio na primeira página); sem ele a listagem
+    continua com a paginação por página do inscode.
+
+    Parâmetros: `ordering` (uma das chaves de `cursor_orderings`), `page_size`
+    (até `CURSOR_PAGE_SIZE_MAX`) e `count=false` para não contar o total.
+    """
+
+    cursor_orderings = {}
+    default_cursor_ordering = None
+
+    def list(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        if "cursor" not in request.GET:
+            return super().list(request, *args, **kwargs)
+        columns = self.get_list_columns()
+        rows, pagination, columns = self.fetch_cursor_page(request, columns)
+        return self.page_response(request, rows, pagination, columns)
+
+    def fetch_cursor_page(self, request: HttpRequest, columns):
+        """
+        Linhas e metadados da página pedida. Com `columns`, os campos da
+        ordenação que faltarem são acrescentados ao fim; retorna as colunas usadas.
+        """
+        filter_kwargs = request.GET.dict()
+        params = {name: filter_kwargs.pop(name, None) for name in CURSOR_PARAMS}
+        ordering = params["ordering"] or self.default_cursor_ordering
+        if ordering not in self.cursor_orderings:
+            raise exceptions.BadRequest(
+                message=f"Ordenação inválida. Use: {', '.join(self.cursor_orderings)}."
+            )
+
+        paginator = KeysetPaginator(ordering, self.cursor_orderings[ordering], self.get_page_size(params["page_size"]))
+        if columns is not None:
+            columns = list(dict.fromkeys([*columns, *paginator.fields]))
+        queryset = self.get_queryset(filter_kwargs)
+        try:
+            rows, next_cursor = paginator.paginate(queryset, params["cursor"], columns)
+        except CursorError as e:
+            raise exceptions.BadRequest(message=str(e))
+
+        pagination = {
+            "ordering": ordering,
+            "page_size": paginator.page_size,
+            "next_cursor": next_cursor,
+            "has_next": next_cursor is not None,
+        }
+        if (params["count"] or "true").lower() not in ("false", "0"):
+            pagination["total_items"] = queryset.count()
+        return rows, pagination, columns
+
+    def get_page_size(self, page_size) -> int:
+        if page_size is None:
+            return self.paginate_by
+        try:
+            page_size = int(page_size)
+        except ValueError:
+            raise exceptions.BadRequest(message="page_size deve ser um número inteiro.")
+        if page_size < 1:
+            raise exceptions.BadRequest(message="page_size deve ser maior que zero.")
+        return min(page_size, settings.CURSOR_PAGE_SIZE_MAX)
+
+
+class SingleQueryPaginationMixin(ListRowsMixin):
+    """
+    Paginação por página (`page`) numa só consulta: o total vem de uma
+    subconsulta escalar na própria página, em vez de um `count()` à parte, e a
+    ordenação é fixa (`page_ordering`) para as páginas não se sobreporem. Só
+    os campos do transport são carregados. A resposta tem o mesmo formato da
+    listagem do inscode.
+    """
+
+    page_ordering = ("id",)
+
+    def get_only_fields(self):
+        return [field.name for field in fields(self.serializer.transport)]
+
+    def list(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        columns = self.get_list_columns()
+        rows, pagination, columns = self.fetch_numbered_page(request, columns)
+        return self.page_response(request, rows, pagination, columns)
+
+    def fetch_numbered_page(self, request: HttpRequest, columns):
+        """Linhas e metadados da página pedida, e as colunas usadas (ou `None`)."""
+        filter_kwargs = request.GET.dict()
+        try:
+            page_number = int(filter_kwargs.pop("page", 1))
+        except ValueError:
+            raise exceptions.BadRequest(message="page deve ser um número inteiro.")
+        if page_number < 1:
+            raise exceptions.BadRequest(message="page deve ser maior que zero.")
+
+        queryset = self.get_queryset(filter_kwargs).order_by(*self.page_ordering)
+        start = (page_number - 1) * self.paginate_by
+        # Subconsulta sem correlação: o banco a executa uma vez. Um COUNT(*) OVER ()
+        # obrigaria a ler todas as linhas mesmo na primeira página.
+        total = queryset.order_by().values(total=Func(F("pk"), function="COUNT", output_field=IntegerField()))
+        page = queryset.annotate(total_items=Subquery(total))
+        if columns is not None:
+            # O total vai na última coluna, que a conversão das linhas ignora.
+            page = page.values_list(*columns, "total_items")
+        rows = list(page[start:start + self.paginate_by])
+        if rows:
+            total_items = rows[0][-1] if columns is not None else rows[0].total_items
+        else:
+            # Página além do fim: não há linha trazendo o total.
+            total_items = queryset.count() if page_number > 1 else 0
+
+        pagination = {
+            "current_page": page_number,
+            "total_items": total_items,
+            "has_next": start + len(rows) < total_items,
+            "has_previous": page_number > 1,
+        }
+        return rows, pagination, columns
+
+
+class ConditionalListMixin:
+    """
+    Requisições condicionais (`If-None-Match` / `If-Modified-Since`) no
+    detalhe e nas listagens paginadas. Deve vir antes dos mixins de paginação.
+
+    O ETag de uma página é o hash dos pares (id, updated_at) das linhas e dos
+    metadados da paginação; com `If-None-Match` na requisição, ele é
+    calculado por uma consulta só dessas colunas, e o 304 sai sem carregar
+    nem serializar as linhas. As listagens enviam só o ETag: um
+    `Last-Modified` exigiria mais uma consulta por requisição e, com resolução
+    de 1 s, daria 304 para uma alteração feita no mesmo segundo. No detalhe
+    ele vem do `updated_at` do objeto e é omitido enquanto esse segundo não
+    terminou.
+    """
+
+    validator_columns = ("id", "updated_at")
+
+    def get_list_columns(self):
+        columns = super().get_list_columns()
+        if columns is None:
+            return None
+        return [*columns, *(column for column in self.validator_columns if column not in columns)]
+
+    def get_only_fields(self):
+        return list(dict.fromkeys([*super().get_only_fields(), *self.validator_columns]))
+
+    def list(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        if "HTTP_IF_NONE_MATCH" not in request.META:
+            return super().list(request, *args, **kwargs)
+        fetch = self.fetch_cursor_page if "cursor" in request.GET else self.fetch_numbered_page
+        keys, pagination, columns = fetch(request, list(self.validator_columns))
+        etag = self.page_etag(keys, pagination, columns)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return _with_validators(not_modified, etag)
+        return super().list(request, *args, **kwargs)
+
+    def page_response(self, request: HttpRequest, rows, pagination: dict, columns) -> HttpResponse:
+        response = super().page_response(request, rows, pagination, columns)
+        return _with_validators(response, self.page_etag(rows, pagination, columns))
+
+    def retrieve(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        obj = self.get_object()
+        etag = _etag((str(obj.pk), obj.updated_at.isoformat()))
+        last_modified = _settled(obj.updated_at)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=_timestamp(last_modified))
+        if not_modified is not None:
+            return _with_validators(not_modified, etag, last_modified)
+        with metrics.timed_serialization():
+            response = JsonResponse(self.serialize_object(obj), status=200)
+        return _with_validators(response, etag, last_modified)
+
+    def page_etag(self, rows, pagination: dict, columns) -> str:
+        if columns is not None:
+            positions = [columns.index(column) for column in self.validator_columns]
+            keys = [tuple(row[position] for position in positions) for row in rows]
+        else:
+            keys = [tuple(getattr(row, column) for column in self.validator_columns) for row in rows]
+        return _etag(
+            [(str(pk), updated_at.isoformat()) for pk, updated_at in keys],
+            sorted(pagination.items()),
+        )
+
+
+def _etag(*parts) -> str:
+    return quote_etag(hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest())
+
+
+def _settled(updated_at):
+    """`updated_at` como `Last-Modified`, ou `None` se ainda cabe uma alteração no mesmo segundo."""
+    if updated_at.replace(microsecond=0) >= timezone.now().replace(microsecond=0):
+        return None
+    return updated_at
+
+
+def _timestamp(value):
+    return timegm(value.utctimetuple()) if value is not None else None
+
+
+def _with_validators(response: HttpResponse, etag: str, last_modified=None) -> HttpResponse:
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(_timestamp(last_modified))
+    return response
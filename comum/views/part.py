@@ -1,17 +1,25 @@
-from django.http import HttpRequest
-from django.utils.decorators import method_decorator
-from django.views.decorators.csrf import csrf_exempt
-from django_inscode import mixins
+import uuid
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_inscode import exceptions, mixins
 from django_inscode.serializers import Serializer
 from django_inscode.views import ModelView, GenericModelView
-from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
-from rest_framework_simplejwt.authentication import JWTAuthentication
 from comum.models import Part
 from comum.services import part_service
-from comum.transports import PartTransport
+from comum.services.part import FITMENT_MATCH_ALL, FITMENT_MATCH_ANY
+from comum.transports import PartTransport, PartChangeTransport
+from comum.utils.export import CONTENT_TYPES, EXPORT_FORMATS, EXPORT_NDJSON, stream_rows
+from comum.utils.pagination import CursorError
+from comum.views.mixins import (
+    ConditionalListMixin, CursorPaginationMixin, JWTPermissionMixin, SingleQueryPaginationMixin, ValuesListMixin,
+)
 
 
-class PartView(ModelView):
+class PartView(JWTPermissionMixin, ConditionalListMixin, ValuesListMixin, CursorPaginationMixin, SingleQueryPaginationMixin, ModelView):
 
     fields = {
         "part_number",
@@ -22,6 +30,14 @@ class PartView(ModelView):
     }
 
     paginate_by = 10
+    page_ordering = ("updated_at", "id")
+    cursor_orderings = {
+        "updated_at": ("updated_at", "id"),
+        "-updated_at": ("updated_at", "id"),
+        "name": ("name", "id"),
+        "-name": ("name", "id"),
+    }
+    default_cursor_ordering = "updated_at"
     service = part_service
     serializer = Serializer(Part, PartTransport)
     lookup_field = "part_id"
@@ -37,92 +53,212 @@ class PartView(ModelView):
     def get_context(self, request):
         return {"user": request.user}
 
-    @method_decorator(csrf_exempt)
-    def dispatch(self, *args, **kwargs):
 
-        self._check_jwt_authentication(self.request)
-        if self.request.user.is_authenticated:
-            self._check_permission(self.request, self.request.method)
-        return super().dispatch(*args, **kwargs)
+class PartsCarModelView(JWTPermissionMixin, ConditionalListMixin, CursorPaginationMixin, SingleQueryPaginationMixin, GenericModelView, mixins.ViewRetrieveModelMixin):
+    """
+    Peças vinculadas a um modelo de carro, paginadas por página ou por cursor
+    (ordem por nome).
+    """
+
+    service = part_service
+    serializer = Serializer(Part, PartTransport)
+    lookup_field = "part_id"
+
+    paginate_by = 10
+    page_ordering = ("name", "id")
+    cursor_orderings = {
+        "name": ("name", "id"),
+        "-name": ("name", "id"),
+    }
+    default_cursor_ordering = "name"
+
+    permission_map = {
+        'GET': 'comum.view_part',
+    }
+
+    def get_queryset(self, filter_kwargs=None):
+        queryset = super().get_queryset(filter_kwargs)
+        return self.service.of_car_model(queryset, self.kwargs.get('car_model_id')).only(*self.get_only_fields())
+
+
+class PartChangesView(JWTPermissionMixin, GenericModelView):
+    """
+    Feed de alterações de peças para sincronização incremental: devolve as peças
+    alteradas depois de `cursor`, incluindo as excluídas (`deleted: true`).
+
+    `has_more: false` só diz que não há mais alterações entregáveis agora, não
+    que o cliente está em dia: as dos últimos `PART_CHANGES_SAFETY_LAG` segundos
+    e as posteriores a uma transação ainda aberta que grava em peças (até
+    `PART_CHANGES_MAX_HOLD` segundos atrás) vêm nas próximas chamadas.
+    """
+
+    service = part_service
+    serializer = Serializer(Part, PartChangeTransport)
+
+    permission_map = {
+        'GET': 'comum.view_part',
+    }
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = min(int(request.GET.get("limit", settings.CURSOR_PAGE_SIZE_MAX)), settings.CURSOR_PAGE_SIZE_MAX)
+        except ValueError:
+            raise exceptions.BadRequest(message="limit deve ser um número inteiro.")
+        if limit < 1:
+            raise exceptions.BadRequest(message="limit deve ser maior que zero.")
+
+        try:
+            parts, next_cursor, has_more = self.service.changes(request.GET.get("cursor") or None, limit)
+        except CursorError as e:
+            raise exceptions.BadRequest(message=str(e))
+
+        return JsonResponse({
+            "results": [
+                {**self.serialize_object(part), "deleted": part.deleted_at is not None} for part in parts
+            ],
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+        })
+
 
-    def _check_permission(self, request: HttpRequest, method: str):
-        """
-        Verifica se o usuário tem a permissão necessária para o método HTTP.
-        """
-        required_permission = self.permission_map.get(method)
-        if required_permission:
-            if not request.user.has_perm(required_permission):
-                raise PermissionDenied(
-                    f"Você não tem permissão para realizar esta ação.")
+class PartExportView(JWTPermissionMixin, GenericModelView):
+    """
+    Exportação do catálogo de peças em NDJSON (padrão) ou CSV (`format=csv`),
+    enviada aos poucos enquanto é lida do banco.
 
-    def _check_jwt_authentication(self, request):
-        """ Verifica a autenticação JWT manualmente. """
+    Filtros opcionais: `since` (updated_at a partir deste instante, ISO 8601),
+    `name` (trecho do nome), `part_number`, `price_min` e `price_max`.
+    """
+
+    service = part_service
+    serializer = Serializer(Part, PartTransport)
 
-        auth = request.headers.get('Authorization')
+    permission_map = {
+        'GET': 'comum.view_part',
+    }
 
-        if not auth:
-            raise AuthenticationFailed('No Authorization header provided.')
+    def get(self, request, *args, **kwargs):
+        params = request.GET
+        export_format = params.get("format") or EXPORT_NDJSON
+        if export_format not in EXPORT_FORMATS:
+            raise exceptions.BadRequest(message=f"Formato inválido. Use: {', '.join(EXPORT_FORMATS)}.")
 
+        since = None
+        if params.get("since"):
+            try:
+                since = parse_datetime(params["since"])
+            except ValueError:
+                since = None
+            if since is None:
+                raise exceptions.BadRequest(message="since deve ser uma data e hora em ISO 8601.")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        prices = {}
+        for name in ("price_min", "price_max"):
+            if params.get(name):
+                try:
+                    prices[name] = Decimal(params[name])
+                except InvalidOperation:
+                    prices[name] = None
+                if prices[name] is None or not prices[name].is_finite():
+                    raise exceptions.BadRequest(message=f"{name} deve ser um número.")
+
+        parts = self.service.export(
+            since=since, name=params.get("name") or None, part_number=params.get("part_number") or None, **prices,
+        )
+        response = StreamingHttpResponse(
+            stream_rows(parts, self.serializer.transport, export_format, settings.PART_EXPORT_CHUNK_SIZE),
+            content_type=CONTENT_TYPES[export_format],
+        )
+        response["Content-Disposition"] = f'attachment; filename="parts.{export_format}"'
+        return response
+
+
+class PartSearchView(JWTPermissionMixin, GenericModelView):
+    """
+    Busca de peças por trechos do nome, dos detalhes ou do part_number
+    (`q`), ordenada por relevância.
+    """
+
+    service = part_service
+    serializer = Serializer(Part, PartTransport)
+
+    permission_map = {
+        'GET': 'comum.view_part',
+    }
+
+    def get(self, request, *args, **kwargs):
+        term = request.GET.get("q", "").strip()
+        if not term:
+            raise exceptions.BadRequest(message="Informe o termo de busca em q.")
         try:
-            token = auth.split(' ')[1]
-            JWTAuthentication().authenticate(request)
-        except (IndexError, ValueError):
-            raise AuthenticationFailed('Invalid token format.')
-        except Exception as e:
-            raise AuthenticationFailed(f'Authentication failed: {str(e)}')
+            limit = min(int(request.GET.get("limit", settings.PART_SEARCH_LIMIT)), settings.PART_SEARCH_LIMIT_MAX)
+        except ValueError:
+            raise exceptions.BadRequest(message="limit deve ser um número inteiro.")
+        if limit < 1:
+            raise exceptions.BadRequest(message="limit deve ser maior que zero.")
+
+        parts = self.service.search(term, limit)
+        return JsonResponse({
+            "results": [
+                {**self.serialize_object(part), "rank": round(float(part.rank), 4)} for part in parts
+            ],
+        })
 
-        if not request.user.is_authenticated:
-            raise AuthenticationFailed('User is not logged in.')
 
+class PartFitmentView(JWTPermissionMixin, CursorPaginationMixin, GenericModelView, mixins.ViewRetrieveModelMixin):
+    """
+    Peças compatíveis com um conjunto de modelos de carro, numa só requisição.
 
-class PartsCarModelView(GenericModelView, mixins.ViewRetrieveModelMixin):
+    Parâmetros: `car_models` (ids separados por vírgula), `manufacturer`,
+    `year_min`, `year_max` e `match` (`any`, padrão, ou `all`). A paginação
+    é a mesma da listagem de peças, por página ou por cursor. Ids de
+    `car_models` inexistentes ou excluídos respondem 400, listados em `errors`.
+    """
 
     service = part_service
     serializer = Serializer(Part, PartTransport)
     lookup_field = "part_id"
 
+    paginate_by = 10
+    cursor_orderings = {
+        "name": ("name", "id"),
+        "-name": ("name", "id"),
+    }
+    default_cursor_ordering = "name"
+
     permission_map = {
         'GET': 'comum.view_part',
     }
 
     def get_queryset(self, filter_kwargs=None):
-        queryset = super().get_queryset(filter_kwargs)
-        car_model_id = self.kwargs.get('car_model_id')
-        queryset = queryset.filter(parts__id=car_model_id)
-        return queryset
-
-    @method_decorator(csrf_exempt)
-    def dispatch(self, *args, **kwargs):
-
-        self._check_jwt_authentication(self.request)
-        if self.request.user.is_authenticated:
-            self._check_permission(self.request, self.request.method)
-        return super().dispatch(*args, **kwargs)
-
-    def _check_permission(self, request: HttpRequest, method: str):
-        """
-        Verifica se o usuário tem a permissão necessária para o método HTTP.
-        """
-        required_permission = self.permission_map.get(method)
-        if required_permission:
-            if not request.user.has_perm(required_permission):
-                raise PermissionDenied(
-                    f"Você não tem permissão para realizar esta ação.")
-
-    def _check_jwt_authentication(self, request):
-        """ Verifica a autenticação JWT manualmente. """
-        auth = request.headers.get('Authorization')
-
-        if not auth:
-            raise AuthenticationFailed('No Authorization header provided.')
+        params = self.request.GET
+        match = params.get("match") or FITMENT_MATCH_ANY
+        if match not in (FITMENT_MATCH_ANY, FITMENT_MATCH_ALL):
+            raise exceptions.BadRequest(message="match deve ser any ou all.")
 
-        try:
-            token = auth.split(' ')[1]
-            JWTAuthentication().authenticate(request)
-        except (IndexError, ValueError):
-            raise AuthenticationFailed('Invalid token format.')
-        except Exception as e:
-            raise AuthenticationFailed(f'Authentication failed: {str(e)}')
-
-        if not request.user.is_authenticated:
-            raise AuthenticationFailed('User is not logged in.')
\ No newline at end of file
+        car_model_ids = None
+        if params.get("car_models"):
+            try:
+                car_model_ids = [
+                    uuid.UUID(value.strip())
+                    for values in params.getlist("car_models")
+                    for value in values.split(",") if value.strip()
+                ]
+            except ValueError:
+                raise exceptions.BadRequest(message="car_models deve conter ids válidos separados por vírgula.")
+
+        years = {}
+        for name in ("year_min", "year_max"):
+            if params.get(name):
+                try:
+                    years[name] = int(params[name])
+                except ValueError:
+                    raise exceptions.BadRequest(message=f"{name} deve ser um número inteiro.")
+
+        manufacturer = params.get("manufacturer") or None
+        if car_model_ids is None and manufacturer is None and not years:
+            raise exceptions.BadRequest(message="Informe car_models, manufacturer ou uma faixa de anos.")
+
+        return self.service.fitting(car_model_ids, match, manufacturer, **years).order_by("name", "id")
@@ -1,17 +1,15 @@
 from django.contrib.auth.models import Group
+from django.core.exceptions import ValidationError
 from django.http import HttpRequest, JsonResponse
-from django.utils.decorators import method_decorator
-from django.views.decorators.csrf import csrf_exempt
 from django_inscode.views import GenericModelView
 from django_inscode.serializers import Serializer
 from django_inscode import mixins
 from rest_framework import status
-from rest_framework.exceptions import AuthenticationFailed
-from rest_framework_simplejwt.authentication import JWTAuthentication
 from comum.services import user_service
 from comum.transports import UserTransport
 from comum.models import Users
 from comum.transports.user import AddUserGroupTransport
+from comum.views.mixins import JWTPermissionMixin
 
 
 class UserView(
@@ -38,40 +36,15 @@ class UserView(
         return super().has_permission()
 
 
-class AddUserGroupModelView(GenericModelView, mixins.ViewUpdateModelMixin):
+class AddUserGroupModelView(JWTPermissionMixin, GenericModelView, mixins.ViewUpdateModelMixin):
 
     service = user_service
     serializer = Serializer(Users, AddUserGroupTransport)
     lookup_field = "user_id"
     permission_map = {
-        'PATCH': 'comum.change_user',
+        'PATCH': 'comum.change_users',
     }
 
-    @method_decorator(csrf_exempt)
-    def dispatch(self, *args, **kwargs):
-
-        self._check_jwt_authentication(self.request)
-        return super().dispatch(*args, **kwargs)
-
-    def _check_jwt_authentication(self, request):
-        """ Verifica a autenticação JWT manualmente. """
-        auth = request.headers.get('Authorization')
-
-        if not auth:
-            raise AuthenticationFailed('No Authorization header provided.')
-
-        try:
-            token = auth.split(' ')[1]
-
-            JWTAuthentication().authenticate(request)
-        except (IndexError, ValueError):
-            raise AuthenticationFailed('Invalid token format.')
-        except Exception as e:
-            raise AuthenticationFailed(f'Authentication failed: {str(e)}')
-
-        if not request.user.is_authenticated:
-            raise AuthenticationFailed('User is not logged in.')
-
     def _update(self, request: HttpRequest, *args, **kwargs):
         user = self.get_object()
         data = self.parse_request_data(request)
@@ -83,19 +56,21 @@ class AddUserGroupModelView(GenericModelView, mixins.ViewUpdateModelMixin):
         if not isinstance(ids, list):
             return JsonResponse({"detail": "O campo 'group_ids' deve ser uma lista."}, status=status.HTTP_400_BAD_REQUEST)
 
-        for group_id in ids:
-            try:
-                if not user.groups.filter(pk=group_id).exists():
-                    group = Group.objects.get(pk=group_id)
-                    user.groups.add(group)
-                    groups_add_count += 1
-                    add_group_ids.append(group_id)
-                else:
-                    invalid_group_ids.append(group_id)
-            except (ValueError, TypeError):
-                invalid_group_ids.append(group_id)
-            except Group.DoesNotExist:
+        # Grupos existentes e já vinculados numa consulta cada, em vez de uma por id.
+        group_pks = [_parse_group_id(group_id) for group_id in ids]
+        candidates = {pk for pk in group_pks if pk is not None}
+        existing = set(Group.objects.filter(pk__in=candidates).values_list("pk", flat=True))
+        linked = set(user.groups.filter(pk__in=candidates).values_list("pk", flat=True))
+        to_add = []
+        for group_id, pk in zip(ids, group_pks):
+            if pk in existing and pk not in linked:
+                linked.add(pk)
+                to_add.append(pk)
+                groups_add_count += 1
+                add_group_ids.append(group_id)
+            else:
                 invalid_group_ids.append(group_id)
+        user.groups.add(*to_add)
 
         user.save()
 
@@ -109,4 +84,12 @@ class AddUserGroupModelView(GenericModelView, mixins.ViewUpdateModelMixin):
             status_code = status.HTTP_200_OK if invalid_group_ids else status.HTTP_204_NO_CONTENT
             return JsonResponse(response_data, status=status_code)
 
-        return JsonResponse({"detail": "Nenhum grupo foi vinculado."}, status=status.HTTP_200_OK)
\ No newline at end of file
+        return JsonResponse({"detail": "Nenhum grupo foi vinculado."}, status=status.HTTP_200_OK)
+
+
+def _parse_group_id(value):
+    """Converte o id de grupo recebido; `None` quando não é válido."""
+    try:
+        return Group._meta.pk.to_python(value)
+    except ValidationError:
+        return None
@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'comum',
     'django_inscode',
     'rest_framework',
@@ -51,6 +52,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Métricas por rota (METRICS_ENABLED); fora do tratamento de exceções para ver os erros também.
+    'comum.middleware.RequestMetricsMiddleware',
     'django_inscode.middlewares.ExceptionHandlingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
 ]
@@ -134,14 +137,18 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = "comum.Users"
 
+AUTHENTICATION_BACKENDS = ["comum.backends.permission_backend.CachedPermissionBackend"]
+
 PAGE_SIZE = 30
+# Maior page_size aceito na paginação por cursor.
+CURSOR_PAGE_SIZE_MAX = 500
 
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'comum.authentication.ClaimsJWTAuthentication',
     ),
 }
 
@@ -151,10 +158,88 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_LIFETIME': timedelta(days=30),
     'SLIDING_TOKEN_REFRESH_LIFETIME_LATE_USER': timedelta(days=1),
     'SLIDING_TOKEN_LIFETIME_LATE_USER': timedelta(days=30),
+    # Permissões e versão de permissões nas claims do access token.
+    'TOKEN_OBTAIN_SERIALIZER': 'comum.authentication.ClaimsTokenObtainPairSerializer',
+}
+
+# Cache compartilhado entre web e celery; guarda a versão de permissões de cada usuário.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://redis:6379/1',
+    }
 }
+# Permissões por usuário: validade no cache compartilhado (segundos),
+# quantidade de usuários mantidos na memória de cada processo e intervalo
+# (segundos) em que a versão de permissões é lida da memória, sem ir ao Redis.
+PERMISSION_CACHE_TIMEOUT = 60 * 60
+PERMISSION_CACHE_LOCAL_SIZE = 1024
+PERMISSION_CACHE_VERSION_CHECK_INTERVAL = 1
+# Detalhe de peças e modelos (part/<id>/, car-model/<id>/): validade no cache
+# compartilhado (segundos), objetos mantidos na memória de cada processo,
+# leituras recentes usadas nas estatísticas de latência e intervalo (segundos)
+# em que a versão de cada objeto é lida da memória, sem ir ao Redis.
+DETAIL_CACHE_TIMEOUT = 60 * 60
+DETAIL_CACHE_LOCAL_SIZE = 4096
+DETAIL_CACHE_LATENCY_SAMPLES = 1000
+DETAIL_CACHE_VERSION_CHECK_INTERVAL = 1
 
 CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_BROKER_URL = 'redis://redis:6379/0'
 CELERY_RESULT_BACKEND = 'redis://redis:6379/0'
-CELERY_TIMEZONE = 'America/Sao_Paulo'
\ No newline at end of file
+CELERY_TIMEZONE = 'America/Sao_Paulo'
+
+
+# Importação de CSV de peças
+# Diretório compartilhado entre web e celery (volume `uploads` no docker-compose).
+CSV_UPLOAD_DIR = BASE_DIR / 'temp'
+CSV_IMPORT_BATCH_SIZE = 5000
+CSV_IMPORT_MAX_ERRORS = 1000
+# Arquivos maiores que CSV_IMPORT_SHARD_SIZE (bytes) são divididos em partes
+# importadas em paralelo pelos workers do Celery.
+CSV_IMPORT_SHARD_SIZE = 64 * 1024 * 1024
+CSV_IMPORT_MAX_SHARDS = 32
+# Gravação dos lotes: "copy" (COPY + INSERT ... ON CONFLICT, só PostgreSQL),
+# "orm" (bulk_create/bulk_update) ou "auto" (copy quando disponível).
+CSV_IMPORT_BACKEND = "auto"
+
+# Feed de alterações de peças: alterações mais recentes que este atraso (segundos)
+# ficam para a próxima chamada, pois transações abertas ainda podem gravá-las. No
+# PostgreSQL o feed também para no início da transação aberta mais antiga que
+# grava em comum_part, então transações mais longas que o atraso (lotes de
+# importação) não perdem alterações; nos outros bancos o atraso precisa cobri-las.
+PART_CHANGES_SAFETY_LAG = 5
+# Até quantos segundos atrás uma transação aberta pode segurar o feed; as mais
+# longas que isso podem ter alterações puladas.
+PART_CHANGES_MAX_HOLD = 15 * 60
+
+# Busca de peças: quantidade padrão e máxima de resultados.
+PART_SEARCH_LIMIT = 20
+PART_SEARCH_LIMIT_MAX = 100
+# Candidatas ordenadas por relevância em cada busca; limita o custo de termos comuns.
+PART_SEARCH_CANDIDATES = 1000
+
+# Índice de compatibilidade peça ↔ modelo em memória: intervalo (segundos) para
+# conferir se outro processo alterou os vínculos, e alterações acumuladas antes
+# de recompactar o CSR.
+FITMENT_INDEX_CHECK_INTERVAL = 1
+FITMENT_INDEX_MAX_PENDING = 10000
+# Como as listagens de vínculos (parts/car-model/, cars-model/part/) e a consulta
+# de compatibilidade (part/fitment/) são respondidas: "sql", "memory" (índice em
+# memória, carregado na primeira leitura) ou "auto" (índice para resultados de até
+# FITMENT_MEMORY_MAX_PARTS ids; acima disso os ids iriam num IN gigante).
+FITMENT_QUERY_BACKEND = "auto"
+FITMENT_MEMORY_MAX_PARTS = 1000
+
+# Exportação do catálogo (part/export/): linhas lidas por vez do cursor no banco
+# e gravadas em cada pedaço da resposta.
+PART_EXPORT_CHUNK_SIZE = 2000
+
+# Métricas por rota (comum.middleware.RequestMetricsMiddleware, endpoint metrics/
+# e comando metrics_top). Uma requisição conta como N+1 quando uma mesma forma de
+# consulta roda METRICS_N_PLUS_ONE_THRESHOLD vezes ou mais; o endpoint lista as
+# METRICS_REPEATED_QUERIES consultas mais repetidas de cada rota.
+METRICS_ENABLED = False
+METRICS_N_PLUS_ONE_THRESHOLD = 5
+METRICS_REPEATED_QUERIES = 5